@@ -1,8 +1,9 @@
-
 import streamlit as st
 import numpy as np
-from src.rcd_model import RCDModel
 from app.memory_buffer import SymbolMemory
+from app.symbols import stream_symbol, simulate_symbol_remote, make_result_cache, SERVICE_URL
+from src.downsample import StreamDecimator
+from src.ring_buffer import RingBuffer
 
 # --- Embedded RCD-Core Kernel ---
 from typing import Dict
@@ -10,7 +11,7 @@ from typing import Dict
 class RCDSystem:
     def __init__(self):
         self.H = {}
-        self.M = []
+        self.M = RingBuffer(100, dtype=object)
         self.gamma = 1.0
         self.mu = 1.0
         self.entropy = 1.0
@@ -28,8 +29,6 @@ class RCDSystem:
 
     def _update_memory(self):
         self.M.append(self.H.copy())
-        if len(self.M) > 100:
-            self.M.pop(0)
 
     def _compute_drift(self):
         self.gamma = 1 / (1 + self.theta * self.entropy)
@@ -58,6 +57,15 @@ class RCDSystem:
         }
 
 # --- Streamlit App Starts Here ---
+
+TIMESTEP_OPTIONS = [100, 1_000, 10_000, 100_000, 1_000_000]
+MAX_CHART_POINTS = 2_000   # per series; longer runs are decimated before drawing
+
+@st.cache_resource
+def get_result_cache():
+    # One cache per server process, shared by every session.
+    return make_result_cache()
+
 if "memory" not in st.session_state:
     st.session_state.memory = SymbolMemory()
 
@@ -73,26 +81,13 @@ beta = st.sidebar.slider("Beta (μ - Memory Tension)", 0.0, 1.0, 0.2)
 delta = st.sidebar.slider("Delta (∇S - Entropy)", 0.0, 1.0, 0.1)
 dimensions = st.sidebar.slider("Dimensions", 1, 20, 3)
 noise = st.sidebar.slider("Noise Level", 0.0, 0.5, 0.1)
+n_timesteps = st.sidebar.select_slider("Timesteps", options=TIMESTEP_OPTIONS, value=100)
 
 if st.button("Run Simulation"):
     st.session_state.memory.add(symbol, alpha, beta, delta)
 
-    model = RCDModel()
-    model.set_parameters(alpha=alpha, beta=beta, delta=delta,
-                         n_dimensions=dimensions, noise_level=noise)
-
-    def symbol_to_vector(symbol, dim):
-        np.random.seed(abs(hash(symbol)) % (2**32))
-        return np.random.normal(0, 0.1, dim)
-
-    model.inject_H = symbol_to_vector(symbol + "_H", dimensions)
-    model.inject_M = symbol_to_vector(symbol + "_M", dimensions)
-    model.inject_R = hash(symbol + "_R") % 100 / 100.0
-
     st.write(f"Running simulation for: **{symbol}**")
 
-    results = model.simulate(n_timesteps=100)
-
     # Update symbolic core with current state
     symbolic_input = {
         "symbol": symbol,
@@ -118,10 +113,28 @@ if st.button("Run Simulation"):
     st.metric("Identity Drift δ(t)", f"{metrics['drift']:.4f}")
     st.metric("System Fate ψ", metrics['fate'].upper())
 
-    # Plot symbolic state evolution
-    H_vals = [h[0] for h in results["H_states"]]
-    M_vals = [m[0] for m in results["M_states"]]
-    st.line_chart({"H(t)": H_vals, "M(t)": M_vals})
-
-    dist = [np.linalg.norm(np.array(h) - np.array(m)) for h, m in zip(results["H_states"], results["M_states"])]
-    st.line_chart({"‖H - M‖(t)": dist})
+    # Plot symbolic state evolution. Identical requests, from this or any other
+    # session, are served from the cache.
+    if SERVICE_URL:
+        # Thin-client mode: the shared simulation service (src/service.py) runs the
+        # job, batched with other sessions', and returns it already decimated.
+        results = simulate_symbol_remote(SERVICE_URL, symbol, alpha, beta, delta, dimensions, noise,
+                                         n_timesteps=n_timesteps, max_points=MAX_CHART_POINTS,
+                                         cache=get_result_cache())
+        H, M = results["H_states"], results["M_states"]
+        st.line_chart({"t": results["t"], "H(t)": H[:, 0], "M(t)": M[:, 0]}, x="t")
+        st.line_chart({"t": results["t"], "‖H - M‖(t)": np.linalg.norm(H - M, axis=1)}, x="t")
+    else:
+        # Run locally, redrawing after every chunk from a bounded, decimated copy.
+        progress = st.progress(0.0)
+        state_chart = st.empty()
+        dist_chart = st.empty()
+        decimator = StreamDecimator(MAX_CHART_POINTS)
+        for start, chunk in stream_symbol(symbol, alpha, beta, delta, dimensions, noise,
+                                          n_timesteps=n_timesteps, cache=get_result_cache()):
+            H, M = chunk["H_states"], chunk["M_states"]
+            decimator.extend(start, {"H(t)": H[:, 0], "M(t)": M[:, 0],
+                                     "‖H - M‖(t)": np.linalg.norm(H - M, axis=1)})
+            state_chart.line_chart(decimator.chart_data("H(t)", "M(t)"), x="t")
+            dist_chart.line_chart(decimator.chart_data("‖H - M‖(t)"), x="t")
+            progress.progress(decimator.n_seen / n_timesteps)
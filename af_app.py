@@ -1,7 +1,16 @@
 import streamlit as st
 import numpy as np
-from src.rcd_model import RCDModel
 from app.memory_buffer import SymbolMemory
+from app.symbols import stream_symbol, simulate_symbol_remote, make_result_cache, SERVICE_URL
+from src.downsample import StreamDecimator
+
+TIMESTEP_OPTIONS = [100, 1_000, 10_000, 100_000, 1_000_000]
+MAX_CHART_POINTS = 2_000   # per series; longer runs are decimated before drawing
+
+@st.cache_resource
+def get_result_cache():
+    # One cache per server process, shared by every session.
+    return make_result_cache()
 
 # Initialize in Streamlit session state
 if "memory" not in st.session_state:
@@ -17,6 +26,7 @@ beta = st.sidebar.slider("Beta", 0.0, 1.0, 0.2)
 delta = st.sidebar.slider("Delta", 0.0, 1.0, 0.1)
 dimensions = st.sidebar.slider("Dimensions", 1, 20, 3)
 noise = st.sidebar.slider("Noise Level", 0.0, 0.5, 0.1)
+n_timesteps = st.sidebar.select_slider("Timesteps", options=TIMESTEP_OPTIONS, value=100)
 
 # Add current symbolic input to memory
 # st.session_state.memory.add(symbol, alpha, beta, delta)
@@ -25,40 +35,37 @@ if st.button("Run Simulation"):
     # Add current symbolic input to memory
     st.session_state.memory.add(symbol, alpha, beta, delta)
 
-    # Create and configure model
-    model = RCDModel()
-    model.set_parameters(alpha=alpha, beta=beta, delta=delta,
-                         n_dimensions=dimensions, noise_level=noise)
-
-    # Inject attractors
-    def symbol_to_vector(symbol, dim):
-        np.random.seed(abs(hash(symbol)) % (2**32))
-        return np.random.normal(0, 0.1, dim)
-
-    model.inject_H = symbol_to_vector(symbol + "_H", dimensions)
-    model.inject_M = symbol_to_vector(symbol + "_M", dimensions)
-    model.inject_R = hash(symbol + "_R") % 100 / 100.0
-
     st.write(f"Running simulation for: **{symbol}**")
 
-    # Run simulation
-    results = model.simulate(n_timesteps=100)
-
     # Display symbolic memory buffer
     st.subheader("Symbolic Memory (recent inputs):")
     st.json(st.session_state.memory.get_recent())
 
-    # Extract H and M values
-    H_vals = [h[0] for h in results["H_states"]]
-    M_vals = [m[0] for m in results["M_states"]]
-
-    # Plot H and M
-    st.line_chart({"H(t)": H_vals, "M(t)": M_vals})
-
-    # Compute and plot symbolic divergence
-    import numpy as np
-    dist = [np.linalg.norm(np.array(h) - np.array(m)) for h, m in zip(results["H_states"], results["M_states"])]
-    st.line_chart({"‖H - M‖(t)": dist})
-
-    # Optional debug: show result keys
-    # st.write("Available result keys:", list(results.keys()))
+    # Run simulation (attractor vectors are derived from the symbol) and plot H, M
+    # and the symbolic divergence, on the shared service if one is configured or
+    # locally as chunks stream in. Charts are drawn from a bounded, decimated copy,
+    # so long runs never send every point to the browser. Identical requests, from
+    # this or any other session, are served from the cache.
+    if SERVICE_URL:
+        # Thin-client mode: the shared simulation service (src/service.py) runs the
+        # job, batched with other sessions', and returns it already decimated.
+        results = simulate_symbol_remote(SERVICE_URL, symbol, alpha, beta, delta, dimensions, noise,
+                                         n_timesteps=n_timesteps, max_points=MAX_CHART_POINTS,
+                                         cache=get_result_cache())
+        H, M = results["H_states"], results["M_states"]
+        st.line_chart({"t": results["t"], "H(t)": H[:, 0], "M(t)": M[:, 0]}, x="t")
+        st.line_chart({"t": results["t"], "‖H - M‖(t)": np.linalg.norm(H - M, axis=1)}, x="t")
+    else:
+        # Run locally, redrawing after every chunk.
+        progress = st.progress(0.0)
+        state_chart = st.empty()
+        dist_chart = st.empty()
+        decimator = StreamDecimator(MAX_CHART_POINTS)
+        for start, chunk in stream_symbol(symbol, alpha, beta, delta, dimensions, noise,
+                                          n_timesteps=n_timesteps, cache=get_result_cache()):
+            H, M = chunk["H_states"], chunk["M_states"]
+            decimator.extend(start, {"H(t)": H[:, 0], "M(t)": M[:, 0],
+                                     "‖H - M‖(t)": np.linalg.norm(H - M, axis=1)})
+            state_chart.line_chart(decimator.chart_data("H(t)", "M(t)"), x="t")
+            dist_chart.line_chart(decimator.chart_data("‖H - M‖(t)"), x="t")
+            progress.progress(decimator.n_seen / n_timesteps)
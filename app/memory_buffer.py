@@ -1,18 +1,26 @@
 # app/memory_buffer.py
 
+import numpy as np
+from src.ring_buffer import RingBuffer, RollingMemoryBuffer
+
+SYMBOL_ENTRY = np.dtype([("symbol", object), ("alpha", float), ("beta", float), ("delta", float)])
+
+
 class SymbolMemory:
     def __init__(self, maxlen=5):
-        self.history = []
         self.maxlen = maxlen
+        self._entries = RingBuffer(maxlen, dtype=SYMBOL_ENTRY)
 
     def add(self, symbol: str, alpha, beta, delta):
-        entry = {"symbol": symbol, "alpha": alpha, "beta": beta, "delta": delta}
-        self.history.append(entry)
-        if len(self.history) > self.maxlen:
-            self.history.pop(0)
+        self._entries.append((symbol, alpha, beta, delta))
 
     def get_recent(self):
-        return self.history
+        return [{"symbol": e["symbol"], "alpha": float(e["alpha"]), "beta": float(e["beta"]),
+                 "delta": float(e["delta"])} for e in self._entries.values()]
+
+    @property
+    def history(self):
+        return self.get_recent()
 
     def clear(self):
-        self.history = []
+        self._entries.clear()
@@ -0,0 +1,134 @@
+# app/symbols.py
+
+import os
+import hashlib
+import json
+import urllib.request
+import numpy as np
+from src.rcd_model import RCDModel
+from src.result_cache import ResultCache, stable_hash
+from src.service import decode_result
+
+N_TIMESTEPS = 100
+CHUNK_SIZE = 5_000         # steps per streamed chunk
+CACHE_MAX_STEPS = 100_000  # longer streamed runs are not cached
+SERVICE_URL = os.environ.get("RCD_SERVICE_URL")   # e.g. http://127.0.0.1:8765, see src/service.py
+
+
+def _symbol_seed(symbol: str) -> int:
+    """64-bit seed from a SHA-256 of the symbol; stable across processes, unlike hash()."""
+    return int.from_bytes(hashlib.sha256(symbol.encode("utf-8")).digest()[:8], "little")
+
+
+def symbol_to_vector(symbol: str, dim: int):
+    rng = np.random.default_rng(_symbol_seed(symbol))
+    return rng.normal(0, 0.1, dim)
+
+
+def symbol_to_scalar(symbol: str) -> float:
+    """Deterministic value in [0, 1) in steps of 0.01, as the apps use for R."""
+    return _symbol_seed(symbol) % 100 / 100.0
+
+
+def make_result_cache():
+    """Shared cache for the apps; set RCD_CACHE_DIR to keep results on disk across restarts."""
+    return ResultCache(maxsize=int(os.environ.get("RCD_CACHE_SIZE", 64)),
+                       directory=os.environ.get("RCD_CACHE_DIR") or None)
+
+
+def _symbol_model(symbol, alpha, beta, delta, dimensions, noise, seed):
+    model = RCDModel(seed=seed)
+    model.set_parameters(alpha=alpha, beta=beta, delta=delta,
+                         n_dimensions=dimensions, noise_level=noise)
+    model.inject_H = symbol_to_vector(symbol + "_H", dimensions)
+    model.inject_M = symbol_to_vector(symbol + "_M", dimensions)
+    model.inject_R = symbol_to_scalar(symbol + "_R")
+    return model
+
+
+def _inject_arrays(symbol, dimensions):
+    return dict(inject_H=symbol_to_vector(symbol + "_H", dimensions),
+                inject_M=symbol_to_vector(symbol + "_M", dimensions),
+                inject_R=np.array(symbol_to_scalar(symbol + "_R")))
+
+
+def _cache_key(symbol, alpha, beta, delta, dimensions, noise, n_timesteps, seed, engine):
+    return stable_hash("attractor-forge", 4, symbol, alpha, beta, delta, dimensions, noise,
+                       n_timesteps, seed, engine)
+
+
+def simulate_symbol(symbol, alpha, beta, delta, dimensions, noise, n_timesteps=N_TIMESTEPS, seed=42, cache=None):
+    """
+    Run the Attractor Forge simulation for one symbol and parameter set.
+
+    Returns a dict of arrays: the `RCDModel.simulate` keys plus the symbol's
+    inject_H / inject_M vectors and inject_R. With a `cache`, identical requests
+    (same symbol, parameters, seed and step count) are served from it.
+    """
+    def compute():
+        model = _symbol_model(symbol, alpha, beta, delta, dimensions, noise, seed)
+        results = model.simulate(n_timesteps=n_timesteps).to_dict()
+        results.update(_inject_arrays(symbol, dimensions))
+        return results
+
+    if cache is None:
+        return compute()
+    key = _cache_key(symbol, alpha, beta, delta, dimensions, noise, n_timesteps, seed, RCDModel.engine)
+    return cache.get_or_compute(key, compute)
+
+
+def stream_symbol(symbol, alpha, beta, delta, dimensions, noise, n_timesteps=N_TIMESTEPS, seed=42,
+                  chunk_size=CHUNK_SIZE, engine=None, cache=None):
+    """
+    Generator form of `simulate_symbol` for long runs: yields (start, chunk) pairs as
+    the run progresses, each chunk a mapping with the `RCDModel.simulate` keys for
+    steps [start, start + len(chunk['reflection'])).
+
+    `engine` defaults to the reference loop up to CHUNK_SIZE steps and the compiled
+    engine beyond. A cached run is yielded as a single chunk; a fresh one is stored
+    in `cache` once complete if it has at most CACHE_MAX_STEPS steps, so the
+    cache never holds million-step trajectories.
+    """
+    engine = engine or (RCDModel.engine if n_timesteps <= CHUNK_SIZE else "compiled")
+    key = _cache_key(symbol, alpha, beta, delta, dimensions, noise, n_timesteps, seed, engine)
+    if cache is not None and key in cache:
+        yield 0, cache.get(key)
+        return
+
+    model = _symbol_model(symbol, alpha, beta, delta, dimensions, noise, seed)
+    keep = cache is not None and n_timesteps <= CACHE_MAX_STEPS
+    chunks = []
+    for start, chunk in model.simulate_iter(n_timesteps, chunk_size=chunk_size, engine=engine):
+        if keep:
+            chunks.append(chunk)
+        yield start, chunk
+    if keep:
+        results = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+        results.update(_inject_arrays(symbol, dimensions))
+        cache.put(key, results)
+
+
+def simulate_symbol_remote(url, symbol, alpha, beta, delta, dimensions, noise, n_timesteps=N_TIMESTEPS,
+                           seed=42, max_points=None, cache=None, timeout=120):
+    """
+    `simulate_symbol` run by the simulation service at `url` (src/service.py),
+    which batches it with other users' concurrent jobs.
+
+    With `max_points` the service returns at most that many decimated rows, with
+    their step indices in 't'.
+    """
+    def compute():
+        job = dict(seed=seed, dim=dimensions, n_timesteps=n_timesteps, alpha=alpha, beta=beta,
+                   delta=delta, noise_level=noise, max_points=max_points)
+        request = urllib.request.Request(url.rstrip("/") + "/simulate", data=json.dumps(job).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            results = decode_result(response.read())
+        results.update(_inject_arrays(symbol, dimensions))
+        return results
+
+    if cache is None:
+        return compute()
+    key = stable_hash("attractor-forge-remote", 2, symbol, alpha, beta, delta, dimensions, noise,
+                      n_timesteps, seed, max_points)
+    return cache.get_or_compute(key, compute)
@@ -0,0 +1,166 @@
+"""
+Module: harness.py
+Purpose: Timing, peak-memory measurement and the JSON Lines benchmark history.
+
+Every measurement becomes one record:
+
+    {"run_id", "time", "env": {...}, "suite", "name", "params": {...},
+     "value", "unit", "higher_is_better"}
+
+and a run appends its records to a history file, one JSON object per line, so
+results from different commits and machines accumulate in one place and can be
+loaded with `load_history` (or `pandas.read_json(path, lines=True)`).
+`compare` matches a run against the latest earlier record of the same benchmark
+on the same machine and reports those that got worse by more than a threshold.
+"""
+
+import gc
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import uuid
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Outside the checkout, so running the benchmarks leaves the working tree untouched;
+# RCD_BENCH_HISTORY overrides it (e.g. to share one history between checkouts).
+DEFAULT_HISTORY = os.environ.get('RCD_BENCH_HISTORY') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'rcd-theory', 'benchmarks', 'history.jsonl')
+
+
+# --- Measurement ---
+
+def measure(fn, repeat=5, min_time=0.1):
+    """
+    Best-of-`repeat` seconds per call of `fn()`.
+
+    Each repeat calls `fn` in a loop sized so that it lasts at least `min_time`,
+    as `timeit` does; the minimum over repeats is the least disturbed by other load.
+    """
+    number = 1
+    while True:   # calibrate the loop size by doubling
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def peak_memory(fn):
+    """Peak bytes allocated through Python's allocators (NumPy included) while `fn()` runs."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# --- Environment ---
+
+def _git(*args):
+    try:
+        out = subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return (out.stdout.strip() or None) if out.returncode == 0 else None
+
+
+def environment():
+    """Commit, package and interpreter versions and machine of the current run."""
+    try:
+        import numba
+        numba_version = numba.__version__
+    except ImportError:
+        numba_version = None
+    try:
+        from importlib.metadata import version
+        package_version = version('rcd-theory')
+    except Exception:
+        package_version = None
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'version': package_version,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'numba': numba_version,
+        'machine': platform.node(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+# --- History ---
+
+def new_run_id():
+    return uuid.uuid4().hex[:12]
+
+
+def make_records(results, suite, env, run_id, stamp=None):
+    """Records for `results`, an iterable of (name, params, value, unit, higher_is_better)."""
+    stamp = stamp or time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    return [{'run_id': run_id, 'time': stamp, 'env': env, 'suite': suite, 'name': name,
+             'params': params, 'value': value, 'unit': unit, 'higher_is_better': higher}
+            for name, params, value, unit, higher in results]
+
+
+def append_history(path, records):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+
+
+def load_history(path):
+    """Every record in the history file, oldest first (an empty list if there is none)."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def benchmark_key(record):
+    """Identity of a benchmark across runs: suite, name, parameters and machine."""
+    return (record['suite'], record['name'], json.dumps(record['params'], sort_keys=True),
+            record['env'].get('machine'))
+
+
+def compare(records, history, threshold=0.10):
+    """
+    Changes of `records` against the latest earlier history record of each benchmark.
+
+    Returns:
+        list of dict: One entry per matched benchmark with 'record', 'baseline'
+        (the earlier record), 'change' (relative, positive = better) and
+        'regression' (worse by more than `threshold`).
+    """
+    latest = {}
+    for record in history:
+        latest[benchmark_key(record)] = record
+    changes = []
+    for record in records:
+        baseline = latest.get(benchmark_key(record))
+        if baseline is None or baseline['run_id'] == record['run_id'] or not baseline['value']:
+            continue
+        change = record['value'] / baseline['value'] - 1
+        if not record['higher_is_better']:
+            change = -change
+        changes.append({'record': record, 'baseline': baseline, 'change': change,
+                        'regression': change < -threshold})
+    return changes
@@ -0,0 +1,198 @@
+"""
+Module: run.py
+Purpose: Benchmark suites for the simulation, metric and manifold hot paths.
+
+Suites (all seeded, so every run times the same work):
+
+    simulate   RCDModel.simulate steps/s by engine, dim and n_timesteps
+    runner     SimulationRunner.run steps/s
+    metrics    metric calls/s by dim: fused compute_metrics vs the three separate methods
+    ensemble   RCDEnsemble member-steps/s by ensemble size
+    network    RCDNetwork agent-steps/s by population size
+    recon      SymbolicManifold reconciliation events/s by grid size and radius
+    memory     peak bytes of simulate() results storage by n_timesteps and dim, full and aggregated
+
+Results are printed and appended to the history file (see harness.py), by default
+~/.cache/rcd-theory/benchmarks/history.jsonl outside the checkout, or the path given
+by --history or RCD_BENCH_HISTORY; --no-save records nothing. With --compare,
+benchmarks slower than the previous run on this machine by more than --threshold
+are listed and the exit status is 1.
+
+CLI:
+    python -m benchmarks.run                        # every suite
+    python -m benchmarks.run simulate recon --quick
+    python -m benchmarks.run --compare --threshold 0.15
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from .harness import (DEFAULT_HISTORY, append_history, compare, environment, load_history,
+                      make_records, measure, new_run_id, peak_memory)
+
+SEED = 0
+
+
+def bench_simulate(quick):
+    from src.rcd_model import RCDModel
+
+    dims = (3, 10) if quick else (3, 10, 100)
+    lengths = (1_000,) if quick else (1_000, 10_000)
+    for engine in ('reference', 'closed_form', 'compiled'):
+        RCDModel(dim=3, seed=SEED).simulate(10, engine=engine)   # warm-up (numba compiles here)
+        for dim in dims:
+            for n in lengths:
+                if engine == 'reference' and n > 1_000 and quick:
+                    continue
+                model = RCDModel(dim=dim, seed=SEED)
+                seconds = measure(lambda: model.simulate(n, engine=engine), repeat=3)
+                yield 'steps_per_sec', {'engine': engine, 'dim': dim, 'n_timesteps': n}, n / seconds, 'steps/s', True
+
+
+def bench_runner(quick):
+    from src.simulation_runner import SimulationRunner
+
+    n = 500 if quick else 2_000
+    seconds = measure(lambda: SimulationRunner(timesteps=n, seed=SEED).run(), repeat=3)
+    yield 'steps_per_sec', {'n_timesteps': n}, n / seconds, 'steps/s', True
+
+
+def bench_metrics(quick):
+    from src.rcd_model import RCDModel
+
+    model = RCDModel(seed=SEED)
+    rng = np.random.default_rng(SEED)
+    for dim in ((3, 100) if quick else (3, 10, 100, 1_000)):
+        H, M = rng.standard_normal(dim), rng.standard_normal(dim)
+
+        def separate():
+            return (model.compute_phase_synchronization(H, M), model.compute_semantic_correlation(H, M),
+                    model.compute_procrustes_distance(H, M))
+
+        yield 'calls_per_sec', {'kernel': 'fused', 'dim': dim}, 1 / measure(lambda: model.compute_metrics(H, M)), 'calls/s', True
+        yield 'calls_per_sec', {'kernel': 'separate', 'dim': dim}, 1 / measure(separate), 'calls/s', True
+
+
+def bench_ensemble(quick):
+    from src.ensemble import RCDEnsemble
+
+    n = 200 if quick else 1_000
+    for members in ((1, 64) if quick else (1, 16, 256)):
+        ensemble = RCDEnsemble(range(SEED, SEED + members), dim=10)
+        seconds = measure(lambda: ensemble.simulate(n), repeat=3)
+        yield 'member_steps_per_sec', {'members': members, 'dim': 10, 'n_timesteps': n}, members * n / seconds, 'steps/s', True
+
+
+def bench_network(quick):
+    from src.network import RCDNetwork, bipartite_population
+
+    n = 100 if quick else 500
+    for agents in ((100, 1_000) if quick else (100, 1_000, 10_000)):
+        network = RCDNetwork(bipartite_population(agents // 2, agents // 2, degree=5, seed=SEED), dim=10, seed=SEED)
+        seconds = measure(lambda: network.simulate(n), repeat=3)
+        yield 'agent_steps_per_sec', {'agents': agents, 'degree': 5, 'dim': 10, 'n_timesteps': n}, agents * n / seconds, 'steps/s', True
+
+
+def bench_recon(quick):
+    from src.rcd_memory_topology import SymbolicManifold
+
+    sizes = (256, 1_024) if quick else (256, 1_024, 4_096)
+    radii = (2.0, 5.0) if quick else (2.0, 5.0, 20.0)
+    n_events = 200 if quick else 1_000
+    for size in sizes:
+        rng = np.random.default_rng(SEED)
+        xy = rng.integers(0, size, (n_events, 2)).astype(float)
+        strength = rng.uniform(0.1, 1.0, n_events)
+        for radius in radii:
+            params = {'grid': size, 'radius': radius, 'events': n_events}
+            manifold = SymbolicManifold((size, size))
+
+            def one_by_one():
+                for (x, y), s in zip(xy.tolist(), strength.tolist()):
+                    manifold.apply_memory_reconciliation((x, y), s, radius)
+                manifold.reset()
+
+            table = np.c_[xy, strength, np.full(n_events, radius)]
+
+            def batched():
+                manifold.apply_many(table)
+                manifold.reset()
+
+            yield 'events_per_sec', {**params, 'api': 'apply_memory_reconciliation'}, n_events / measure(one_by_one, repeat=3), 'events/s', True
+            yield 'events_per_sec', {**params, 'api': 'apply_many'}, n_events / measure(batched, repeat=3), 'events/s', True
+
+
+def bench_memory(quick):
+    from src.rcd_model import RCDModel
+    from src.results import SimulationResults
+
+    RCDModel(dim=3, seed=SEED).simulate(10, engine='compiled')   # keep JIT compilation out of the peak
+    for dim in ((10,) if quick else (3, 10, 100)):
+        for n in ((10_000,) if quick else (1_000, 100_000)):
+            params = {'dim': dim, 'n_timesteps': n}
+            model = RCDModel(dim=dim, seed=SEED)
+            peak = peak_memory(lambda: model.simulate(n, engine='compiled'))
+            stored = SimulationResults(n, dim).nbytes
+            yield 'peak_bytes', params, peak, 'bytes', False
+            yield 'peak_bytes_per_step', params, peak / n, 'bytes', False
+            yield 'stored_bytes_per_step', params, stored / n, 'bytes', False
+            model = RCDModel(dim=dim, seed=SEED)
+            yield 'aggregated_peak_bytes', params, peak_memory(lambda: model.simulate(n, engine='compiled', aggregate=True)), 'bytes', False
+
+
+SUITES = {
+    'simulate': bench_simulate,
+    'runner': bench_runner,
+    'metrics': bench_metrics,
+    'ensemble': bench_ensemble,
+    'network': bench_network,
+    'recon': bench_recon,
+    'memory': bench_memory,
+}
+
+
+def _format(record):
+    params = ' '.join(f"{k}={v}" for k, v in record['params'].items())
+    return f"{record['suite']:<9} {record['name']:<22} {params:<60} {record['value']:>14,.1f} {record['unit']}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run RCD benchmarks and record them in the history.")
+    parser.add_argument('suites', nargs='*', help=f"suites to run (default: all): {', '.join(SUITES)}")
+    parser.add_argument('--quick', action='store_true', help="smaller parameter grids")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help=f"JSON Lines history file (default: {DEFAULT_HISTORY})")
+    parser.add_argument('--no-save', action='store_true', help="do not append to the history")
+    parser.add_argument('--compare', action='store_true', help="report regressions against the history")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative slowdown counted as a regression")
+    args = parser.parse_args(argv)
+    unknown = [suite for suite in args.suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+
+    history = load_history(args.history)
+    env = environment()
+    run_id = new_run_id()
+    records = []
+    for suite in args.suites or SUITES:
+        found = make_records(SUITES[suite](args.quick), suite, env, run_id)
+        for record in found:
+            print(_format(record))
+        records.extend(found)
+
+    if not args.no_save:
+        append_history(args.history, records)
+        print(f"{len(records)} results appended to {args.history}")
+    if args.compare:
+        changes = compare(records, history, args.threshold)
+        regressions = [c for c in changes if c['regression']]
+        print(f"Compared {len(changes)} benchmarks with earlier runs: {len(regressions)} regressions")
+        for change in regressions:
+            print(f"  {_format(change['record'])}  ({change['change']:+.1%} vs {change['baseline']['env'].get('commit')})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
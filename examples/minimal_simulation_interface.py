@@ -4,7 +4,6 @@ print("✅ Running RCD simulation...")
 
 from src.rcd_model import RCDModel
 from novelty_trigger import check_novelty_trigger
-import numpy as np
 
 import sys
 import os
@@ -15,8 +14,8 @@ model = RCDModel()
 model.set_parameters(alpha=0.7, beta=0.2, delta=0.1, n_dimensions=3, noise_level=0.1)
 
 # Inject attractors mid-simulation
-model.inject_H = np.random.randn(10) * 0.1  # symbolic perturbation
-model.inject_M = np.random.randn(10) * 0.1
+model.inject_H = model.rng.standard_normal(10) * 0.1  # symbolic perturbation
+model.inject_M = model.rng.standard_normal(10) * 0.1
 model.inject_R = 0.2  # boost reflection
 
 # Run simulation
@@ -25,7 +24,7 @@ results = model.simulate(n_timesteps=100)
 # Print results
 for t in range(len(results['reflection'])):
     # Check for stochastic novelty trigger
-    if check_novelty_trigger():
+    if check_novelty_trigger(rng=model.rng):
         print(f"Novelty trigger activated at t={t}!")
         model.state['gamma'] = min(1.0, model.state['gamma'] + 0.2)
         model.state['rho'] = min(1.0, model.state['rho'] + 0.1)
@@ -1,13 +1,16 @@
 import numpy as np
 
-def check_novelty_trigger(probability=0.05):
+def check_novelty_trigger(probability=0.05, rng=None):
     """
     Returns True with a small probability, simulating stochastic novelty events.
 
     Parameters:
         probability (float): Likelihood of triggering novelty event at a timestep.
+        rng (np.random.Generator): Stream to draw from, e.g. `model.rng`. A fresh
+            unseeded Generator is used if omitted.
 
     Returns:
         bool: True if novelty is triggered this timestep.
     """
-    return np.random.rand() < probability
+    rng = rng if rng is not None else np.random.default_rng()
+    return rng.random() < probability
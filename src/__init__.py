@@ -2,7 +2,42 @@
 Recursive Cognitive Dynamics (RCD) Package
 
 This module initializes the RCD theory package and exposes key submodules.
+
+Names are resolved lazily on first access (PEP 562 `__getattr__`), so `import src`
+loads nothing else and a process that only needs `RCDModel` imports only the
+modules `RCDModel` depends on. Submodules (e.g. `src.sweep`) are importable as
+attributes the same way.
 """
-from .rcd_model import *
-from .alignment_metrics import *
-from .lake_state import *
+
+import importlib
+
+_EXPORTS = {
+    'rcd_model': ('RCDModel',),
+    'alignment_metrics': ('fused_metrics', 'gamma_t', 'rho_t', 'd_t', 'alpha_t', 'mu_t', 'tau_t',
+                          'delta_t', 'cumulative_integral', 'drift_series', 'alignment_series'),
+    'lake_state': ('compute_lake_state', 'compute_lake_state_conditions', 'lake_state_persistence',
+                   'reinforce_lake_state', 'LakeStateTracker', 'lake_state_series', 'is_lake_state',
+                   'transition_state', 'collapse_or_expand'),
+    'ensemble': ('RCDEnsemble', 'simulate_ensemble'),
+    'simulation_runner': ('SimulationRunner',),
+}
+_SOURCE = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_SOURCE)
+
+
+def __getattr__(name):
+    if name in _SOURCE:
+        value = getattr(importlib.import_module(f'.{_SOURCE[name]}', __name__), name)
+        globals()[name] = value   # later lookups skip __getattr__
+        return value
+    try:
+        return importlib.import_module(f'.{name}', __name__)
+    except ModuleNotFoundError as error:
+        if error.name != f'{__name__}.{name}':
+            raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SOURCE))
@@ -0,0 +1,207 @@
+"""
+Module: aggregation.py
+Purpose: Windowed summaries and LTTB-downsampled series of long runs, in bounded memory.
+
+`SimulationResults` keeps every state and metric, which is O(n_timesteps · dim)
+and more than a million-step run needs to be plotted or compared.
+`AggregatedResults` is a drop-in sink for `simulate()` and `SimulationRunner`
+that reduces steps as they are recorded instead:
+
+- per window of `window` steps, the mean, min, max and last value of γ, ρ, d and R
+  ('phase_sync_mean', 'reflection_max', ...), one row per window;
+- per metric, an LTTB-downsampled series of at most `lttb_points` points
+  ('phase_sync_lttb', with its steps in 'phase_sync_lttb_t'), see downsample.py;
+- the final H and M ('final_H', 'final_M').
+
+Blocks from the block engines are reduced with `np.*.reduceat` over their window
+boundaries; single-step records are staged and reduced `stage` steps at a time.
+Memory is fixed by `max_windows`, `lttb_points` and `stage`, not by n_timesteps.
+With raw=True the full `SimulationResults` columns are kept alongside.
+"""
+
+from collections.abc import MutableMapping
+import numpy as np
+
+from .downsample import StreamLTTB
+from .results import SimulationResults, METRIC_KEYS
+
+WINDOW_STATS = ('mean', 'min', 'max', 'last')
+
+
+class WindowAggregator:
+    def __init__(self, n_windows, window):
+        """
+        Args:
+            n_windows (int): Number of windows; arrays are allocated once, up front.
+            window (int): Steps per window; step t falls in window t // window.
+        """
+        self.window = window
+        self.sum = np.zeros(n_windows)
+        self.min = np.full(n_windows, np.inf)
+        self.max = np.full(n_windows, -np.inf)
+        self.last = np.full(n_windows, np.nan)
+        self.count = np.zeros(n_windows, dtype=np.int64)
+
+    def update(self, start, values):
+        """Fold steps [start, start + n) of one series into their windows."""
+        n = len(values)
+        if n == 0:
+            return
+        ids = np.arange(start, start + n) // self.window
+        cuts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])   # first step of each window in the block
+        w = ids[cuts]
+        self.sum[w] += np.add.reduceat(values, cuts)
+        self.min[w] = np.minimum(self.min[w], np.minimum.reduceat(values, cuts))
+        self.max[w] = np.maximum(self.max[w], np.maximum.reduceat(values, cuts))
+        self.last[w] = values[np.r_[cuts[1:], n] - 1]
+        self.count[w] += np.diff(np.r_[cuts, n])
+
+    def stat(self, name, n_windows):
+        """'mean', 'min', 'max' or 'last' for the first `n_windows` windows."""
+        if name == 'mean':
+            return self.sum[:n_windows] / np.maximum(self.count[:n_windows], 1)
+        return getattr(self, name)[:n_windows]
+
+    @property
+    def nbytes(self):
+        return self.sum.nbytes + self.min.nbytes + self.max.nbytes + self.last.nbytes + self.count.nbytes
+
+
+class AggregatedResults(MutableMapping):
+    def __init__(self, n_timesteps, dim, window=None, max_windows=1000, lttb_points=2000, raw=False, stage=1024):
+        """
+        Args:
+            n_timesteps (int): Capacity in steps.
+            dim (int): Dimension of the H and M state vectors.
+            window (int): Steps per window; defaults to the smallest window that
+                fits n_timesteps into `max_windows` windows.
+            max_windows (int): Window count used to pick the default `window`.
+            lttb_points (int): Points per LTTB-downsampled series; None for none.
+            raw (bool): Also keep every state and metric in a `SimulationResults`.
+            stage (int): Single-step records buffered before they are reduced.
+        """
+        self.capacity = n_timesteps
+        self.dim = dim
+        self.window = window or max(1, -(-n_timesteps // max_windows))
+        self.n_windows = -(-n_timesteps // self.window)
+        self.lttb_points = lttb_points
+        self._reduced = 0
+        self.windows = {key: WindowAggregator(self.n_windows, self.window) for key in METRIC_KEYS}
+        self.lttb = {key: StreamLTTB(lttb_points) for key in METRIC_KEYS} if lttb_points else {}
+        self.raw = SimulationResults(n_timesteps, dim) if raw else None
+        self.final_H = np.full(dim, np.nan)
+        self.final_M = np.full(dim, np.nan)
+        self._stage = np.empty((stage, len(METRIC_KEYS)))
+        self._staged = 0
+        self._extra = {}
+
+    def record(self, H, M, gamma, rho, d, R):
+        """Add one step; it is reduced with the rest of its stage."""
+        if self.n_steps >= self.capacity:
+            raise IndexError(f"AggregatedResults is full ({self.capacity} steps)")
+        if self.raw is not None:
+            self.raw.record(H, M, gamma, rho, d, R)
+        self._stage[self._staged] = (gamma, rho, d, R)
+        self._staged += 1
+        self.final_H[:] = H
+        self.final_M[:] = M
+        if self._staged == len(self._stage):
+            self._flush()
+
+    def extend(self, H, M, gamma, rho, d, R):
+        """Add a block of steps: H, M of shape (n, dim) and (n,) metric arrays."""
+        n = len(H)
+        if self.n_steps + n > self.capacity:
+            raise IndexError(f"AggregatedResults is full ({self.capacity} steps)")
+        if n == 0:
+            return
+        self._flush()
+        if self.raw is not None:
+            self.raw.extend(H, M, gamma, rho, d, R)
+        self._reduce(np.asarray(gamma), np.asarray(rho), np.asarray(d), np.asarray(R))
+        self.final_H[:] = H[-1]
+        self.final_M[:] = M[-1]
+
+    def _flush(self):
+        if self._staged:
+            staged = self._stage[:self._staged]
+            self._staged = 0
+            self._reduce(*staged.T)
+
+    def _reduce(self, *columns):
+        start = self._reduced
+        for key, values in zip(METRIC_KEYS, columns):
+            self.windows[key].update(start, values)
+            if self.lttb:
+                self.lttb[key].extend(start, values)
+        self._reduced = start + len(columns[0])
+
+    @property
+    def n_steps(self):
+        """Steps recorded so far, staged ones included."""
+        return self._reduced + self._staged
+
+    @property
+    def nbytes(self):
+        """Bytes held for the reductions (plus the raw columns with raw=True)."""
+        held = sum(w.nbytes for w in self.windows.values()) + self._stage.nbytes
+        held += sum(s.t.nbytes + s.y.nbytes for s in self.lttb.values())
+        return held + (self.raw.nbytes if self.raw is not None else 0)
+
+    def to_dict(self):
+        """Plain dict of array copies, e.g. for pickling or `np.savez`."""
+        return {key: np.array(value) if isinstance(value, np.ndarray) else value for key, value in self.items()}
+
+    # --- Mapping interface: reductions are computed from what has been recorded ---
+
+    def _keys(self):
+        keys = ['window_start', 'window_steps']
+        keys += [f'{key}_{stat}' for key in METRIC_KEYS for stat in WINDOW_STATS]
+        for key in self.lttb:
+            keys += [f'{key}_lttb', f'{key}_lttb_t']
+        keys += ['final_H', 'final_M']
+        return keys + (list(self.raw) if self.raw is not None else [])
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        self._flush()
+        filled = -(-self.n_steps // self.window)
+        if key == 'window_start':
+            return np.arange(filled) * self.window
+        if key == 'window_steps':
+            return self.windows[METRIC_KEYS[0]].count[:filled]
+        if key in ('final_H', 'final_M'):
+            return getattr(self, key)
+        name, _, stat = key.rpartition('_')
+        if name in self.windows and stat in WINDOW_STATS:
+            return self.windows[name].stat(stat, filled)
+        if key.endswith('_lttb') or key.endswith('_lttb_t'):
+            name = key.rsplit('_lttb', 1)[0]
+            if name in self.lttb:
+                t, values = self.lttb[name].series()
+                return t if key.endswith('_t') else values
+        if self.raw is not None and key in self.raw:
+            return self.raw[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._keys():
+            raise KeyError(f"'{key}' is computed from the recorded steps; use record()")
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._keys():
+            raise KeyError(f"'{key}' is computed from the recorded steps and cannot be removed")
+        del self._extra[key]
+
+    def __iter__(self):
+        yield from self._keys()
+        yield from self._extra
+
+    def __len__(self):
+        return len(self._keys()) + len(self._extra)
+
+    def __repr__(self):
+        return (f"AggregatedResults(n_steps={self.n_steps}, dim={self.dim}, window={self.window}, "
+                f"lttb_points={self.lttb_points}, raw={self.raw is not None})")
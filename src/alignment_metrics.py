@@ -11,30 +11,132 @@ Includes:
 - Drift (δ)
 """
 
+import math
+import numpy as np
+
+
+def fused_metrics(H, M):
+    """
+    γ, ρ and d for H/M, computed from one shared set of intermediates.
+
+    The dot product, both norms, the centered covariance/variances and the norm of
+    H - M are each computed once and reused; d comes from the explicit difference
+    so it stays accurate as H → M. Leading axes are batch axes: (dim,) inputs
+    return Python floats, (N, dim) or (T, dim) inputs return (N,) or (T,) arrays.
+
+    Returns:
+        tuple: (gamma, rho, d) with
+            gamma = 1 - |⟨H, M⟩| / (‖H‖ ‖M‖)   (RCDModel.compute_phase_synchronization)
+            rho   = Pearson correlation of H and M, 0 if either is constant
+            d     = ‖H - M‖                     (RCDModel.compute_procrustes_distance)
+    """
+    H = np.asarray(H, dtype=float)
+    M = np.asarray(M, dtype=float)
+    n = H.shape[-1]
+    if H.ndim == 1:
+        # Scalar fast path: a single simulation step, where call overhead dominates.
+        Hc = H - H.sum() / n
+        Mc = M - M.sum() / n
+        diff = H - M
+        hh, mm, hm = H.dot(H), M.dot(M), H.dot(M)
+        chh, cmm, chm = Hc.dot(Hc), Mc.dot(Mc), Hc.dot(Mc)
+        gamma = 1 - abs(hm / (math.sqrt(hh) * math.sqrt(mm)))
+        rho = min(1.0, max(-1.0, chm / math.sqrt(chh * cmm))) if chh > 0 and cmm > 0 else 0.0
+        return float(gamma), float(rho), math.sqrt(diff.dot(diff))
+
+    Hc = H - H.sum(axis=-1, keepdims=True) / n
+    Mc = M - M.sum(axis=-1, keepdims=True) / n
+    diff = H - M
+    dot = lambda a, b: np.einsum('...i,...i->...', a, b)
+    hh, mm, hm = dot(H, H), dot(M, M), dot(H, M)
+    chh, cmm, chm = dot(Hc, Hc), dot(Mc, Mc), dot(Hc, Mc)
+    gamma = 1 - np.abs(hm / (np.sqrt(hh) * np.sqrt(mm)))
+    valid = (chh > 0) & (cmm > 0)
+    rho = np.zeros_like(chm)
+    rho[valid] = np.clip(chm[valid] / np.sqrt(chh[valid] * cmm[valid]), -1.0, 1.0)
+    return gamma, rho, np.sqrt(dot(diff, diff))
+
+
 def gamma_t(H_t, M_t):
-    """Phase alignment: rhythmic synchrony of reasoning."""
-    return compute_phase_alignment(H_t, M_t)
+    """Phase alignment: rhythmic synchrony of reasoning. (dim,) → float, (T, dim) → (T,)."""
+    return fused_metrics(H_t, M_t)[0]
 
 def rho_t(H_t, M_t):
-    """Semantic similarity at time t."""
-    return compute_semantic_correlation(H_t, M_t)
+    """Semantic similarity at time t. (dim,) → float, (T, dim) → (T,)."""
+    return fused_metrics(H_t, M_t)[1]
 
 def d_t(H_t, M_t):
-    """Procrustes distance: structural shape difference."""
-    return compute_procrustes_distance(H_t, M_t)
+    """Procrustes distance: structural shape difference. (dim,) → float, (T, dim) → (T,)."""
+    return fused_metrics(H_t, M_t)[2]
 
 def alpha_t(gamma, rho, d):
     """Aggregate alignment metric."""
     return (gamma + rho) / (1 + d)
 
-def mu_t(H_meta, M_meta):
-    """Meta-cognitive depth estimation."""
-    return measure_metacognitive_nesting(H_meta, M_meta)
+def mu_t(H_meta, M_meta, dt=1.0):
+    """Meta-cognitive depth: μ(t) ∝ ∫₀ᵗ γ(τ) dτ over (T, dim) trajectories, trapezoid rule."""
+    return cumulative_integral(gamma_t(H_meta, M_meta), dt)
 
 def tau_t(prev_state, new_state):
-    """Transformational gain across cycle."""
-    return measure_state_difference(prev_state, new_state)
+    """Transformational gain across cycle: ‖new − prev‖ along the last axis."""
+    diff = np.asarray(new_state, dtype=float) - np.asarray(prev_state, dtype=float)
+    return np.sqrt(np.einsum('...i,...i->...', diff, diff))
 
 def delta_t(prev_alpha, curr_alpha):
     """Cognitive drift over time."""
     return abs(curr_alpha - prev_alpha)
+
+
+# --- Whole-trajectory series ---
+
+def cumulative_integral(series, dt=1.0):
+    """Running trapezoid integral of a (T,) series, starting at 0."""
+    series = np.asarray(series, dtype=float)
+    out = np.zeros_like(series)
+    if len(series) > 1:
+        np.cumsum((series[1:] + series[:-1]) * (0.5 * dt), out=out[1:])
+    return out
+
+def drift_series(alpha):
+    """δ(t) = |α(t) − α(t−1)| for every step, with δ(0) = 0."""
+    alpha = np.asarray(alpha, dtype=float)
+    return np.abs(np.diff(alpha, prepend=alpha[:1]))
+
+def alignment_series(H, M, dt=1.0, chunk_size=65536):
+    """
+    Every alignment metric for whole (T, dim) trajectories at once.
+
+    States are read in chunks of `chunk_size` steps, so `np.memmap` inputs (see
+    trajectory_store.py) are processed without loading the full run. Metrics are
+    computed from the stored states, not from the smoothed 'phase_sync' /
+    'semantic_corr' series that `simulate()` records.
+
+    Returns:
+        dict of (T,) arrays:
+            gamma, rho, d  per-step metrics from `fused_metrics`
+            alpha          (γ + ρ) / (1 + d)
+            delta          |α(t) − α(t−1)|
+            mu             ∫₀ᵗ γ dτ
+            tau            ‖H(t) − H(t−1)‖, the transformation rate of H
+    """
+    T = len(H)
+    gamma, rho, d, tau = (np.empty(T) for _ in range(4))
+    for start in range(0, T, chunk_size):
+        stop = min(start + chunk_size, T)
+        H_chunk = np.asarray(H[start:stop], dtype=float)
+        gamma[start:stop], rho[start:stop], d[start:stop] = fused_metrics(H_chunk, M[start:stop])
+        prev = np.asarray(H[max(start - 1, 0):stop - 1], dtype=float)
+        if start == 0:
+            prev = np.concatenate((H_chunk[:1], prev))
+        tau[start:stop] = tau_t(prev, H_chunk)
+
+    alpha = alpha_t(gamma, rho, d)
+    return {
+        'gamma': gamma,
+        'rho': rho,
+        'd': d,
+        'alpha': alpha,
+        'delta': drift_series(alpha),
+        'mu': cumulative_integral(gamma, dt),
+        'tau': tau,
+    }
@@ -2,7 +2,7 @@
 
 import numpy as np
 
-def inject_attractor(H, M, R, injection_timestep, current_timestep):
+def inject_attractor(H, M, R, injection_timestep, current_timestep, rng=None):
     """
     Inject controlled symbolic modulation at a defined timestep.
 
@@ -10,14 +10,229 @@ def inject_attractor(H, M, R, injection_timestep, current_timestep):
     - H, M, R: Current manifold states and reflection value
     - injection_timestep: When to apply injection
     - current_timestep: Simulation's current timestep
+    - rng: np.random.Generator to draw from (e.g. `model.rng`); a fresh unseeded
+      Generator if omitted
 
     Returns:
     - Modified H, M, R
     """
     if current_timestep == injection_timestep:
-        delta_H = np.random.normal(loc=0.1, scale=0.05, size=H.shape)
-        delta_M = np.random.normal(loc=-0.1, scale=0.05, size=M.shape)
+        rng = rng if rng is not None else np.random.default_rng()
+        delta_H = rng.normal(loc=0.1, scale=0.05, size=H.shape)
+        delta_M = rng.normal(loc=-0.1, scale=0.05, size=M.shape)
         H += delta_H
         M += delta_M
         R += 0.2  # symbolic boost to reflection
     return H, M, R
+
+
+TARGETS = ("H", "M", "R")
+
+
+class InjectionSchedule:
+    """
+    Attractor injections indexed by timestep.
+
+    One-shot injections live in a dict keyed by timestep, so looking up step t is
+    O(1) however many injections are scheduled. Recurring injections fire every
+    `every` steps inside an optional [start, stop) window. Each injection targets
+    H or M (a vector added to the state) or R (a scalar added to reflection), and
+    optionally a single ensemble member; member=None applies to every member.
+    """
+
+    def __init__(self):
+        self._events = {}      # t -> [(target, payload, member), ...]
+        self._recurring = []   # [(start, every, stop, target, payload, member), ...]
+        self._n_events = 0
+
+    @staticmethod
+    def _payload(target, vector, value):
+        if target not in TARGETS:
+            raise ValueError(f"Unknown injection target '{target}'")
+        if target == "R":
+            if value is None:
+                raise ValueError("An R injection needs a value")
+            return float(value)
+        if vector is None:
+            raise ValueError(f"An {target} injection needs a vector")
+        return np.asarray(vector, dtype=float)
+
+    def add(self, t, target, vector=None, value=None, member=None):
+        """Schedule a one-shot injection at timestep t."""
+        payload = self._payload(target, vector, value)
+        self._events.setdefault(int(t), []).append((target, payload, member))
+        self._n_events += 1
+
+    def add_recurring(self, target, start=0, every=1, stop=None, vector=None, value=None, member=None):
+        """Schedule an injection at start, start + every, ... up to (not including) stop."""
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        payload = self._payload(target, vector, value)
+        self._recurring.append((int(start), int(every), stop, target, payload, member))
+
+    def append(self, injection):
+        """Add an injection dict in the `RCDModel.add_attractor_injection` format."""
+        self.add(injection["t"], injection["target"], injection.get("vector"),
+                 injection.get("value"), injection.get("member"))
+
+    def at(self, t):
+        """All injections firing at timestep t as (target, payload, member) tuples."""
+        events = self._events.get(t, ())
+        if not self._recurring:
+            return events
+        events = list(events)
+        for start, every, stop, target, payload, member in self._recurring:
+            if t >= start and (stop is None or t < stop) and (t - start) % every == 0:
+                events.append((target, payload, member))
+        return events
+
+    def apply(self, model, t):
+        """Apply the injections due at t to a model exposing H, M and R; returns how many fired."""
+        events = self.at(t)
+        for target, payload, _ in events:
+            if target == "H":
+                model.H += payload
+            elif target == "M":
+                model.M += payload
+            else:
+                model.R += payload
+        return len(events)
+
+    def apply_batch(self, H, M, R, t):
+        """Apply the injections due at t to ensemble arrays H, M (N, dim) and R (N,) in place."""
+        for target, payload, member in self.at(t):
+            rows = slice(None) if member is None else member
+            if target == "H":
+                H[rows] += payload
+            elif target == "M":
+                M[rows] += payload
+            else:
+                R[rows] += payload
+
+    def times_between(self, start, stop):
+        """Sorted timesteps in [start, stop) at which any injection fires."""
+        steps = {t for t in self._events if start <= t < stop}
+        for first, every, end, *_ in self._recurring:
+            last = stop if end is None else min(stop, end)
+            lo = max(first, start)
+            lo = first + -(-(lo - first) // every) * every  # first firing at or after lo
+            steps.update(range(lo, last, every))
+        return sorted(steps)
+
+    def times(self):
+        """Sorted timesteps that have one-shot injections."""
+        return sorted(self._events)
+
+    def __len__(self):
+        return self._n_events + len(self._recurring)
+
+    def __repr__(self):
+        return f"InjectionSchedule(one_shot={self._n_events}, recurring={len(self._recurring)})"
+
+    # --- Bulk construction ---
+
+    @classmethod
+    def from_injections(cls, injections, member=None):
+        """From a list of `RCDModel.add_attractor_injection` dicts."""
+        schedule = cls()
+        for injection in injections:
+            schedule.add(injection["t"], injection["target"], injection.get("vector"),
+                         injection.get("value"), injection.get("member", member))
+        return schedule
+
+    @classmethod
+    def from_dict(cls, inject_schedule):
+        """From the `SimulationRunner` format, e.g. {10: {"R": 0.5}, 50: {"H": [0.2] * 10}}."""
+        schedule = cls()
+        for t, targets in inject_schedule.items():
+            for target, amount in targets.items():
+                if target == "R":
+                    schedule.add(t, target, value=amount)
+                else:
+                    schedule.add(t, target, vector=amount)
+        return schedule
+
+    @classmethod
+    def from_arrays(cls, t, target, vector=None, value=None, member=None):
+        """
+        From parallel arrays of length K: timesteps, targets ('H'/'M'/'R'), a (K, dim)
+        vector array (rows ignored for R), a (K,) value array (ignored for H/M) and a
+        (K,) member array where -1 means every member.
+        """
+        schedule = cls()
+        t = np.asarray(t, dtype=int)
+        target = np.asarray(target).astype(str)
+        member = np.full(len(t), -1) if member is None else np.asarray(member, dtype=int)
+        for k in range(len(t)):
+            schedule.add(t[k], str(target[k]),
+                         vector=None if vector is None else vector[k],
+                         value=None if value is None else value[k],
+                         member=None if member[k] < 0 else int(member[k]))
+        return schedule
+
+    @classmethod
+    def load(cls, path):
+        """From an .npz file written by `save`."""
+        with np.load(path) as data:
+            return cls.from_saved(data)
+
+    @classmethod
+    def from_saved(cls, data):
+        """
+        From the arrays of `to_arrays` (or an opened .npz): keys t, target and optionally
+        vector, value, member, plus the same keys prefixed 'recurring_' together with
+        recurring_start, recurring_every and recurring_stop (-1 for open-ended).
+        """
+        schedule = cls.from_arrays(data["t"], data["target"],
+                                   vector=data["vector"] if "vector" in data else None,
+                                   value=data["value"] if "value" in data else None,
+                                   member=data["member"] if "member" in data else None)
+        if "recurring_start" in data:
+            for k in range(len(data["recurring_start"])):
+                stop, member = int(data["recurring_stop"][k]), int(data["recurring_member"][k])
+                schedule.add_recurring(str(data["recurring_target"][k]),
+                                       start=int(data["recurring_start"][k]),
+                                       every=int(data["recurring_every"][k]),
+                                       stop=None if stop < 0 else stop,
+                                       vector=data["recurring_vector"][k],
+                                       value=data["recurring_value"][k],
+                                       member=None if member < 0 else member)
+        return schedule
+
+    def to_arrays(self):
+        """One-shot and recurring injections as parallel arrays (see `from_saved`)."""
+        rows = [(t, target, payload, member) for t in self.times()
+                for target, payload, member in self._events[t]]
+        recurring = [(target, payload, member) for *_, target, payload, member in self._recurring]
+        dims = {len(p) for _, target, p, _ in rows if target != "R"}
+        dims |= {len(p) for target, p, _ in recurring if target != "R"}
+        if len(dims) > 1:
+            raise ValueError("Cannot save injections with mixed vector dimensions")
+        dim = dims.pop() if dims else 0
+
+        def columns(entries):
+            vector = np.zeros((len(entries), dim))
+            value = np.zeros(len(entries))
+            for k, (target, payload, _) in enumerate(entries):
+                if target == "R":
+                    value[k] = payload
+                else:
+                    vector[k] = payload
+            return {
+                "target": np.array([e[0] for e in entries], dtype=str),
+                "vector": vector,
+                "value": value,
+                "member": np.array([-1 if e[2] is None else e[2] for e in entries], dtype=int),
+            }
+
+        arrays = {"t": np.array([r[0] for r in rows], dtype=int)}
+        arrays.update(columns([r[1:] for r in rows]))
+        arrays.update({"recurring_" + key: col for key, col in columns(recurring).items()})
+        arrays["recurring_start"] = np.array([r[0] for r in self._recurring], dtype=int)
+        arrays["recurring_every"] = np.array([r[1] for r in self._recurring], dtype=int)
+        arrays["recurring_stop"] = np.array([-1 if r[2] is None else r[2] for r in self._recurring], dtype=int)
+        return arrays
+
+    def save(self, path):
+        """Write every injection, one-shot and recurring, to an .npz file."""
+        np.savez(path, **self.to_arrays())
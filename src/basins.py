@@ -0,0 +1,243 @@
+"""
+Module: basins.py
+Purpose: Attractor basins of a SymbolicManifold curvature map, kept up to date per event.
+
+Curvature peaks are attractors. Every cell above `floor` points to its steepest
+ascending 8-neighbour (ties broken by the lower flat index, so flat plateaus drain to
+one cell); cells that point to themselves are peaks, and a basin is every cell
+whose ascent path ends at the same peak, a watershed by steepest ascent. Cells at or
+below `floor` (by default the untouched baseline curvature) belong to no basin.
+A basin's id is the flat index of its peak.
+
+`BasinIndex` registers as an observer of its manifold. After each reconciliation
+event it recomputes the ascent pointers of the cells around the event's bounding
+box, relabels only the cells whose ascent path passes through them, and adjusts the
+per-basin statistics by the difference, so queries after every event cost time in
+proportion to the disturbed area rather than the grid.
+"""
+
+import numpy as np
+
+_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+BASIN_STATS = np.dtype([('basin', '<i8'), ('peak_x', '<i8'), ('peak_y', '<i8'), ('peak', '<f8'),
+                        ('area', '<i8'), ('mass', '<f8'), ('mean', '<f8')])
+
+
+def local_extrema(values, kind='max', floor=None):
+    """
+    (x, y) coordinates of cells no lower ('max') or no higher ('min') than any of their
+    8 neighbours. With `floor`, maxima at or below it (and minima at or above it) are
+    dropped, e.g. to ignore the flat baseline.
+    """
+    values = np.asarray(values, dtype=float)
+    sign = 1.0 if kind == 'max' else -1.0
+    padded = np.pad(sign * values, 1, constant_values=-np.inf)
+    H, W = values.shape
+    keep = np.ones(values.shape, dtype=bool)
+    for dx, dy in _OFFSETS:
+        keep &= sign * values >= padded[1 + dx:1 + dx + H, 1 + dy:1 + dy + W]
+    if floor is not None:
+        keep &= sign * values > sign * floor
+    return np.argwhere(keep)
+
+
+class BasinIndex:
+    def __init__(self, manifold, floor=None, level=0, attach=True):
+        """
+        Args:
+            manifold (SymbolicManifold): Source of the curvature map.
+            floor (float): Cells at or below it are outside every basin; defaults to
+                the manifold's curvature bias.
+            level (int): Pyramid level to analyse (see `get_phase_basin_map`).
+            attach (bool): Follow the manifold's reconciliation events incrementally.
+        """
+        self.manifold = manifold
+        self.level = level
+        self.floor = manifold.curvature_bias if floor is None else floor
+        self.values = np.array(manifold.get_phase_basin_map(level), dtype=float)
+        self.shape = self.values.shape
+        size = self.values.size
+        self._itype = np.int32 if size < 2 ** 31 else np.int64
+        self._flat = self.values.reshape(-1)
+        self.parent = np.empty(size, dtype=self._itype)
+        self.labels = np.empty(size, dtype=self._itype)
+        self._scratch = np.zeros(size, dtype=bool)   # reused "affected" mask, kept all False
+        self.rebuild()
+        if attach:
+            manifold.observers.append(self)
+
+    # --- Construction ---
+
+    def _ascent(self, idx):
+        """Steepest-ascent parent of each flat index in `idx` (-1 at or below the floor)."""
+        H, W = self.shape
+        x, y = np.divmod(idx, W)
+        best = idx.copy()
+        best_val = self._flat[idx]
+        for dx, dy in _OFFSETS:
+            nx, ny = x + dx, y + dy
+            ok = (nx >= 0) & (nx < H) & (ny >= 0) & (ny < W)
+            nb = np.where(ok, nx * W + ny, 0)
+            val = np.where(ok, self._flat[nb], -np.inf)
+            better = (val > best_val) | ((val == best_val) & (nb < best) & ok)
+            best = np.where(better, nb, best)
+            best_val = np.where(better, val, best_val)
+        return np.where(self._flat[idx] > self.floor, best, -1).astype(self._itype)
+
+    def rebuild(self):
+        """Label the whole map from scratch and recompute every basin statistic."""
+        size = self.values.size
+        self.parent[:] = self._ascent(np.arange(size))
+        labels = self.parent.copy()
+        inside = labels >= 0
+        while True:   # pointer doubling: path lengths halve every pass
+            nxt = labels.copy()
+            nxt[inside] = labels[labels[inside]]
+            if np.array_equal(nxt, labels):
+                break
+            labels = nxt
+        self.labels[:] = labels
+        self._area = {}
+        self._mass = {}
+        self._accumulate(np.flatnonzero(inside), +1)
+
+    def _accumulate(self, idx, sign, values=None):
+        """Add (sign=+1) or remove (-1) the contribution of cells `idx` to their basins."""
+        labels = self.labels[idx]
+        values = self._flat[idx] if values is None else values
+        keep = labels >= 0
+        if not keep.any():
+            return
+        basins, inverse = np.unique(labels[keep], return_inverse=True)
+        area = np.bincount(inverse)
+        mass = np.bincount(inverse, weights=values[keep] - self.floor)
+        for b, a, m in zip(basins.tolist(), area.tolist(), mass.tolist()):
+            a = self._area.get(b, 0) + sign * a
+            if a:
+                self._area[b] = a
+                self._mass[b] = self._mass.get(b, 0.0) + sign * m
+            else:
+                self._area.pop(b, None)
+                self._mass.pop(b, None)
+
+    # --- Incremental update ---
+
+    def region_changed(self, boxes):
+        """
+        Refresh after the curvature changed inside `boxes`, an array of rows
+        (x_lo, x_hi, y_lo, y_hi) in grid cells (the manifold calls this).
+        """
+        boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        if len(boxes) == 0:
+            return
+        if self.level:
+            boxes = np.c_[boxes[:, 0] >> self.level, ((boxes[:, 1] - 1) >> self.level) + 1,
+                          boxes[:, 2] >> self.level, ((boxes[:, 3] - 1) >> self.level) + 1]
+        H, W = self.shape
+        area = np.sum((boxes[:, 1] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 2]))
+        if area > self.values.size // 4:
+            self.values[:] = self.manifold.get_phase_basin_map(self.level)
+            self.rebuild()
+            return
+
+        boxes = [(max(x_lo, 0), min(x_hi, H), max(y_lo, 0), min(y_hi, W)) for x_lo, x_hi, y_lo, y_hi in boxes.tolist()]
+        boxes = [box for box in boxes if box[0] < box[1] and box[2] < box[3]]
+        if not boxes:
+            return
+        cells = lambda x_lo, x_hi, y_lo, y_hi: np.add.outer(np.arange(x_lo, x_hi) * W, np.arange(y_lo, y_hi)).ravel()
+        written = np.unique(np.concatenate([cells(*box) for box in boxes]))
+        # Neighbours of written cells see new values, so their pointers may change too.
+        near = np.unique(np.concatenate([cells(max(x_lo - 1, 0), min(x_hi + 1, H), max(y_lo - 1, 0), min(y_hi + 1, W))
+                                         for x_lo, x_hi, y_lo, y_hi in boxes]))
+        old_values = self._flat[written].copy()
+        for x_lo, x_hi, y_lo, y_hi in boxes:
+            self.values[x_lo:x_hi, y_lo:y_hi] = self.manifold.get_region(x_lo, x_hi, y_lo, y_hi, self.level)
+        self.parent[near] = self._ascent(near)
+
+        # Cells whose ascent path passes through `near`: walk the ascent tree downhill from it.
+        affected = self._scratch
+        affected[near] = True
+        found = [near]
+        frontier = near
+        while len(frontier):
+            x, y = np.divmod(frontier, W)
+            candidates = []
+            for dx, dy in _OFFSETS:
+                nx, ny = x + dx, y + dy
+                ok = (nx >= 0) & (nx < H) & (ny >= 0) & (ny < W)
+                candidates.append((nx * W + ny)[ok])
+            candidates = np.unique(np.concatenate(candidates))
+            candidates = candidates[~affected[candidates]]
+            parents = self.parent[candidates]
+            frontier = candidates[(parents >= 0) & affected[np.maximum(parents, 0)]]
+            affected[frontier] = True
+            found.append(frontier)
+        idx = np.sort(np.concatenate(found))
+
+        before = self._flat[idx].copy()
+        before[np.searchsorted(idx, written)] = old_values
+        self._accumulate(idx, -1, before)
+
+        # Follow pointers until the path leaves the affected cells (whose labels are
+        # still valid) or reaches a peak inside them.
+        cur = self.parent[idx].astype(np.int64)
+        live = cur >= 0
+        while True:
+            pending = live.copy()
+            pending[live] = affected[cur[live]] & (self.parent[cur[live]] != cur[live])
+            if not pending.any():
+                break
+            cur[pending] = self.parent[cur[pending]]
+        new = np.full(len(idx), -1, dtype=self._itype)
+        new[live] = np.where(affected[cur[live]], cur[live], self.labels[cur[live]])
+        self.labels[idx] = new
+        self._accumulate(idx, +1)
+        affected[idx] = False
+
+    # --- Queries ---
+
+    def basin_at(self, x, y):
+        """Id of the basin containing cell (x, y) (level coordinates), or -1 if none."""
+        return int(self.labels[int(x) * self.shape[1] + int(y)])
+
+    def peak(self, basin):
+        """(x, y) of a basin's peak."""
+        return divmod(int(basin), self.shape[1])
+
+    def __len__(self):
+        return len(self._area)
+
+    def stats(self, basins=None):
+        """
+        BASIN_STATS records (peak location and value, area, mass = Σ(curvature − floor),
+        mean curvature) for `basins`, or for every basin.
+        """
+        basins = np.fromiter(self._area if basins is None else basins, dtype=np.int64)
+        out = np.zeros(len(basins), dtype=BASIN_STATS)
+        out['basin'] = basins
+        out['peak_x'], out['peak_y'] = np.divmod(basins, self.shape[1])
+        out['peak'] = self._flat[basins]
+        out['area'] = [self._area.get(b, 0) for b in basins.tolist()]
+        out['mass'] = [self._mass.get(b, 0.0) for b in basins.tolist()]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out['mean'] = out['mass'] / out['area'] + self.floor
+        return out
+
+    def top_k(self, k=5, by='peak'):
+        """The k strongest attractors by 'peak' value, 'mass' or 'area', strongest first."""
+        table = self.stats()
+        if len(table) > k:
+            table = table[np.argpartition(-table[by], k - 1)[:k]]
+        return table[np.argsort(-table[by], kind='stable')]
+
+    def basin_mask(self, basin, region=None):
+        """Boolean map of one basin's cells, optionally within (x_lo, x_hi, y_lo, y_hi)."""
+        labels = self.labels.reshape(self.shape)
+        if region is not None:
+            x_lo, x_hi, y_lo, y_hi = region
+            labels = labels[x_lo:x_hi, y_lo:y_hi]
+        return labels == basin
+
+    def detach(self):
+        if self in self.manifold.observers:
+            self.manifold.observers.remove(self)
@@ -0,0 +1,155 @@
+"""
+Module: downsample.py
+Purpose: Bounded-size decimation of series that arrive in chunks, for live plotting.
+
+`StreamDecimator` keeps every `stride`-th step of each series, starting at step 0.
+Whenever more than `max_points` steps are held, every other one is dropped and the
+stride doubles, so however long the run the kept points stay between
+max_points / 2 and max_points, evenly spaced, and a chart redraw never sends more
+than that to the browser. Kept steps never change once chosen, which lets a chart
+be redrawn after every chunk without points jumping around.
+
+`lttb` is Largest-Triangle-Three-Buckets, which picks the points that keep a
+series' visual shape (peaks, dips) rather than evenly spaced ones. `StreamLTTB`
+applies it to series of unknown length in bounded memory, MinMaxLTTB-style: the
+stream is reduced on the fly to the minimum and maximum of each bin of
+`bin_width` steps (the bin width doubles as the run grows, which keeps the
+extrema of the merged bins exact), and LTTB runs on those candidates when the
+series is read.
+"""
+
+import numpy as np
+
+
+class StreamDecimator:
+    def __init__(self, max_points=2000):
+        """
+        Args:
+            max_points (int): Upper bound on the steps held per series (at least 2).
+        """
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2")
+        self.max_points = max_points
+        self.stride = 1
+        self.n_seen = 0
+        self.t = np.empty(0, dtype=np.int64)
+        self.columns = {}
+
+    def extend(self, start, columns):
+        """
+        Add steps [start, start + n) of each series in `columns`, a dict of arrays with
+        one row per step, such as (n,) metrics or (n, dim) states.
+
+        Chunks should arrive in order; every call must pass the same series names.
+        """
+        columns = {name: np.asarray(values) for name, values in columns.items()}
+        n = len(next(iter(columns.values())))
+        first = -start % self.stride     # first step in the chunk on the current stride
+        self.t = np.concatenate([self.t, np.arange(start + first, start + n, self.stride)])
+        for name, values in columns.items():
+            held = self.columns.get(name, values[:0])
+            self.columns[name] = np.concatenate([held, values[first::self.stride]])
+        self.n_seen = max(self.n_seen, start + n)
+
+        while len(self.t) > self.max_points:
+            self.stride *= 2
+            keep = self.t % self.stride == 0
+            self.t = self.t[keep]
+            self.columns = {name: values[keep] for name, values in self.columns.items()}
+
+    def series(self):
+        """(t, columns): kept step indices and a dict of the matching values."""
+        return self.t, dict(self.columns)
+
+    def chart_data(self, *names):
+        """Dict of the kept points with a 't' column, ready for `st.line_chart(data, x='t')`."""
+        data = {'t': self.t}
+        data.update((name, self.columns[name]) for name in (names or self.columns))
+        return data
+
+    def __len__(self):
+        return len(self.t)
+
+    def __repr__(self):
+        return f"StreamDecimator(points={len(self.t)}/{self.max_points}, stride={self.stride}, seen={self.n_seen})"
+
+
+def lttb(x, y, n_out):
+    """
+    Indices of `n_out` points of the series (x, y) chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points between are split into
+    n_out - 2 equal buckets; each contributes the point forming the largest triangle
+    with the previously chosen point and the mean of the next bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("n_out must be at least 3")
+    every = (n - 2) / (n_out - 2)
+    bounds = np.append(np.floor(np.arange(n_out - 1) * every).astype(np.intp) + 1, n)
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi, next_hi = bounds[i], bounds[i + 1], bounds[i + 2]
+        cx, cy = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+class StreamLTTB:
+    def __init__(self, max_points=2000, candidates_per_point=4):
+        """
+        Args:
+            max_points (int): Points returned by `series()` (at least 3).
+            candidates_per_point (int): Min/max candidates kept per output point;
+                more gives LTTB more to choose from at some memory cost.
+        """
+        if max_points < 3:
+            raise ValueError("max_points must be at least 3")
+        self.max_points = max_points
+        self.max_candidates = candidates_per_point * max_points
+        self.bin_width = 1
+        self.n_seen = 0
+        self.t = np.empty(0, dtype=np.int64)
+        self.y = np.empty(0)
+
+    def extend(self, start, values):
+        """Add steps [start, start + n) of the series; chunks must arrive in order."""
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        self.n_seen = max(self.n_seen, start + len(values))
+        while -(-self.n_seen // self.bin_width) * 2 > self.max_candidates:
+            self.bin_width *= 2
+        t, y = self._extrema(np.arange(start, start + len(values)), values)
+        self.t = np.concatenate([self.t, t])
+        self.y = np.concatenate([self.y, y])
+        if len(self.t) > 2 * self.max_candidates:   # the bins widened: merge old candidates
+            self.t, self.y = self._extrema(self.t, self.y)
+
+    def _extrema(self, t, y):
+        """Each bin's first minimum and first maximum in (t, y), plus the two end points."""
+        bins = t // self.bin_width
+        cuts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        segment = np.repeat(np.arange(len(cuts)), np.diff(np.r_[cuts, len(t)]))
+        keep = np.zeros(len(t), dtype=bool)
+        for extreme in (np.minimum.reduceat(y, cuts), np.maximum.reduceat(y, cuts)):
+            hits = np.flatnonzero(y == extreme[segment])
+            keep[hits[np.r_[True, segment[hits][1:] != segment[hits][:-1]]]] = True
+        keep[[0, -1]] = True
+        return t[keep], y[keep]
+
+    def series(self):
+        """(t, values): at most `max_points` points of the series chosen by LTTB."""
+        index = lttb(self.t, self.y, self.max_points)
+        return self.t[index], self.y[index]
+
+    def __repr__(self):
+        return f"StreamLTTB(candidates={len(self.t)}, bin_width={self.bin_width}, seen={self.n_seen})"
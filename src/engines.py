@@ -0,0 +1,290 @@
+"""
+Module: engines.py
+Purpose: Alternate stepping engines for `RCDModel.simulate` / `RCDModel.advance`.
+
+Without noise the H/M update is a fixed linear map on every coordinate. With coupling c,
+    H' = (1 - c) H + c M
+    M' = (1 - c) M + c H' = c (1 - c) H + (1 - c + c²) M
+whose eigenvalues are 1 and (1 - c)². R only scales the noise, so in noise-free runs
+H and M never depend on R, and R itself follows the linear recurrence
+    R' = R + rate (γ̄ + ρ̄ - R)
+with γ̄, ρ̄ the smoothed metrics of the (now known) states.
+
+Engines:
+    'reference'    RCDModel's own per-step Python loop.
+    'closed_form'  Noise-free segments (noise_scale == 0) jump exactly through the
+                   eigen-decomposition; metrics, smoothing and R are vectorized over the
+                   whole segment. Stochastic segments fall back to the 'compiled' loop.
+    'compiled'     Noise and reactivation draws are taken in bulk and one inner loop
+                   advances the segment, JIT-compiled with numba when it is installed and
+                   a NumPy loop otherwise.
+
+Runs are split into segments at injection timesteps, so scheduled injections apply
+exactly as in the reference loop. The closed form does not consume the noise stream
+(its draws would be multiplied by zero); every other stream is consumed identically.
+Use `compare_engines` to check an engine against the reference loop.
+"""
+
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .alignment_metrics import fused_metrics
+
+ENGINES = ('reference', 'closed_form', 'compiled')
+CHUNK = 65536  # steps materialized at once; bounds memory for very long segments
+
+
+# --- Closed form ---
+
+def step_matrix(coupling):
+    """The noise-free (H, M) → (H', M') map applied to every coordinate."""
+    c = coupling
+    return np.array([[1 - c, c], [c * (1 - c), 1 - c + c * c]])
+
+
+def propagate(H0, M0, n_steps, coupling=0.05):
+    """Noise-free (H, M) after `n_steps`, by exact matrix power in O(log n) products."""
+    A = np.linalg.matrix_power(step_matrix(coupling), int(n_steps))
+    return A[0, 0] * H0 + A[0, 1] * M0, A[1, 0] * H0 + A[1, 1] * M0
+
+
+def _trajectory(H0, M0, n, coupling):
+    """Noise-free states for steps 0..n (n + 1 rows) from the eigen-decomposition."""
+    w, V = np.linalg.eig(step_matrix(coupling))
+    powers = w[None, :] ** np.arange(n + 1)[:, None]
+    A = np.einsum('ij,kj,jl->kil', V, powers, np.linalg.inv(V)).real
+    H = A[:, 0, 0, None] * H0 + A[:, 0, 1, None] * M0
+    M = A[:, 1, 0, None] * H0 + A[:, 1, 1, None] * M0
+    return H, M
+
+
+def _reflection(R0, s, rate, block=64):
+    """R_k for k = 0..n with R_{k+1} = R_k + rate (s_k - R_k), in vectorized blocks."""
+    n = len(s)
+    out = np.empty(n + 1)
+    out[0] = R0
+    a = 1.0 - rate
+    if a == 0.0:
+        out[1:] = s
+        return out
+    # Within a block: R_j = a^j R_0 + rate Σ_{i<j} a^(j-1-i) s_i. Short blocks keep a^-j tame.
+    powers = a ** np.arange(1, block + 1)
+    for start in range(0, n, block):
+        seg = s[start:start + block]
+        m = len(seg)
+        acc = np.cumsum(rate * seg / powers[:m])
+        out[start + 1:start + m + 1] = powers[:m] * out[start] + powers[:m] * acc
+    return out
+
+
+def _smooth(buffer, raw):
+    """Windowed means the buffer would return for each raw value; leaves the buffer updated."""
+    w = buffer.capacity
+    prior = buffer.values()
+    seq = np.concatenate((prior, raw))
+    sums = sliding_window_view(np.concatenate((np.zeros(w - 1), seq)), w).sum(axis=1)[len(prior):]
+    counts = np.minimum(np.arange(len(prior) + 1, len(seq) + 1), w)
+    buffer.clear()
+    for value in seq[-w:]:
+        buffer.append(value)
+    return sums / counts
+
+
+def _boosts(model, n):
+    """Reactivation boosts for n steps, drawn exactly as `maybe_stochastic_reactivation` does."""
+    events = model._events.take(3 * n).reshape(n, 3)
+    hit = events[:, 0] < model.reactivation_prob
+    boost = 0.5 + 0.5 * events[:, 2]
+    gamma_boost = np.where(hit & (events[:, 1] < 0.5), boost, 0.0)
+    rho_boost = np.where(hit & (events[:, 1] >= 0.5), boost, 0.0)
+    return gamma_boost, rho_boost
+
+
+def _closed_form_segment(model, n, results):
+    for start in range(0, n, CHUNK):
+        m = min(CHUNK, n - start)
+        H, M = _trajectory(model.H, model.M, m, model.coupling)
+        gamma, rho, d = fused_metrics(H[:-1], M[:-1])
+        gamma_boost, rho_boost = _boosts(model, m)
+        gamma = _smooth(model.gamma_buffer, gamma + gamma_boost)
+        rho = _smooth(model.rho_buffer, rho + rho_boost)
+        R = _reflection(model.R, gamma + rho, model.reflection_rate)
+        if results is not None:
+            results.extend(H[:-1], M[:-1], gamma, rho, d, R[:-1])
+        model.H, model.M, model.R = H[-1].copy(), M[-1].copy(), float(R[-1])
+
+
+# --- Compiled loop for stochastic segments ---
+
+def _stochastic_loop(H, M, R, noise, gamma_boost, rho_boost, gamma_win, rho_win, count, head,
+                     coupling, noise_scale, rate, out_H, out_M, out_gamma, out_rho, out_d, out_R):
+    """Scalar inner loop, written for numba.njit; H, M and the windows are updated in place."""
+    n, dim = out_H.shape
+    w = gamma_win.shape[0]
+    for k in range(n):
+        sh = 0.0
+        sm = 0.0
+        for i in range(dim):
+            sh += H[i]
+            sm += M[i]
+        mean_h = sh / dim
+        mean_m = sm / dim
+        hh = mm = hm = chh = cmm = chm = dd = 0.0
+        for i in range(dim):
+            h = H[i]
+            m = M[i]
+            hh += h * h
+            mm += m * m
+            hm += h * m
+            hc = h - mean_h
+            mc = m - mean_m
+            chh += hc * hc
+            cmm += mc * mc
+            chm += hc * mc
+            dd += (h - m) * (h - m)
+        gamma = 1.0 - abs(hm / (math.sqrt(hh) * math.sqrt(mm)))
+        rho = 0.0
+        if chh > 0.0 and cmm > 0.0:
+            rho = min(1.0, max(-1.0, chm / math.sqrt(chh * cmm)))
+        gamma += gamma_boost[k]
+        rho += rho_boost[k]
+
+        gamma_win[head] = gamma
+        rho_win[head] = rho
+        head = (head + 1) % w
+        if count < w:
+            count += 1
+        gs = 0.0
+        rs = 0.0
+        for j in range(count):
+            gs += gamma_win[j]
+            rs += rho_win[j]
+        gamma = gs / count
+        rho = rs / count
+
+        for i in range(dim):
+            out_H[k, i] = H[i]
+            out_M[k, i] = M[i]
+        out_gamma[k] = gamma
+        out_rho[k] = rho
+        out_d[k] = math.sqrt(dd)
+        out_R[k] = R
+
+        for i in range(dim):
+            H[i] = H[i] + coupling * (M[i] - H[i]) + R * noise[k, 0, i] * noise_scale
+        for i in range(dim):
+            M[i] = M[i] + coupling * (H[i] - M[i]) + R * noise[k, 1, i] * noise_scale
+        R = R + rate * (gamma + rho - R)
+    return R, count, head
+
+
+def _stochastic_numpy(H, M, R, noise, gamma_boost, rho_boost, gamma_win, rho_win, count, head,
+                      coupling, noise_scale, rate, out_H, out_M, out_gamma, out_rho, out_d, out_R):
+    """Pure-NumPy fallback with the same contract as `_stochastic_loop`."""
+    w = gamma_win.shape[0]
+    for k in range(out_H.shape[0]):
+        gamma, rho, d = fused_metrics(H, M)
+        gamma_win[head] = gamma + gamma_boost[k]
+        rho_win[head] = rho + rho_boost[k]
+        head = (head + 1) % w
+        count = min(count + 1, w)
+        gamma = gamma_win[:count].sum() / count
+        rho = rho_win[:count].sum() / count
+
+        out_H[k] = H
+        out_M[k] = M
+        out_gamma[k] = gamma
+        out_rho[k] = rho
+        out_d[k] = d
+        out_R[k] = R
+
+        H += coupling * (M - H) + R * noise[k, 0] * noise_scale
+        M += coupling * (H - M) + R * noise[k, 1] * noise_scale
+        R = R + rate * (gamma + rho - R)
+    return R, count, head
+
+
+_stochastic_kernel = None
+
+
+def stochastic_kernel():
+    """
+    The compiled engine's inner loop, built on first use so that importing this
+    module does not import numba: numba-jitted if installed, else the NumPy loop.
+    """
+    global _stochastic_kernel
+    if _stochastic_kernel is None:
+        try:
+            import numba
+        except ImportError:  # optional: the NumPy loop is used instead
+            _stochastic_kernel = _stochastic_numpy
+        else:
+            _stochastic_kernel = numba.njit(cache=True)(_stochastic_loop)
+    return _stochastic_kernel
+
+
+def _compiled_segment(model, n, results, kernel=None):
+    kernel = kernel or stochastic_kernel()
+    dim = model.dim
+    H = np.array(model.H, dtype=float)
+    M = np.array(model.M, dtype=float)
+    R = float(model.R)
+
+    w = model.gamma_buffer.capacity
+    gamma_win, rho_win = np.zeros(w), np.zeros(w)
+    prior_gamma, prior_rho = model.gamma_buffer.values(), model.rho_buffer.values()
+    count = len(prior_gamma)
+    gamma_win[:count], rho_win[:count] = prior_gamma, prior_rho
+    head = count % w
+
+    for start in range(0, n, CHUNK):
+        m = min(CHUNK, n - start)
+        noise = model._noise.take(2 * dim * m).reshape(m, 2, dim)
+        gamma_boost, rho_boost = _boosts(model, m)
+        out_H, out_M = np.empty((m, dim)), np.empty((m, dim))
+        out_gamma, out_rho, out_d, out_R = np.empty(m), np.empty(m), np.empty(m), np.empty(m)
+        R, count, head = kernel(H, M, R, noise, gamma_boost, rho_boost, gamma_win, rho_win, count, head,
+                                model.coupling, model.noise_scale, model.reflection_rate,
+                                out_H, out_M, out_gamma, out_rho, out_d, out_R)
+        if results is not None:
+            results.extend(out_H, out_M, out_gamma, out_rho, out_d, out_R)
+
+    model.H, model.M, model.R = H, M, float(R)
+    ordered = slice(None, count) if count < w else np.r_[head:w, 0:head]
+    for buffer, window in ((model.gamma_buffer, gamma_win), (model.rho_buffer, rho_win)):
+        buffer.clear()
+        for value in window[ordered]:
+            buffer.append(value)
+
+
+# --- Driver ---
+
+def run_engine(model, n_steps, results=None, engine='compiled'):
+    """Advance `model` by `n_steps` from `model.t`, splitting the run at injection steps."""
+    if model.gamma_buffer.capacity != model.memory_window:
+        model.gamma_buffer = model.gamma_buffer.resized(model.memory_window)
+        model.rho_buffer = model.rho_buffer.resized(model.memory_window)
+
+    start, stop = model.t, model.t + n_steps
+    schedule = model.attractor_injections
+    cuts = [start] + [t for t in schedule.times_between(start, stop) if t > start] + [stop]
+    for t0, t1 in zip(cuts[:-1], cuts[1:]):
+        schedule.apply(model, t0)
+        if engine == 'closed_form' and model.noise_scale == 0:
+            _closed_form_segment(model, t1 - t0, results)
+        else:
+            _compiled_segment(model, t1 - t0, results)
+    model.t = stop
+
+
+def compare_engines(engine, n_timesteps=1000, dim=10, seed=0, noise_scale=None):
+    """Max absolute deviation of `engine` from the reference loop for each result key."""
+    from .rcd_model import RCDModel
+
+    reference, candidate = RCDModel(dim=dim, seed=seed), RCDModel(dim=dim, seed=seed)
+    if noise_scale is not None:
+        reference.noise_scale = candidate.noise_scale = noise_scale
+    expected = reference.simulate(n_timesteps, engine='reference')
+    actual = candidate.simulate(n_timesteps, engine=engine)
+    return {key: float(np.max(np.abs(expected[key] - actual[key]))) for key in expected}
@@ -0,0 +1,228 @@
+"""
+Module: ensemble.py
+Purpose: Batched RCD engine that advances N independent H/M runs in lockstep.
+
+Each ensemble member reproduces `RCDModel(dim=dim, seed=seed).simulate(n_timesteps)`
+for its own seed, but one step updates every member at once with vectorized NumPy
+instead of one Python-level H/M update per run. Members own the same per-purpose
+Generator streams as `RCDModel` (see rng.py), so every member consumes exactly the
+same random draws and its trajectory matches the single run to rounding error.
+"""
+
+import inspect
+import numpy as np
+
+from .rcd_model import RCDModel
+from .ring_buffer import RingBuffer
+from .rng import spawn_streams
+from .alignment_metrics import fused_metrics
+from .attractor_injection import InjectionSchedule
+from .stopping import as_monitor
+
+# Dimension `RCDModel(seed=s)` draws its first manifolds at, before set_parameters().
+_MODEL_DIM = inspect.signature(RCDModel.__init__).parameters['dim'].default
+
+
+class RCDEnsemble:
+    def __init__(self, seeds, dim=10, alpha=0.5, beta=0.1, delta=0.05, noise_level=0.01,
+                 injections=None, window=5, reactivation_prob=None, block_size=256, set_parameters=False):
+        """
+        Args:
+            seeds (sequence): One int or SeedSequence per ensemble member.
+            dim (int): Manifold dimension shared by all members.
+            alpha, beta, delta, noise_level (float or sequence): Per-member parameters,
+                recorded as `RCDModel.set_parameters` does. The update rules do not
+                read them yet, exactly as in `RCDModel`.
+            injections: Either an `InjectionSchedule` (entries with member=None apply
+                to every member) or one list per member of dicts in the
+                `RCDModel.add_attractor_injection` format.
+            window (int): Memory buffer window for γ/ρ smoothing.
+            reactivation_prob (float): Stochastic reactivation probability per step;
+                defaults to `RCDModel.reactivation_prob`.
+            block_size (int): Number of steps of noise pre-drawn per member at once.
+            set_parameters (bool): Reproduce `RCDModel(seed=s)` configured with
+                `set_parameters(..., n_dimensions=dim)` and then simulated, as the apps
+                and sweep.py run it, instead of `RCDModel(dim=dim, seed=s)`. The two
+                start from different manifolds because set_parameters() redraws them.
+        """
+        self.seeds = list(seeds)
+        self.n_members = len(self.seeds)
+        self.dim = dim
+        self.window = window
+        self.reactivation_prob = RCDModel.reactivation_prob if reactivation_prob is None else reactivation_prob
+        self.block_size = block_size
+        self.set_parameters = set_parameters
+        self.params = {
+            'alpha': self._broadcast(alpha),
+            'beta': self._broadcast(beta),
+            'delta': self._broadcast(delta),
+            'noise_level': self._broadcast(noise_level),
+        }
+        if isinstance(injections, InjectionSchedule):
+            self.injections = injections
+        else:
+            self.injections = InjectionSchedule()
+            if injections is not None:
+                if len(injections) != self.n_members:
+                    raise ValueError("injections must provide one schedule per ensemble member")
+                for i, schedule in enumerate(injections):
+                    for injection in schedule:
+                        self.injections.add(injection["t"], injection["target"], injection.get("vector"),
+                                            injection.get("value"), member=i)
+
+    def _broadcast(self, value):
+        arr = np.broadcast_to(np.asarray(value, dtype=float), (self.n_members,))
+        return arr.copy()
+
+    def initialize_manifolds(self):
+        """Seed every member and draw H, M the same way `RCDModel` does."""
+        self._streams = [spawn_streams(s) for s in self.seeds]
+        self.H = np.empty((self.n_members, self.dim))
+        self.M = np.empty((self.n_members, self.dim))
+        # RCDModel.__init__ draws once and simulate() draws again; set_parameters() draws
+        # in between, after __init__ drew at the default dimension.
+        skip = 2 * (_MODEL_DIM + self.dim) if self.set_parameters else 2 * self.dim
+        for i, streams in enumerate(self._streams):
+            init = streams['init'].standard_normal(skip + 2 * self.dim)
+            self.H[i], self.M[i] = init[skip:].reshape(2, self.dim)
+        self.R = np.full(self.n_members, 0.1)
+        self.t = 0
+        self._gamma_window = RingBuffer(self.window, shape=(self.n_members,))
+        self._rho_window = RingBuffer(self.window, shape=(self.n_members,))
+
+    def _draw_block(self, n_steps):
+        """Pre-draw noise and reactivation boosts for the next `n_steps` steps."""
+        noise = np.empty((self.n_members, n_steps, 2, self.dim))
+        events = np.empty((self.n_members, n_steps, 3))
+        for i, streams in enumerate(self._streams):
+            noise[i] = streams['noise'].standard_normal((n_steps, 2, self.dim))
+            events[i] = streams['events'].random((n_steps, 3))
+        trigger, spike, boost = events[..., 0], events[..., 1], 0.5 + 0.5 * events[..., 2]
+        hit = trigger < self.reactivation_prob
+        gamma_boost = np.where(hit & (spike < 0.5), boost, 0.0)
+        rho_boost = np.where(hit & (spike >= 0.5), boost, 0.0)
+        return noise, gamma_boost, rho_boost
+
+    def _stream_states(self):
+        return [(s['noise'].bit_generator.state, s['events'].bit_generator.state) for s in self._streams]
+
+    def _rewind(self, states, n_steps):
+        """Restore the streams to `states` and redraw `n_steps` steps, discarding them."""
+        for streams, (noise, events) in zip(self._streams, states):
+            streams['noise'].bit_generator.state = noise
+            streams['events'].bit_generator.state = events
+        if n_steps:
+            self._draw_block(n_steps)
+
+    def simulate(self, n_timesteps=100, observers=(), stop=None, resume=False):
+        """
+        Run every member for `n_timesteps` steps.
+
+        Args:
+            n_timesteps (int): Number of steps.
+            observers: Objects with a `record()` method, e.g. a `LakeStateTracker` built
+                with `n_members=N`, called each step with the (N, dim) states and (N,)
+                metrics.
+            stop: Stop conditions from stopping.py (one, a list, or a `StopMonitor`
+                built with `n_members=N`). Members that have stopped are masked out
+                of the update, so later steps only compute the still-evolving ones;
+                the run ends when every member has stopped.
+            resume (bool): Continue from step `self.t` instead of reinitializing, so
+                a long run can be taken in chunks with bounded memory; the chunks
+                join up to the same trajectories as one call. `stop` applies to
+                this call only; after an early stop the streams are left at step
+                `self.t`, so resuming continues as if the run had been cut there.
+
+        Returns:
+            dict: The `RCDModel.simulate` keys, stacked per member: `H_states` and
+            `M_states` have shape (N, T, dim), the metric series have shape (N, T).
+            With `stop`, T is the last step any member ran, entries after a member's
+            stop are NaN, and 'stopped_at' (N,) and 'stop_reason' (list) are added.
+        """
+        if not resume:
+            self.initialize_manifolds()
+        N, dim, t0 = self.n_members, self.dim, self.t
+        # The update constants are RCDModel's, so members keep matching single runs.
+        coupling, noise_scale, rate = RCDModel.coupling, RCDModel.noise_scale, RCDModel.reflection_rate
+        results = {
+            'H_states': np.empty((N, n_timesteps, dim)),
+            'M_states': np.empty((N, n_timesteps, dim)),
+            'phase_sync': np.empty((N, n_timesteps)),
+            'semantic_corr': np.empty((N, n_timesteps)),
+            'procrustes_dist': np.empty((N, n_timesteps)),
+            'reflection': np.empty((N, n_timesteps)),
+            'seeds': list(self.seeds),
+            'parameters': {k: v.copy() for k, v in self.params.items()},
+        }
+        gamma_window, rho_window = self._gamma_window, self._rho_window
+        monitor = as_monitor(stop, n_members=N) if stop is not None else None
+        observers = list(observers) + ([monitor] if monitor else [])
+        active = slice(None)
+
+        for start in range(0, n_timesteps, self.block_size):
+            if monitor is not None and monitor.stopped:
+                break
+            n_block = min(self.block_size, n_timesteps - start)
+            states = self._stream_states() if monitor is not None else None
+            noise, gamma_boost, rho_boost = self._draw_block(n_block)
+            for k in range(n_block):
+                t = start + k
+                if monitor is not None and monitor.stopped_mask.any():
+                    if monitor.stopped:
+                        # Hand back the noise of the steps not taken, so a resumed run
+                        # draws exactly what an uninterrupted one would from here on.
+                        self._rewind(states, k)
+                        break
+                    active = np.flatnonzero(~monitor.stopped_mask)
+                self.injections.apply_batch(self.H, self.M, self.R, t0 + t)
+
+                if isinstance(active, slice):
+                    gamma, rho, d = fused_metrics(self.H, self.M)
+                else:
+                    gamma, rho, d = np.full(N, np.nan), np.full(N, np.nan), np.full(N, np.nan)
+                    gamma[active], rho[active], d[active] = fused_metrics(self.H[active], self.M[active])
+                gamma = gamma + gamma_boost[:, k]
+                rho = rho + rho_boost[:, k]
+
+                gamma_window.append(gamma)
+                rho_window.append(rho)
+                gamma = gamma_window.mean()
+                rho = rho_window.mean()
+
+                results['H_states'][:, t] = self.H
+                results['M_states'][:, t] = self.M
+                results['phase_sync'][:, t] = gamma
+                results['semantic_corr'][:, t] = rho
+                results['procrustes_dist'][:, t] = d
+                results['reflection'][:, t] = self.R
+                for observer in observers:
+                    observer.record(self.H, self.M, gamma, rho, d, self.R)
+
+                H, M, R = self.H[active], self.M[active], self.R[active]
+                H = H + coupling * (M - H) + R[:, None] * noise[active, k, 0] * noise_scale
+                M = M + coupling * (H - M) + R[:, None] * noise[active, k, 1] * noise_scale
+                self.H[active], self.M[active] = H, M
+                self.R[active] = R + rate * (gamma[active] + rho[active] - R)
+
+        if monitor is not None:
+            n_run = int(monitor.stopped_at.max()) + 1 if monitor.stopped else n_timesteps
+            self._mask_stopped(results, monitor.stopped_at, n_run)
+            results.update(monitor.summary())
+            self.t += n_run
+        else:
+            self.t += n_timesteps
+        return results
+
+    def _mask_stopped(self, results, stopped_at, n_run):
+        """Trim the series to `n_run` steps and blank each member's steps after its stop."""
+        last = np.where(stopped_at >= 0, stopped_at, n_run - 1)
+        after = np.arange(n_run)[None, :] > last[:, None]
+        for key in ('H_states', 'M_states', 'phase_sync', 'semantic_corr', 'procrustes_dist', 'reflection'):
+            series = results[key][:, :n_run]
+            series[after] = np.nan
+            results[key] = series
+
+
+def simulate_ensemble(seeds, n_timesteps=100, dim=10, observers=(), stop=None, **kwargs):
+    """Convenience wrapper: build an `RCDEnsemble` and run it."""
+    return RCDEnsemble(seeds, dim=dim, **kwargs).simulate(n_timesteps, observers, stop)
@@ -0,0 +1,155 @@
+"""
+Module: instrumentation.py
+Purpose: Per-phase timers, counters and rate-limited progress for simulation loops.
+
+A loop marks the end of each phase with `lap(name)`: the time since the previous
+lap is charged to that phase, so one step costs one `perf_counter()` call per phase
+and nothing is nested or allocated. `count(name)` bumps event counters, and
+`step(t, ...)` closes a step and emits a progress line at most once every
+`progress_interval` seconds, instead of printing every step.
+
+`NULL_PROFILER` has the same methods as no-ops; loops use it when instrumentation
+is off, which costs a few attribute lookups and calls per step.
+
+`summary()` returns a plain dict (wall time, steps/s, per-phase totals, means and
+shares, counters) that `save()` writes as JSON and `report()` formats as a table.
+"""
+
+import json
+import sys
+import time
+
+
+class RunProfiler:
+    def __init__(self, timers=True, progress_interval=None, stream=None):
+        """
+        Args:
+            timers (bool): Time the phases marked with `lap()`; False keeps only
+                counters and progress.
+            progress_interval (float): Seconds between progress lines; None for none.
+            stream: Where progress lines go; defaults to sys.stderr.
+        """
+        self.timers = timers
+        self.progress_interval = progress_interval
+        self.stream = stream
+        self.reset()
+
+    def reset(self):
+        self.phase_time = {}
+        self.phase_calls = {}
+        self.counters = {}
+        self.steps = 0
+        self.total = None
+        self._start = self._last = self._end = None
+        self._next_report = None
+
+    def start(self, total=None):
+        """Begin a run of `total` steps (`total` is shown in progress lines)."""
+        self.reset()
+        self.total = total
+        self._start = self._last = time.perf_counter()
+        if self.progress_interval is not None:
+            self._next_report = self._start + self.progress_interval
+
+    def lap(self, phase):
+        """Charge the time since the previous lap (or step start) to `phase`."""
+        if self.timers:
+            now = time.perf_counter()
+            self.phase_time[phase] = self.phase_time.get(phase, 0.0) + now - self._last
+            self.phase_calls[phase] = self.phase_calls.get(phase, 0) + 1
+            self._last = now
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def step(self, t, **values):
+        """Close step `t`; `values` (e.g. gamma=..., R=...) appear in progress lines."""
+        self.steps += 1
+        if self._next_report is not None:
+            now = time.perf_counter()
+            if now >= self._next_report:
+                self._next_report = now + self.progress_interval
+                self._emit(t, now, values)
+                self._last = time.perf_counter()   # keep printing out of the next phase
+
+    def _emit(self, t, now, values):
+        elapsed = now - self._start
+        done = f"{t + 1}/{self.total}" if self.total else f"{t + 1}"
+        rate = self.steps / elapsed if elapsed > 0 else 0.0
+        fields = ' | '.join(f"{name}: {value:.3f}" for name, value in values.items())
+        print(f"[{elapsed:7.1f}s] t={done} ({rate:,.0f} steps/s) | {fields}", file=self.stream or sys.stderr)
+
+    def finish(self):
+        self._end = time.perf_counter()
+
+    # --- Export ---
+
+    @property
+    def wall_time(self):
+        if self._start is None:
+            return 0.0
+        return (self._end or time.perf_counter()) - self._start
+
+    def summary(self):
+        """Plain-dict summary of the run, suitable for JSON."""
+        wall = self.wall_time
+        timed = sum(self.phase_time.values())
+        phases = {
+            name: {
+                'total_s': total,
+                'calls': self.phase_calls[name],
+                'mean_us': 1e6 * total / self.phase_calls[name],
+                'share': total / wall if wall > 0 else 0.0,
+            }
+            for name, total in sorted(self.phase_time.items(), key=lambda item: -item[1])
+        }
+        return {
+            'steps': self.steps,
+            'wall_s': wall,
+            'steps_per_sec': self.steps / wall if wall > 0 else 0.0,
+            'untimed_s': max(wall - timed, 0.0) if self.timers else None,
+            'phases': phases,
+            'counters': dict(self.counters),
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def report(self):
+        """Summary formatted as a text table."""
+        s = self.summary()
+        lines = [f"{s['steps']} steps in {s['wall_s']:.3f}s ({s['steps_per_sec']:,.0f} steps/s)"]
+        for name, p in s['phases'].items():
+            lines.append(f"  {name:<14} {p['total_s']:9.4f}s  {p['share']:6.1%}  {p['mean_us']:9.2f} µs/call")
+        for name, n in s['counters'].items():
+            lines.append(f"  {name:<14} {n}")
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return f"RunProfiler(steps={self.steps}, timers={self.timers}, progress_interval={self.progress_interval})"
+
+
+class _NullProfiler:
+    """Stand-in used when instrumentation is off; every method does nothing."""
+
+    def start(self, total=None):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def step(self, t, **values):
+        pass
+
+    def finish(self):
+        pass
+
+    def summary(self):
+        return {}
+
+
+NULL_PROFILER = _NullProfiler()
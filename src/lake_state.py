@@ -52,6 +52,187 @@ def reinforce_lake_state(current_Lambda, reinforcement=0.05):
     """
     return min(1.0, current_Lambda + reinforcement)
 
+# --- Streaming Lake-State Tracking ---
+
+def _persist_loop(steps, Lambda0, out):
+    """Scalar loop over (n, N) steps, written for numba.njit; fills `out` in place."""
+    for j in range(steps.shape[1]):
+        Lambda = Lambda0[j]
+        for k in range(steps.shape[0]):
+            Lambda = min(1.0, max(0.0, Lambda + steps[k, j]))
+            out[k, j] = Lambda
+
+
+def _persist_numpy(steps, Lambda0, out):
+    Lambda = Lambda0
+    for k in range(len(steps)):
+        Lambda = np.clip(Lambda + steps[k], 0.0, 1.0)
+        out[k] = Lambda
+
+
+_persist_kernel = None
+
+
+def persist_kernel():
+    """
+    `_persist`'s loop, built on first use so that importing this module does not
+    import numba: numba-jitted if installed, else a NumPy loop over steps.
+    """
+    global _persist_kernel
+    if _persist_kernel is None:
+        try:
+            import numba
+        except ImportError:  # optional: the NumPy loop is used instead
+            _persist_kernel = _persist_numpy
+        else:
+            _persist_kernel = numba.njit(cache=True)(_persist_loop)
+    return _persist_kernel
+
+
+def _persist(steps, Lambda0):
+    """
+    Λ_t = clip(Λ_{t-1} + step_t, 0, 1) along axis 0: `reinforce_lake_state` for positive
+    steps and `lake_state_persistence` for negative ones, applied in sequence.
+
+    The additions stay sequential, so Λ does not depend on how a stream is split into
+    blocks; a prefix scan would reorder them and move threshold crossings by a step.
+    """
+    steps = np.asarray(steps, dtype=float)
+    if len(steps) == 1:   # per-step updates: skip the kernel call overhead
+        return np.clip(Lambda0 + steps, 0.0, 1.0)
+    flat = np.ascontiguousarray(steps.reshape(len(steps), int(np.prod(steps.shape[1:]))))
+    Lambda0 = np.broadcast_to(np.asarray(Lambda0, dtype=float), steps.shape[1:]).reshape(-1).copy()
+    out = np.empty_like(flat)
+    persist_kernel()(flat, Lambda0, out)
+    return out.reshape(steps.shape)
+
+
+class LakeStateTracker:
+    """
+    Incremental Lake-State detector over a stream of γ/ρ/R (and optionally drift).
+
+    Each step the activation A(t) = compute_lake_state(γ, ρ, R) is formed. When A(t)
+    reaches `activation_threshold` and drift stays within `drift_threshold`, the
+    persistent Λ(t) is reinforced, otherwise it decays. The system enters the Lake
+    State when Λ(t) reaches `enter_threshold` and leaves it when Λ(t) falls below
+    `exit_threshold`; each crossing is appended to `events` with its timestep.
+
+    Only the current state is kept, so memory does not grow with the run. With
+    `n_members` set, every input is an (N,) array and members are tracked at once.
+    The tracker also has `record()`/`extend()` so it can observe `RCDModel.simulate`.
+    """
+
+    def __init__(self, n_members=None, activation_threshold=0.6, drift_threshold=0.08,
+                 reinforcement=0.05, decay_rate=0.01, enter_threshold=0.5, exit_threshold=0.3,
+                 weights=(0.4, 0.4, 0.2)):
+        if exit_threshold > enter_threshold:
+            raise ValueError("exit_threshold must not exceed enter_threshold")
+        self.n_members = n_members
+        self.activation_threshold = activation_threshold
+        self.drift_threshold = drift_threshold
+        self.reinforcement = reinforcement
+        self.decay_rate = decay_rate
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.weights = weights
+        self.reset()
+
+    def reset(self):
+        shape = () if self.n_members is None else (self.n_members,)
+        self.t = 0
+        self.Lambda = np.zeros(shape)
+        self.in_lake = np.zeros(shape, dtype=bool)
+        self.entry_time = np.full(shape, -1)     # first entry, -1 if never entered
+        self.steps_in_lake = np.zeros(shape, dtype=int)
+        self.events = []
+        self._prev_activation = None
+
+    def _activation(self, gamma, rho, R):
+        gamma_weight, rho_weight, R_weight = self.weights
+        return compute_lake_state(gamma, rho, R, gamma_weight, rho_weight, R_weight)
+
+    def update(self, gamma, rho, R, drift=None):
+        """Consume one step (scalars, or (N,) arrays for an ensemble)."""
+        Lambda, in_lake = self.update_many(np.asarray(gamma, dtype=float)[None],
+                                           np.asarray(rho, dtype=float)[None],
+                                           np.asarray(R, dtype=float)[None],
+                                           None if drift is None else np.asarray(drift, dtype=float)[None])
+        return Lambda[0], in_lake[0]
+
+    def update_many(self, gamma, rho, R, drift=None):
+        """
+        Consume a block of steps along axis 0: (n,) arrays, or (n, N) for an ensemble.
+
+        Returns:
+            tuple: (Lambda, in_lake) for the block, with the same shape as the inputs.
+        """
+        gamma, rho, R = (np.asarray(x, dtype=float) for x in (gamma, rho, R))
+        n = len(gamma)
+        if n == 0:
+            return np.empty_like(gamma), np.empty(gamma.shape, dtype=bool)
+
+        activation = self._activation(gamma, rho, R)
+        if drift is None:
+            prev = activation[:1] if self._prev_activation is None else self._prev_activation[None]
+            drift = np.abs(np.diff(activation, axis=0, prepend=prev))
+        self._prev_activation = activation[-1]
+
+        aligned = (activation >= self.activation_threshold) & (np.asarray(drift) <= self.drift_threshold)
+        Lambda = _persist(np.where(aligned, self.reinforcement, -self.decay_rate), self.Lambda)
+
+        # Hysteresis: +1 forces "in", -1 forces "out", 0 keeps the previous state.
+        marks = np.where(Lambda >= self.enter_threshold, 1, np.where(Lambda < self.exit_threshold, -1, 0))
+        marks = np.concatenate((np.where(self.in_lake, 1, -1)[None], marks))
+        idx = np.where(marks != 0, np.arange(n + 1).reshape((-1,) + (1,) * (marks.ndim - 1)), 0)
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        states = np.take_along_axis(marks, idx, axis=0) == 1
+        in_lake = states[1:]
+
+        entered = ~states[:-1] & in_lake
+        # np.nonzero is row-major, so crossings come out in time order.
+        for index in zip(*np.nonzero(states[:-1] != in_lake)):
+            self.events.append({
+                "type": "enter" if in_lake[index] else "exit",
+                "t": int(self.t + index[0]),
+                "member": int(index[1]) if len(index) > 1 else None,
+            })
+        if entered.any():
+            first = np.argmax(entered, axis=0)
+            new = (self.entry_time < 0) & entered.any(axis=0)
+            self.entry_time = np.where(new, self.t + first, self.entry_time)
+
+        self.steps_in_lake = self.steps_in_lake + in_lake.sum(axis=0)
+        self.Lambda = Lambda[-1]
+        self.in_lake = in_lake[-1]
+        self.t += n
+        return Lambda, in_lake
+
+    # --- Observer interface for RCDModel.simulate / SimulationRunner ---
+
+    def record(self, H, M, gamma, rho, d, R):
+        self.update(gamma, rho, R)
+
+    def extend(self, H, M, gamma, rho, d, R):
+        self.update_many(gamma, rho, R)
+
+
+def lake_state_series(gamma, rho, R, drift=None, **params):
+    """
+    Λ(t), Lake-State membership and entry/exit events for whole trajectories at once.
+
+    Inputs are (T,) series, or (T, N) for an ensemble; `params` are passed to
+    `LakeStateTracker`.
+    """
+    gamma = np.asarray(gamma, dtype=float)
+    tracker = LakeStateTracker(n_members=gamma.shape[1] if gamma.ndim > 1 else None, **params)
+    Lambda, in_lake = tracker.update_many(gamma, rho, R, drift)
+    return {
+        'Lambda': Lambda,
+        'in_lake': in_lake,
+        'events': tracker.events,
+        'entry_time': tracker.entry_time,
+    }
+
 # === Phase Transition Logic (formerly phase_space.py) ===
 
 def is_lake_state(attention_level, volition_level, coherence_threshold=0.8):
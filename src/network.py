@@ -0,0 +1,198 @@
+"""
+Module: network.py
+Purpose: Populations of human and model manifolds coupled through a sparse weighted graph.
+
+`RCDModel` couples one H to one M. `RCDNetwork` generalizes it to any number of
+agents, the nodes of a networkx graph, each with a state vector and a reflection
+value. Node attribute 'kind' marks human ('H') and model ('M') manifolds, edge
+attribute 'weight' sets coupling strength. The graph is compiled once to a
+row-normalized CSR matrix P, so one step updates every agent with a single sparse
+matrix–matrix product:
+
+    X' = X + c (P X - X) + R ⊙ ξ · noise_scale
+
+For a single H–M edge this is the pairwise pull of `RCDModel`, applied to both
+agents at once rather than H first. γ, ρ and d are computed per edge, in one
+batched `fused_metrics` call over the gathered endpoint states, then boosted by
+stochastic reactivation and smoothed over `window` steps exactly as in the pair
+model. Each agent's reflection follows the weighted mean of (γ̄ + ρ̄) over its
+edges: R' = R + rate (mean(γ̄ + ρ̄) - R).
+
+Undirected graphs have one metric series per edge; directed graphs one per arc.
+"""
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from .alignment_metrics import fused_metrics
+from .rcd_model import RCDModel
+from .ring_buffer import RingBuffer
+from .rng import spawn_streams
+
+KINDS = ('H', 'M')
+
+
+def bipartite_population(n_humans, n_models, degree=3, seed=0, weight_range=(0.5, 1.0)):
+    """
+    networkx graph where each of `n_humans` 'H' nodes is linked to `degree` random
+    'M' nodes with uniform random weights; nodes are ('H', i) and ('M', j).
+    """
+    rng = np.random.default_rng(seed)
+    graph = nx.Graph()
+    graph.add_nodes_from((('H', i) for i in range(n_humans)), kind='H')
+    graph.add_nodes_from((('M', j) for j in range(n_models)), kind='M')
+    for i in range(n_humans):
+        for j in rng.choice(n_models, size=min(degree, n_models), replace=False).tolist():
+            graph.add_edge(('H', i), ('M', j), weight=rng.uniform(*weight_range))
+    return graph
+
+
+def _row_normalized(matrix):
+    total = np.asarray(matrix.sum(axis=1)).ravel()
+    scale = np.divide(1.0, total, out=np.zeros_like(total), where=total > 0)
+    return (sp.diags(scale) @ matrix).tocsr()
+
+
+class RCDNetwork:
+    def __init__(self, graph, dim=10, seed=42, window=5, weight='weight', block_size=256):
+        """
+        Args:
+            graph (networkx.Graph or DiGraph): Agents and their couplings, with at
+                least one edge. In a DiGraph, an arc u → v pulls u toward v.
+            dim (int): Dimension of every agent's state.
+            seed: Seed (int or SeedSequence) for the init, noise and event streams.
+            window (int): Memory window for γ/ρ smoothing.
+            weight (str): Edge attribute holding coupling weights (1 where missing).
+            block_size (int): Steps of noise and reactivation draws taken at once.
+        """
+        self.graph = graph
+        self.nodes = list(graph.nodes)
+        self.n_agents = len(self.nodes)
+        self.dim = dim
+        self.seed = seed
+        self.window = window
+        self.block_size = block_size
+        self.kinds = np.array([graph.nodes[node].get('kind', 'H') for node in self.nodes])
+        unknown = set(self.kinds.tolist()) - set(KINDS)
+        if unknown:
+            raise ValueError(f"Unknown agent kinds {sorted(unknown)}, expected one of {KINDS}")
+
+        W = sp.csr_matrix(nx.to_scipy_sparse_array(graph, nodelist=self.nodes, weight=weight, dtype=float))
+        # Row-normalized: P @ X is each agent's weighted neighbour mean. Agents without
+        # neighbours (or out-arcs) get a self-loop, so nothing pulls them.
+        self.P = _row_normalized(W)
+        self.P = (self.P + sp.diags((np.diff(self.P.indptr) == 0).astype(float))).tocsr()
+
+        coo = W.tocoo()
+        keep = coo.row < coo.col if not graph.is_directed() else np.ones(coo.nnz, dtype=bool)
+        self.src, self.dst, self.edge_weight = coo.row[keep], coo.col[keep], coo.data[keep]
+        self.n_edges = len(self.src)
+        if self.n_edges == 0:
+            raise ValueError("RCDNetwork needs a graph with at least one edge; γ, ρ and d are per-edge metrics")
+
+        # Agent × edge incidence, row-normalized by weight: S @ x averages edge values per agent.
+        rows = np.r_[self.src, self.dst]
+        cols = np.r_[np.arange(self.n_edges), np.arange(self.n_edges)]
+        incidence = sp.csr_matrix((np.r_[self.edge_weight, self.edge_weight], (rows, cols)),
+                                  shape=(self.n_agents, self.n_edges))
+        self.S = _row_normalized(incidence)
+        self.has_edges = np.diff(self.S.indptr) > 0
+        self._index = {node: i for i, node in enumerate(self.nodes)}
+
+        self.initialize()
+
+    def initialize(self):
+        """Fresh random states (X ~ N(0, 1)) and R = 0.1 for every agent, at t = 0."""
+        self.streams = spawn_streams(self.seed)
+        self.X = self.streams['init'].standard_normal((self.n_agents, self.dim))
+        self.R = np.full(self.n_agents, 0.1)
+        self.t = 0
+        self._gamma_window = RingBuffer(self.window, shape=(self.n_edges,))
+        self._rho_window = RingBuffer(self.window, shape=(self.n_edges,))
+
+    def edge_metrics(self, X=None):
+        """Raw (γ, ρ, d) per edge, each of shape (n_edges,)."""
+        X = self.X if X is None else X
+        return fused_metrics(X[self.src], X[self.dst])
+
+    def _draw_block(self, n_steps):
+        noise = self.streams['noise'].standard_normal((n_steps, self.n_agents, self.dim))
+        events = self.streams['events'].random((n_steps, self.n_edges, 3))
+        trigger, spike, boost = events[..., 0], events[..., 1], 0.5 + 0.5 * events[..., 2]
+        hit = trigger < RCDModel.reactivation_prob
+        gamma_boost = np.where(hit & (spike < 0.5), boost, 0.0)
+        rho_boost = np.where(hit & (spike >= 0.5), boost, 0.0)
+        return noise, gamma_boost, rho_boost
+
+    def simulate(self, n_timesteps=100, record_every=None, record_edges=False, resume=False):
+        """
+        Advance every agent for `n_timesteps` steps.
+
+        Args:
+            n_timesteps (int): Number of steps.
+            record_every (int): Also store all agent states every this many steps.
+            record_edges (bool): Also store the smoothed per-edge γ, ρ and raw d
+                series, shape (T, n_edges).
+            resume (bool): Continue from the current state instead of reinitializing.
+
+        Returns:
+            dict: Population means per step of 'phase_sync', 'semantic_corr',
+            'procrustes_dist' (over edges) and 'reflection' (over agents), each (T,);
+            'cross_phase_sync' and 'cross_semantic_corr', the means over H–M edges
+            only (NaN if the graph has none); and with the options above 'edge_*'
+            series or 'states' (K, n_agents, dim) with their steps in 'state_steps'.
+        """
+        if not resume:
+            self.initialize()
+        T = n_timesteps
+        # The update constants are RCDModel's, read per run so overrides there apply here.
+        coupling, noise_scale, rate = RCDModel.coupling, RCDModel.noise_scale, RCDModel.reflection_rate
+        cross = self.kinds[self.src] != self.kinds[self.dst]
+        n_cross = int(cross.sum()) or np.nan
+        results = {key: np.empty(T) for key in ('phase_sync', 'semantic_corr', 'procrustes_dist', 'reflection',
+                                                 'cross_phase_sync', 'cross_semantic_corr')}
+        if record_edges:
+            for key in ('edge_phase_sync', 'edge_semantic_corr', 'edge_procrustes_dist'):
+                results[key] = np.empty((T, self.n_edges))
+        if record_every:
+            steps = np.arange(0, T, record_every)
+            results['state_steps'] = steps + self.t
+            results['states'] = np.empty((len(steps), self.n_agents, self.dim))
+        for start in range(0, T, self.block_size):
+            n_block = min(self.block_size, T - start)
+            noise, gamma_boost, rho_boost = self._draw_block(n_block)
+            for k in range(n_block):
+                t = start + k
+                gamma, rho, d = self.edge_metrics()
+                self._gamma_window.append(gamma + gamma_boost[k])
+                self._rho_window.append(rho + rho_boost[k])
+                gamma, rho = self._gamma_window.mean(), self._rho_window.mean()
+
+                results['phase_sync'][t] = gamma.mean()
+                results['semantic_corr'][t] = rho.mean()
+                results['procrustes_dist'][t] = d.mean()
+                results['reflection'][t] = self.R.mean()
+                results['cross_phase_sync'][t] = gamma @ cross / n_cross
+                results['cross_semantic_corr'][t] = rho @ cross / n_cross
+                if record_edges:
+                    results['edge_phase_sync'][t] = gamma
+                    results['edge_semantic_corr'][t] = rho
+                    results['edge_procrustes_dist'][t] = d
+                if record_every and t % record_every == 0:
+                    results['states'][t // record_every] = self.X
+
+                self.X = self.X + coupling * (self.P @ self.X - self.X) \
+                    + self.R[:, None] * noise[k] * noise_scale
+                target = np.where(self.has_edges, self.S @ (gamma + rho), self.R)
+                self.R = self.R + rate * (target - self.R)
+        self.t += T
+        return results
+
+    def agent_index(self, node):
+        """Row of `node` in X and R."""
+        return self._index[node]
+
+    def __repr__(self):
+        return (f"RCDNetwork(agents={self.n_agents}, edges={self.n_edges}, dim={self.dim}, "
+                f"directed={self.graph.is_directed()})")
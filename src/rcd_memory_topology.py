@@ -6,11 +6,29 @@ M_recon(φ, t) := topological deformation applied to a symbolic phase manifold 
 
 import numpy as np
 
+from .tiled_grid import TiledGrid
+from .recon_log import ReconLog, replay, save_snapshot, load_snapshot
+
 class SymbolicManifold:
-    def __init__(self, shape=(100, 100), curvature_bias=0.0):
-        self.shape = shape
-        self.curvature = np.zeros(shape) + curvature_bias
-        self.recon_events = []
+    def __init__(self, shape=(100, 100), curvature_bias=0.0, tile_size=256, log_path=None, fsync=False):
+        """
+        Args:
+            shape (tuple): Manifold grid shape.
+            curvature_bias (float): Baseline curvature of untouched cells.
+            tile_size (int): Edge of the curvature tiles (a power of two). Only tiles
+                reached by a reconciliation event are allocated, so very large
+                manifolds with localized events stay cheap.
+            log_path (str): Optional append-only file that every event is written
+                through to (see recon_log.py). Use `restore` to rebuild a manifold
+                from an existing log, and `close` (or a `with` block) to release it.
+            fsync (bool): fsync the log after every event batch (see `ReconLog`).
+        """
+        self.shape = tuple(shape)
+        self.curvature_bias = curvature_bias
+        self.curvature = TiledGrid(self.shape, tile=tile_size, fill=curvature_bias)
+        self.recon_events = ReconLog(log_path, fsync=fsync)
+        # Objects with region_changed(boxes), e.g. a basins.BasinIndex, told after each event.
+        self.observers = []
 
     def apply_memory_reconciliation(self, location, strength=1.0, radius=5.0):
         """
@@ -22,29 +40,175 @@ class SymbolicManifold:
             radius (float): Area of influence around the point.
         """
         x0, y0 = location
-        for x in range(self.shape[0]):
-            for y in range(self.shape[1]):
-                dist = np.sqrt((x - x0)**2 + (y - y0)**2)
-                if dist < radius:
-                    self.curvature[x, y] += strength * np.exp(-dist**2 / (2 * radius))
-
-        self.recon_events.append({
-            "type": "M_recon",
-            "location": location,
-            "strength": strength,
-            "radius": radius
-        })
-
-    def get_phase_basin_map(self):
-        """Returns the current curvature map as a proxy for basin topology."""
-        return self.curvature.copy()
+        self._deform(x0, y0, strength, radius)
+        self._log_event(location, strength, radius)
+        self._notify([self._window(x0, y0, radius)])
+
+    def apply_many(self, events):
+        """
+        Apply a batch of reconciliation events in one call.
+
+        Args:
+            events: Either an iterable of dicts with keys `location`, `strength`
+                and `radius` (as passed to `apply_memory_reconciliation`), or an
+                array of shape (K, 4) with rows (x, y, strength, radius).
+        """
+        if isinstance(events, np.ndarray):
+            table = np.asarray(events, dtype=float).reshape(-1, 4)
+            locations = [(x, y) for x, y in table[:, :2].tolist()]
+        else:
+            events = list(events)
+            locations = [tuple(e["location"]) for e in events]
+            table = np.array([[x, y, e.get("strength", 1.0), e.get("radius", 5.0)]
+                              for (x, y), e in zip(locations, events)], dtype=float).reshape(-1, 4)
+        if len(table) == 0:
+            return
+
+        x, y, strength, radius = table.T
+        on_grid = (x == np.round(x)) & (y == np.round(y))
+
+        # Events centred on grid points share one stencil per radius; scatter them together.
+        for r in np.unique(radius[on_grid]):
+            group = np.flatnonzero(on_grid & (radius == r))
+            self._deform_stencil(x[group].astype(int), y[group].astype(int), strength[group], r)
+        for k in np.flatnonzero(~on_grid):
+            self._deform(x[k], y[k], strength[k], radius[k])
+
+        self.recon_events.extend(x, y, strength, radius)
+        self._notify([self._window(*event) for event in zip(x, y, radius)])
+
+    def _notify(self, boxes):
+        if self.observers:
+            boxes = np.array(boxes, dtype=np.int64).reshape(-1, 4)   # (x_lo, x_hi, y_lo, y_hi) rows
+            for observer in self.observers:
+                observer.region_changed(boxes)
+
+    def _notify_all(self):
+        """Tell observers the whole map changed (it was cleared or replaced)."""
+        self._notify([(0, self.shape[0], 0, self.shape[1])])
+
+    def _window(self, x0, y0, radius):
+        """Bounding box of the disc of influence, clipped to the grid."""
+        x_lo = max(int(np.ceil(x0 - radius)), 0)
+        x_hi = min(int(np.floor(x0 + radius)) + 1, self.shape[0])
+        y_lo = max(int(np.ceil(y0 - radius)), 0)
+        y_hi = min(int(np.floor(y0 + radius)) + 1, self.shape[1])
+        return x_lo, x_hi, y_lo, y_hi
+
+    def _deform(self, x0, y0, strength, radius):
+        """Add the deformation kernel of one event, touching only its bounding box."""
+        x_lo, x_hi, y_lo, y_hi = self._window(x0, y0, radius)
+        if radius <= 0 or x_lo >= x_hi or y_lo >= y_hi:
+            return
+        dx = np.arange(x_lo, x_hi) - x0
+        dy = np.arange(y_lo, y_hi) - y0
+        dist = np.sqrt(dx[:, None] ** 2 + dy[None, :] ** 2)
+        bump = np.where(dist < radius, strength * np.exp(-dist ** 2 / (2 * radius)), 0.0)
+        self.curvature.add_block(x_lo, y_lo, bump)
+
+    def _deform_stencil(self, xs, ys, strengths, radius, max_points=1 << 22):
+        """Scatter-add one shared integer stencil at many grid-point locations."""
+        if radius <= 0:
+            return
+        reach = int(np.ceil(radius))
+        offsets = np.arange(-reach, reach + 1)
+        dist = np.sqrt(offsets[:, None] ** 2 + offsets[None, :] ** 2)
+        inside = dist < radius
+        off_x, off_y = np.nonzero(inside)
+        off_x, off_y = offsets[off_x], offsets[off_y]
+        weights = np.exp(-dist[inside] ** 2 / (2 * radius))
+        if len(weights) == 0:
+            return
+
+        chunk = max(1, max_points // len(weights))
+        for start in range(0, len(xs), chunk):
+            cx = xs[start:start + chunk, None] + off_x[None, :]
+            cy = ys[start:start + chunk, None] + off_y[None, :]
+            vals = strengths[start:start + chunk, None] * weights[None, :]
+            keep = (cx >= 0) & (cx < self.shape[0]) & (cy >= 0) & (cy < self.shape[1])
+            self.curvature.add_at(cx[keep], cy[keep], vals[keep])
+
+    def _log_event(self, location, strength, radius):
+        x, y = location
+        self.recon_events.append(x, y, strength, radius)
+
+    def get_phase_basin_map(self, level=0):
+        """
+        Returns the current curvature map as a proxy for basin topology.
+
+        Args:
+            level (int): Pyramid level; level k is the mean-pooled map at 1/2^k
+                resolution, for whole-map views of large manifolds.
+
+        The result is read-only. Small manifolds (a single tile) return a view of the
+        curvature store rather than a copy; use `get_region` for parts of large ones.
+        """
+        return self.curvature.level(level)
+
+    def get_region(self, x_lo, x_hi, y_lo, y_hi, level=0):
+        """Curvature of cells [x_lo, x_hi) × [y_lo, y_hi), in level-`level` coordinates."""
+        if level == 0:
+            return self.curvature.region(x_lo, x_hi, y_lo, y_hi)
+        return self.curvature.level(level)[max(x_lo, 0):x_hi, max(y_lo, 0):y_hi]
 
     def reset(self):
-        self.curvature = np.zeros(self.shape)
+        self.curvature.clear()
         self.recon_events.clear()
+        self._notify_all()
+
+    # --- Event log: compaction and replay ---
+
+    def flush(self, fsync=None):
+        """Push logged events to the log file (see `ReconLog.flush`)."""
+        self.recon_events.flush(fsync)
+
+    def close(self):
+        """Close the log file; the manifold stays readable but must not log new events."""
+        self.recon_events.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def compact(self, snapshot_path):
+        """Fold every event so far into a curvature snapshot and drop them from the log."""
+        seq = self.recon_events.next_seq
+        save_snapshot(self.curvature, snapshot_path, seq)
+        self.recon_events.compact(seq)
+
+    def rebuild(self, snapshot_path=None, workers=None):
+        """
+        Recompute the curvature from the event log, starting from a snapshot written by
+        `compact` if given. Replay runs across tiles on `workers` threads.
+        """
+        if snapshot_path is not None:
+            grid, seq = load_snapshot(snapshot_path)
+        elif self.recon_events.base > 0:
+            raise ValueError("The log has been compacted; pass the snapshot it was folded into")
+        else:
+            grid, seq = TiledGrid(self.shape, tile=self.curvature.tile, fill=self.curvature_bias), 0
+        if seq < self.recon_events.base:
+            raise ValueError(f"Snapshot ends at event {seq} but the log starts at {self.recon_events.base}")
+        self.curvature = replay(grid, self.recon_events.since(seq), workers=workers)
+        self._notify_all()
+
+    @classmethod
+    def restore(cls, log_path, snapshot_path=None, workers=None, **kwargs):
+        """
+        Reopen a manifold from its log file and, if it was compacted, its latest snapshot.
+        Shape, tile size and bias come from the snapshot when given, else from `kwargs`.
+        """
+        if snapshot_path is not None:
+            grid, _ = load_snapshot(snapshot_path)
+            kwargs.update(shape=grid.shape, tile_size=grid.tile, curvature_bias=grid.fill)
+        manifold = cls(log_path=log_path, **kwargs)
+        manifold.rebuild(snapshot_path, workers=workers)
+        return manifold
 
 
-# Example usage
+# Example usage (from the repository root): python -m src.rcd_memory_topology
 if __name__ == "__main__":
     manifold = SymbolicManifold()
     manifold.apply_memory_reconciliation(location=(50, 50), strength=1.0, radius=8.0)
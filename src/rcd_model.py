@@ -1,24 +1,47 @@
-
+import copy
+from collections.abc import MutableMapping
 import numpy as np
-import random
+from .aggregation import AggregatedResults
+from .results import SimulationResults, ObservedResults
+from .stopping import as_monitor
+from .ring_buffer import RollingMemoryBuffer
+from .rng import spawn_streams, DrawBlock
+from .alignment_metrics import fused_metrics
+from .attractor_injection import InjectionSchedule
+from .engines import ENGINES, run_engine
+from . import checkpoint
 
 class RCDModel:
+    # Constants of the update rules; engines.py derives its closed forms from them.
+    coupling = 0.05          # pull of H and M toward each other per step
+    noise_scale = 0.01       # step noise amplitude (multiplied by R); 0 makes runs deterministic
+    reflection_rate = 0.1    # step size of update_reflection
+    reactivation_prob = 0.05
+    memory_window = 5
+    engine = 'reference'     # default stepping engine, see engines.py
+
     def __init__(self, dim=10, seed=42):
-        np.random.seed(seed)
-        random.seed(seed)
+        # seed may be an int or a SeedSequence (e.g. one of `SeedSequence(s).spawn(n)`).
+        self.seed = seed
+        self.streams = spawn_streams(seed)
+        self.rng = self.streams['user']
+        self._noise = DrawBlock(self.streams['noise'], 'normal')
+        self._events = DrawBlock(self.streams['events'], 'uniform')
         self.dim = dim
+        self.t = 0
         self.initialize_manifolds()
         self.state = {
             'gamma': 0.7,  # Phase synchronization
             'rho': 0.5,    # Semantic correlation
         }
-        self.gamma_buffer = []
-        self.rho_buffer = []
-        self.attractor_injections = []
+        self.gamma_buffer = RollingMemoryBuffer(5)
+        self.rho_buffer = RollingMemoryBuffer(5)
+        self.attractor_injections = InjectionSchedule()
 
     def initialize_manifolds(self):
-        self.H = np.random.randn(self.dim)
-        self.M = np.random.randn(self.dim)
+        init = self.streams['init']
+        self.H = init.standard_normal(self.dim)
+        self.M = init.standard_normal(self.dim)
         self.R = 0.1  # Initial reflection value
 
     def set_parameters(self, alpha=0.5, beta=0.1, delta=0.05, n_dimensions=10, noise_level=0.01):
@@ -28,9 +51,14 @@ class RCDModel:
         self.dim = n_dimensions
         self.noise_level = noise_level
         self.initialize_manifolds()
-        self.gamma_buffer = []
-        self.rho_buffer = []
-        self.attractor_injections = []
+        self.gamma_buffer = RollingMemoryBuffer(5)
+        self.rho_buffer = RollingMemoryBuffer(5)
+        self.attractor_injections = InjectionSchedule()
+
+    def get_parameters(self):
+        """Parameters set via `set_parameters`, e.g. for trajectory file headers."""
+        names = ('alpha', 'beta', 'delta', 'noise_level')
+        return {name: getattr(self, name) for name in names if hasattr(self, name)}
 
     def compute_phase_synchronization(self, H, M):
         return 1 - np.abs(np.dot(H, M) / (np.linalg.norm(H) * np.linalg.norm(M)))
@@ -41,78 +69,183 @@ class RCDModel:
     def compute_procrustes_distance(self, H, M):
         return np.linalg.norm(H - M)
 
+    def compute_metrics(self, H, M):
+        """γ, ρ and d in one fused pass; see `alignment_metrics.fused_metrics`."""
+        return fused_metrics(H, M)
+
     def update_reflection(self, R, gamma, rho, alpha=0.1):
         return R + alpha * (gamma + rho - R)
 
     def update_manifold_H(self, H, M, R):
-        return H + 0.05 * (M - H) + R * np.random.randn(self.dim) * 0.01
+        return H + self.coupling * (M - H) + R * self._noise.take(self.dim) * self.noise_scale
 
     def update_manifold_M(self, M, H, R):
-        return M + 0.05 * (H - M) + R * np.random.randn(self.dim) * 0.01
+        return M + self.coupling * (H - M) + R * self._noise.take(self.dim) * self.noise_scale
 
     def apply_memory_buffer(self, gamma, rho, window=5):
-        self.gamma_buffer.append(gamma)
-        self.rho_buffer.append(rho)
-        if len(self.gamma_buffer) > window:
-            self.gamma_buffer.pop(0)
-            self.rho_buffer.pop(0)
-        return np.mean(self.gamma_buffer), np.mean(self.rho_buffer)
+        if self.gamma_buffer.capacity != window:
+            self.gamma_buffer = self.gamma_buffer.resized(window)
+            self.rho_buffer = self.rho_buffer.resized(window)
+        return self.gamma_buffer.update(gamma), self.rho_buffer.update(rho)
 
     def maybe_stochastic_reactivation(self, gamma, rho, t, prob=0.05):
-        if random.random() < prob:
-            spike = random.choice(["gamma", "rho"])
-            boost = random.uniform(0.5, 1.0)
-            if spike == "gamma":
+        # Always three draws per step (trigger, spike choice, boost) so the event
+        # stream stays aligned with batched runs regardless of outcomes.
+        trigger, spike, boost = self._events.take(3)
+        if trigger < prob:
+            boost = 0.5 + 0.5 * boost
+            if spike < 0.5:
                 gamma += boost
             else:
                 rho += boost
         return gamma, rho
 
     def maybe_inject_attractor(self, t):
-        for injection in self.attractor_injections:
-            if injection["t"] == t:
-                if injection["target"] == "H":
-                    self.H += injection["vector"]
-                elif injection["target"] == "M":
-                    self.M += injection["vector"]
-                elif injection["target"] == "R":
-                    self.R += injection["value"]
-
-    def simulate(self, n_timesteps=100):
-        self.initialize_manifolds()
-        results = {
-            'H_states': [],
-            'M_states': [],
-            'phase_sync': [],
-            'semantic_corr': [],
-            'procrustes_dist': [],
-            'reflection': []
-        }
+        self.attractor_injections.apply(self, t)
+
+    def simulate(self, n_timesteps=100, sink=None, engine=None, observers=(), stop=None, resume=False,
+                 aggregate=None):
+        """
+        Run the H/M loop for `n_timesteps` steps.
+
+        Args:
+            n_timesteps (int): Number of steps.
+            sink: Optional store with a `record()` method, such as a `TrajectoryStore`
+                from `create_trajectory`, that receives each step instead of an
+                in-memory `SimulationResults`.
+            engine (str): 'reference', 'closed_form' or 'compiled' (see engines.py);
+                defaults to `self.engine`.
+            observers: Objects with `record()`/`extend()`, such as a `LakeStateTracker`,
+                that see every step as it is produced.
+            stop: Stop conditions from stopping.py (one, a list, or a `StopMonitor`).
+                The run ends early once one fires; 'stop_reason' and 'stopped_at'
+                are added to the results (None and -1 if it ran to the end). The
+                reference loop stops right after the firing step, the block engines
+                at the end of the `check_every`-step block it fired in.
+            resume (bool): Continue from the current state (e.g. after `fork()` or
+                `load_checkpoint()`) instead of drawing fresh manifolds at t = 0.
+            aggregate: True, or a dict of `AggregatedResults` options (window,
+                lttb_points, raw, ...), to return per-window γ/ρ/d/R summaries and
+                LTTB-downsampled series instead of every state; memory then does
+                not grow with n_timesteps (see aggregation.py).
+        """
+        if not resume:
+            self.initialize_manifolds()
+            self.t = 0
+        if aggregate:
+            if sink is not None:
+                raise ValueError("pass either sink or aggregate, not both")
+            sink = AggregatedResults(n_timesteps, self.dim, **(aggregate if isinstance(aggregate, dict) else {}))
+        if sink is not None and sink.dim != self.dim:
+            raise ValueError(f"sink dim {sink.dim} does not match model dim {self.dim}")
+        results = sink if sink is not None else SimulationResults(n_timesteps, self.dim)
+        if stop is None:
+            self.advance(n_timesteps, ObservedResults(results, observers) if observers else results, engine)
+            return results
+
+        monitor = as_monitor(stop)
+        self._advance_until(monitor, n_timesteps, ObservedResults(results, list(observers) + [monitor]), engine)
+        if isinstance(results, MutableMapping):
+            results.update(monitor.summary())
+        return results
 
-        for t in range(n_timesteps):
+    def simulate_iter(self, n_timesteps=100, chunk_size=1000, engine=None, observers=(), stop=None, resume=False):
+        """
+        Generator form of `simulate` that yields the run as it is produced.
+
+        Yields (start, chunk) pairs, where `chunk` is a `SimulationResults` holding
+        steps [start, start + chunk.n_steps) of this run, at most `chunk_size` steps.
+        Chunks are independent, so memory stays bounded however long the run is.
+        With the reference engine the steps are identical to `simulate`'s; the
+        block engines restart their segment at chunk edges and agree to rounding.
+        The other arguments are as for `simulate`; with `stop`, the last chunk
+        carries 'stop_reason' and 'stopped_at'.
+        """
+        if not resume:
+            self.initialize_manifolds()
+            self.t = 0
+        monitor = as_monitor(stop) if stop is not None else None
+        watchers = list(observers) + ([monitor] if monitor is not None else [])
+        done = 0
+        while done < n_timesteps and not (monitor is not None and monitor.stopped):
+            chunk = SimulationResults(min(chunk_size, n_timesteps - done), self.dim)
+            recorder = ObservedResults(chunk, watchers) if watchers else chunk
+            if monitor is None:
+                self.advance(chunk.capacity, recorder, engine)
+            else:
+                self._advance_until(monitor, chunk.capacity, recorder, engine)
+                if monitor.stopped or done + chunk.n_steps >= n_timesteps:
+                    chunk.update(monitor.summary())
+            yield done, chunk
+            done += chunk.n_steps
+
+    def _advance_until(self, monitor, n_steps, results, engine=None):
+        """`advance` in blocks until `n_steps` are done or `monitor` reports the run stopped."""
+        block = 1 if (engine or self.engine) == 'reference' else monitor.check_every
+        done = 0
+        while done < n_steps and not monitor.stopped:
+            n = min(block, n_steps - done)
+            self.advance(n, results, engine)
+            done += n
+        return done
+
+    def advance(self, n_steps, results=None, engine=None):
+        """Continue the current run from step `self.t`, recording into `results` if given."""
+        engine = engine or self.engine
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        if engine == 'reference':
+            self._run_reference(self.t, self.t + n_steps, results)
+        else:
+            run_engine(self, n_steps, results, engine)
+
+    def _run_reference(self, start, stop, results):
+        for t in range(start, stop):
             self.maybe_inject_attractor(t)
-            gamma = self.compute_phase_synchronization(self.H, self.M)
-            rho = self.compute_semantic_correlation(self.H, self.M)
-            gamma, rho = self.maybe_stochastic_reactivation(gamma, rho, t)
-            gamma, rho = self.apply_memory_buffer(gamma, rho)
-
-            results['H_states'].append(self.H.copy())
-            results['M_states'].append(self.M.copy())
-            results['phase_sync'].append(gamma)
-            results['semantic_corr'].append(rho)
-            results['procrustes_dist'].append(self.compute_procrustes_distance(self.H, self.M))
-            results['reflection'].append(self.R)
+            gamma, rho, d = self.compute_metrics(self.H, self.M)
+            gamma, rho = self.maybe_stochastic_reactivation(gamma, rho, t, self.reactivation_prob)
+            gamma, rho = self.apply_memory_buffer(gamma, rho, self.memory_window)
+
+            if results is not None:
+                results.record(self.H, self.M, gamma, rho, d, self.R)
 
             self.H = self.update_manifold_H(self.H, self.M, self.R)
             self.M = self.update_manifold_M(self.M, self.H, self.R)
-            self.R = self.update_reflection(self.R, gamma, rho)
-
-        return results
+            self.R = self.update_reflection(self.R, gamma, rho, self.reflection_rate)
+        self.t = stop
 
     def add_attractor_injection(self, t, target, vector=None, value=None):
-        self.attractor_injections.append({
-            "t": t,
-            "target": target,
-            "vector": vector,
-            "value": value
-        })
+        self.attractor_injections.add(t, target, vector=vector, value=value)
+
+    # --- Snapshots ---
+
+    def fork(self, seed=None):
+        """
+        Independent copy of the complete current state, for branching a warmed-up run.
+
+        With seed=None the fork continues the same random streams, so it reproduces
+        this model's future exactly unless its injections are changed. A seed gives
+        the fork fresh streams for its remaining steps instead.
+        """
+        clone = copy.copy(self)
+        clone.H, clone.M = np.array(self.H), np.array(self.M)
+        (clone.streams, clone._noise, clone._events, clone.gamma_buffer, clone.rho_buffer,
+         clone.attractor_injections, clone.state) = copy.deepcopy(
+            (self.streams, self._noise, self._events, self.gamma_buffer, self.rho_buffer,
+             self.attractor_injections, self.state))
+        if seed is not None:
+            clone.seed = seed
+            clone.streams = spawn_streams(seed)
+            clone._noise = DrawBlock(clone.streams['noise'], 'normal')
+            clone._events = DrawBlock(clone.streams['events'], 'uniform')
+        clone.rng = clone.streams['user']
+        return clone
+
+    def save_checkpoint(self, path):
+        """Write the complete model state, RNG included, to an .npz file (see checkpoint.py)."""
+        checkpoint.save_checkpoint(self, path)
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        """A model restored from `save_checkpoint`, ready for `advance()`."""
+        return checkpoint.load_checkpoint(path)
@@ -2,15 +2,17 @@
 
 import random
 
-def should_reactivate(timestep, rate=0.1):
+def should_reactivate(timestep, rate=0.1, rng=None):
     """
     Determines whether a stochastic novelty jolt should occur at this timestep.
 
     Parameters:
     - timestep: Current timestep in the simulation
     - rate: Probability of reactivation per timestep
+    - rng: np.random.Generator to draw from (e.g. `model.rng`) for reproducible
+      runs; the global `random` module if omitted
 
     Returns:
     - Boolean indicating whether to trigger reactivation
     """
-    return random.random() < rate
+    return (rng.random() if rng is not None else random.random()) < rate
@@ -0,0 +1,284 @@
+"""
+Module: recon_log.py
+Purpose: Append-only log of memory-reconciliation events, with replay and compaction.
+
+Events are rows of the structured dtype `RECON_EVENT` (sequence number, location,
+strength, radius) held in one growable record array (`ReconLog.records`) instead of
+a list of dicts; indexing and iterating a `ReconLog` still yield the former dicts.
+With a path, every append is also written through to an append-only file and
+flushed to the OS (and fsync'ed with fsync=True) before `extend` returns:
+
+    [header]   magic b"RCDRLOG1", uint32 version, uint32 reserved, uint64 base
+    [records]  RECON_EVENT rows, seq = base, base + 1, ...
+
+A torn final record (e.g. after a crash mid-write) is ignored on open. `replay`
+rebuilds a curvature grid from events, scattering fixed-radius stencils into tiles
+in parallel. Compaction folds every event so far into a curvature snapshot (.npz of
+the touched tiles) and drops them from the log, so a restart loads the snapshot and
+replays only the tail.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import numpy as np
+
+from .tiled_grid import TiledGrid
+
+MAGIC = b"RCDRLOG1"
+VERSION = 1
+_HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('reserved', '<u4'), ('base', '<u8')])
+RECON_EVENT = np.dtype([('seq', '<i8'), ('x', '<f8'), ('y', '<f8'), ('strength', '<f8'), ('radius', '<f8')])
+
+
+def _write_header(f, base):
+    header = np.zeros(1, dtype=_HEADER)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['base'] = base
+    f.write(header.tobytes())
+
+
+def read_log(path):
+    """(base, records) of a log file; a partially written last record is dropped."""
+    header = np.fromfile(path, dtype=_HEADER, count=1)
+    if len(header) == 0 or header['magic'][0] != MAGIC:
+        raise ValueError(f"{path} is not a reconciliation log")
+    if header['version'][0] != VERSION:
+        raise ValueError(f"Unsupported log version {header['version'][0]}")
+    n = (os.path.getsize(path) - _HEADER.itemsize) // RECON_EVENT.itemsize
+    records = np.fromfile(path, dtype=RECON_EVENT, count=n, offset=_HEADER.itemsize)
+    return int(header['base'][0]), records
+
+
+def _as_dict(row):
+    _, x, y, strength, radius = row
+    return {"type": "M_recon", "location": (x, y), "strength": strength, "radius": radius}
+
+
+class ReconLog:
+    def __init__(self, path=None, capacity=1024, fsync=False):
+        """
+        Args:
+            path (str): Optional append-only log file. An existing file is resumed:
+                its records are loaded and new events are appended after them.
+            capacity (int): Initial in-memory capacity; grows by doubling.
+            fsync (bool): Also fsync the file after every batch, so logged events
+                survive an OS crash or power loss, not only a process crash.
+        """
+        self.path = path
+        self.fsync = fsync
+        self.base = 0                      # seq of the first record held
+        self._records = np.zeros(capacity, dtype=RECON_EVENT)
+        self._n = 0
+        self._file = None
+        if path is not None:
+            if os.path.exists(path) and os.path.getsize(path) >= _HEADER.itemsize:
+                self.base, records = read_log(path)
+                self._reserve(len(records))
+                self._records[:len(records)] = records
+                self._n = len(records)
+                with open(path, 'r+b') as f:   # drop a torn trailing record
+                    f.truncate(_HEADER.itemsize + self._n * RECON_EVENT.itemsize)
+            else:
+                with open(path, 'wb') as f:
+                    _write_header(f, 0)
+            self._file = open(path, 'ab')
+
+    @property
+    def records(self):
+        """View of the held records, oldest first."""
+        return self._records[:self._n]
+
+    @property
+    def next_seq(self):
+        """Sequence number the next event will get (total events ever logged)."""
+        return self.base + self._n
+
+    def _reserve(self, extra):
+        need = self._n + extra
+        if need > len(self._records):
+            grown = np.zeros(max(need, 2 * len(self._records)), dtype=RECON_EVENT)
+            grown[:self._n] = self._records[:self._n]
+            self._records = grown
+
+    def append(self, x, y, strength, radius):
+        self.extend([x], [y], [strength], [radius])
+
+    def extend(self, x, y, strength, radius):
+        """Log a batch of events given as parallel arrays."""
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        k = len(x)
+        self._reserve(k)
+        rows = self._records[self._n:self._n + k]
+        rows['seq'] = np.arange(self.next_seq, self.next_seq + k)
+        rows['x'] = x
+        rows['y'] = y
+        rows['strength'] = strength
+        rows['radius'] = radius
+        self._n += k
+        if self._file is not None:
+            self._file.write(rows.tobytes())
+            self.flush()
+
+    def since(self, seq):
+        """Held records with sequence number >= seq."""
+        return self.records[max(seq - self.base, 0):]
+
+    def compact(self, upto):
+        """Forget events with seq < `upto` (already folded into a snapshot), in memory and on disk."""
+        drop = min(max(upto - self.base, 0), self._n)
+        if drop == 0:
+            return
+        self._records = self._records[drop:self._n].copy()
+        self._n -= drop
+        self.base += drop
+        if self._file is not None:
+            self._file.close()
+            tmp = self.path + '.tmp'
+            with open(tmp, 'wb') as f:
+                _write_header(f, self.base)
+                f.write(self.records.tobytes())
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._file = open(self.path, 'ab')
+
+    def flush(self, fsync=None):
+        """Push buffered records to the file; fsync defaults to the log's setting."""
+        if self._file is not None:
+            self._file.flush()
+            if self.fsync if fsync is None else fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def clear(self):
+        """Drop every event; a backing file is truncated to an empty log."""
+        self.base = 0
+        self._n = 0
+        if self._file is not None:
+            self._file.close()
+            with open(self.path, 'wb') as f:
+                _write_header(f, 0)
+            self._file = open(self.path, 'ab')
+
+    def to_dicts(self):
+        """Events in the former list-of-dicts format."""
+        return [_as_dict(row) for row in self.records.tolist()]
+
+    # Indexing and iteration keep the former list-of-dicts interface; `records` is the
+    # structured array.
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [_as_dict(row) for row in self.records[index].tolist()]
+        return _as_dict(self.records[index].tolist())
+
+    def __iter__(self):
+        return iter(self.to_dicts())
+
+    def __repr__(self):
+        return f"ReconLog(held={self._n}, next_seq={self.next_seq}, path={self.path!r})"
+
+
+# --- Replay ---
+
+def kernel_cells(x, y, strength, radius, shape):
+    """
+    Cells and values of the M_recon kernel for events sharing one radius: every
+    in-grid cell closer than `radius` to an event gets strength · exp(-dist² / 2r).
+    """
+    reach = int(np.ceil(radius))
+    offsets = np.arange(-reach, reach + 2)
+    off_x = np.repeat(offsets, len(offsets))
+    off_y = np.tile(offsets, len(offsets))
+    cx = np.floor(x).astype(np.intp)[:, None] + off_x[None, :]
+    cy = np.floor(y).astype(np.intp)[:, None] + off_y[None, :]
+    dist2 = (cx - x[:, None]) ** 2 + (cy - y[:, None]) ** 2
+    keep = (dist2 < radius * radius) & (cx >= 0) & (cx < shape[0]) & (cy >= 0) & (cy < shape[1])
+    strength = np.broadcast_to(strength[:, None], keep.shape)[keep]
+    return cx[keep], cy[keep], strength * np.exp(-dist2[keep] / (2 * radius))
+
+
+def _accumulate(grid, cx, cy, vals, pool):
+    """Add values at cells into `grid`, one bincount per touched tile, tiles in parallel."""
+    t = grid.tile
+    key = (cx // t) * grid.n_tiles[1] + cy // t
+    order = np.argsort(key, kind='stable')
+    key, cx, cy, vals = key[order], cx[order], cy[order], vals[order]
+    bounds = np.flatnonzero(np.diff(key)) + 1
+    spans = list(zip(np.r_[0, bounds], np.r_[bounds, len(key)]))
+    tiles = [divmod(int(key[lo]), grid.n_tiles[1]) for lo, _ in spans]
+    blocks = [grid.writable_tile(i, j) for i, j in tiles]   # allocate serially, fill in parallel
+
+    def fill(k):
+        (lo, hi), (i, j), block = spans[k], tiles[k], blocks[k]
+        rows, cols = cx[lo:hi] - i * t, cy[lo:hi] - j * t
+        if hi - lo < block.size // 4:   # sparse hits: scatter directly
+            np.add.at(block, (rows, cols), vals[lo:hi])
+        else:
+            flat = rows * block.shape[1] + cols
+            block += np.bincount(flat, weights=vals[lo:hi], minlength=block.size).reshape(block.shape)
+
+    list(pool.map(fill, range(len(spans))))
+
+
+def replay(grid, records, workers=None, max_points=1 << 22):
+    """
+    Add the kernels of `records` (RECON_EVENT rows) into `grid`, a `TiledGrid`.
+
+    Events are grouped by radius and expanded to cells in chunks of about
+    `max_points`; each chunk is scattered tile by tile on a thread pool. Sums are
+    the same as applying the events one by one up to floating-point rounding.
+    """
+    records = np.asarray(records)
+    if len(records) == 0:
+        return grid
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for r in np.unique(records['radius']):
+            if r <= 0:
+                continue
+            group = records[records['radius'] == r]
+            cells = (2 * int(np.ceil(r)) + 3) ** 2
+            chunk = max(1, max_points // cells)
+            for start in range(0, len(group), chunk):
+                part = group[start:start + chunk]
+                cx, cy, vals = kernel_cells(part['x'], part['y'], part['strength'], r, grid.shape)
+                if len(vals):
+                    _accumulate(grid, cx, cy, vals, pool)
+    return grid
+
+
+# --- Snapshots ---
+
+def save_snapshot(grid, path, seq):
+    """Write the touched tiles of `grid`, which include every event with seq < `seq`."""
+    meta = {'shape': grid.shape, 'tile': grid.tile, 'fill': grid.fill, 'seq': int(seq)}
+    tiles = {f'tile_{i}_{j}': block for (i, j), block in grid.tiles()}
+    np.savez(path, meta=np.array(json.dumps(meta)), **tiles)
+
+
+def load_snapshot(path):
+    """(grid, seq): the `TiledGrid` stored by `save_snapshot` and the first seq it lacks."""
+    with np.load(path) as data:
+        meta = json.loads(str(data['meta']))
+        grid = TiledGrid(meta['shape'], tile=meta['tile'], fill=meta['fill'])
+        for key in data.files:
+            if key.startswith('tile_'):
+                _, i, j = key.split('_')
+                grid.set_tile(int(i), int(j), data[key])
+    return grid, meta['seq']
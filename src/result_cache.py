@@ -0,0 +1,130 @@
+"""
+Module: result_cache.py
+Purpose: Stable-hash keyed cache of simulation results, LRU in memory with an optional disk tier.
+
+Keys are built by `stable_hash` from plain Python values (str, int, float, bool,
+None, lists/tuples, dicts, NumPy scalars and arrays). Unlike the built-in `hash()`,
+which Python salts per process for strings, the digest is the same on every run
+and every machine, so it can name files and be shared between processes.
+
+Cached values are dicts of arrays, such as `SimulationResults.to_dict()`. The
+memory tier keeps the `maxsize` most recently used entries. With a `directory`,
+every entry is also written there as `<key>.npz` and a memory miss falls back to
+disk, so results survive restarts and can be shared by several app processes.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+
+
+def _canonical(value):
+    """JSON-compatible form of `value` with a single spelling per value."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return {'__ndarray__': value.dtype.str, 'shape': list(value.shape),
+                'sha256': hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}
+    if isinstance(value, np.generic):
+        return _canonical(value.item())
+    if isinstance(value, float):
+        return {'__float__': value.hex()}   # exact, and distinguishes 1.0 from 1
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    raise TypeError(f"Cannot build a stable hash for {type(value).__name__}")
+
+
+def stable_hash(*parts):
+    """Hex SHA-256 digest of `parts`, identical across processes and platforms."""
+    text = json.dumps(_canonical(list(parts)), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, maxsize=64, directory=None):
+        """
+        Args:
+            maxsize (int): Entries kept in memory; the least recently used is evicted.
+            directory (str): Optional directory for the on-disk tier (created if needed).
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()   # Streamlit serves sessions from several threads
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+        if self.directory is not None and os.path.exists(self._path(key)):
+            with np.load(self._path(key)) as data:
+                value = {name: data[name] for name in data.files}
+            self._remember(key, value)
+            with self._lock:
+                self.disk_hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def _remember(self, key, value):
+        for array in value.values():
+            array.flags.writeable = False   # shared between callers
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def put(self, key, value):
+        """Store a dict of arrays under `key` in memory and, if enabled, on disk."""
+        value = {name: np.array(array) for name, array in value.items()}
+        self._remember(key, value)
+        if self.directory is not None:
+            # Write to a temporary file first so readers never see a partial entry.
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.npz')
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **value)
+            os.replace(tmp, self._path(key))
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Cached value for `key`, calling `compute()` and storing its result on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def __contains__(self, key):
+        return key in self._memory or (self.directory is not None and os.path.exists(self._path(key)))
+
+    def __len__(self):
+        return len(self._memory)
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._memory.clear()
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.npz'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def __repr__(self):
+        return (f"ResultCache(size={len(self._memory)}/{self.maxsize}, hits={self.hits}, "
+                f"disk_hits={self.disk_hits}, misses={self.misses}, directory={self.directory!r})")
@@ -0,0 +1,128 @@
+"""
+Module: results.py
+Purpose: Columnar, preallocated storage for simulation trajectories.
+
+`SimulationResults` replaces the lists-of-copies that `simulate()` used to build.
+States live in contiguous (T, dim) arrays and every metric in a (T,) array, while
+dict-style access to the familiar keys ('H_states', 'phase_sync', ...) keeps
+existing analyses and the Streamlit apps working unchanged.
+"""
+
+from collections.abc import Mapping, MutableMapping
+import numpy as np
+
+STATE_KEYS = ('H_states', 'M_states')
+METRIC_KEYS = ('phase_sync', 'semantic_corr', 'procrustes_dist', 'reflection')
+
+
+class SimulationResults(MutableMapping):
+    def __init__(self, n_timesteps, dim, dtype=np.float64):
+        """
+        Args:
+            n_timesteps (int): Capacity in steps; arrays are allocated once, up front.
+            dim (int): Dimension of the H and M state vectors.
+            dtype: Storage dtype for states and metrics.
+        """
+        self.capacity = n_timesteps
+        self.dim = dim
+        self.n_steps = 0
+        self._columns = {key: np.empty((n_timesteps, dim), dtype=dtype) for key in STATE_KEYS}
+        self._columns.update({key: np.empty(n_timesteps, dtype=dtype) for key in METRIC_KEYS})
+        self._extra = {}
+
+    def record(self, H, M, gamma, rho, d, R):
+        """Write one step into the next free row."""
+        t = self.n_steps
+        if t >= self.capacity:
+            raise IndexError(f"SimulationResults is full ({self.capacity} steps)")
+        cols = self._columns
+        cols['H_states'][t] = H
+        cols['M_states'][t] = M
+        cols['phase_sync'][t] = gamma
+        cols['semantic_corr'][t] = rho
+        cols['procrustes_dist'][t] = d
+        cols['reflection'][t] = R
+        self.n_steps = t + 1
+
+    def extend(self, H, M, gamma, rho, d, R):
+        """Write a block of steps: H, M of shape (n, dim) and (n,) metric arrays."""
+        t, n = self.n_steps, len(H)
+        if t + n > self.capacity:
+            raise IndexError(f"SimulationResults is full ({self.capacity} steps)")
+        cols = self._columns
+        cols['H_states'][t:t + n] = H
+        cols['M_states'][t:t + n] = M
+        cols['phase_sync'][t:t + n] = gamma
+        cols['semantic_corr'][t:t + n] = rho
+        cols['procrustes_dist'][t:t + n] = d
+        cols['reflection'][t:t + n] = R
+        self.n_steps = t + n
+
+    @property
+    def nbytes(self):
+        """Bytes preallocated for the trajectory columns."""
+        return sum(column.nbytes for column in self._columns.values())
+
+    def to_dict(self):
+        """Plain dict of array copies, e.g. for pickling or `np.savez`."""
+        out = {key: np.array(self[key]) for key in self._columns}
+        out.update(self._extra)
+        return out
+
+    # --- Mapping interface: columns are views trimmed to the recorded steps ---
+
+    def __getitem__(self, key):
+        if key in self._columns:
+            return self._columns[key][:self.n_steps]
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._columns:
+            raise KeyError(f"'{key}' is a preallocated column; use record()")
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._columns:
+            raise KeyError(f"'{key}' is a preallocated column and cannot be removed")
+        del self._extra[key]
+
+    def __iter__(self):
+        yield from self._columns
+        yield from self._extra
+
+    def __len__(self):
+        return len(self._columns) + len(self._extra)
+
+    def __repr__(self):
+        return f"SimulationResults(n_steps={self.n_steps}, dim={self.dim}, keys={list(self)})"
+
+
+class ObservedResults(Mapping):
+    """
+    Forwards every `record()`/`extend()` to a primary store and to observers such as
+    a `LakeStateTracker`; reads go to the primary store.
+    """
+
+    def __init__(self, primary, observers):
+        self.primary = primary
+        self.observers = list(observers)
+        self.dim = primary.dim
+
+    def record(self, H, M, gamma, rho, d, R):
+        self.primary.record(H, M, gamma, rho, d, R)
+        for observer in self.observers:
+            observer.record(H, M, gamma, rho, d, R)
+
+    def extend(self, H, M, gamma, rho, d, R):
+        self.primary.extend(H, M, gamma, rho, d, R)
+        for observer in self.observers:
+            observer.extend(H, M, gamma, rho, d, R)
+
+    def __getitem__(self, key):
+        return self.primary[key]
+
+    def __iter__(self):
+        return iter(self.primary)
+
+    def __len__(self):
+        return len(self.primary)
@@ -0,0 +1,113 @@
+"""
+Module: ring_buffer.py
+Purpose: Fixed-capacity ring buffers shared by the model, the runner and the apps.
+
+`RingBuffer` stores items in one preallocated array and overwrites the oldest slot
+when full, so appends never shift memory. For numeric dtypes it keeps a running sum,
+making the windowed mean O(1) per step regardless of capacity. Items may also be
+vectors (`shape=(N,)`), which lets a batched ensemble smooth N members at once.
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity, shape=(), dtype=np.float64):
+        """
+        Args:
+            capacity (int): Maximum number of items kept.
+            shape (tuple): Shape of each item; () for scalars.
+            dtype: Item dtype. Numeric dtypes track a running sum; object or
+                structured dtypes are stored without one.
+        """
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1")
+        self.capacity = int(capacity)
+        self.shape = tuple(shape) if isinstance(shape, tuple) else (int(shape),)
+        self._data = np.zeros((self.capacity,) + self.shape, dtype=dtype)
+        self._numeric = np.issubdtype(self._data.dtype, np.number)
+        self.clear()
+
+    def clear(self):
+        self._head = 0  # next slot to write
+        self._count = 0
+        self._sum = np.zeros(self.shape) if self.shape else 0.0
+
+    @property
+    def full(self):
+        return self._count == self.capacity
+
+    def append(self, value):
+        """Add an item, evicting the oldest one when the buffer is full."""
+        slot = self._head
+        if self._numeric:
+            old = self._data[slot].copy() if self.full else 0.0
+            self._data[slot] = value
+            self._sum = self._sum + self._data[slot] - old
+        else:
+            self._data[slot] = value
+        if self._count < self.capacity:
+            self._count += 1
+        self._head = (slot + 1) % self.capacity
+        if self._head == 0 and self._numeric:
+            # Re-sum once per wrap so rounding error cannot accumulate (amortized O(1)).
+            self._sum = self._data.sum(axis=0)
+
+    def mean(self):
+        """Mean of the stored items; NaN while empty."""
+        if not self._numeric:
+            raise TypeError("mean() requires a numeric RingBuffer")
+        if self._count == 0:
+            return np.full(self.shape, np.nan) if self.shape else float('nan')
+        return self._sum / self._count
+
+    def values(self):
+        """Stored items, oldest first, as a new array."""
+        if self._count < self.capacity:
+            return self._data[:self._count].copy()
+        return np.concatenate((self._data[self._head:], self._data[:self._head]))
+
+    def last(self):
+        if self._count == 0:
+            raise IndexError("last() on empty RingBuffer")
+        return self._data[self._head - 1]
+
+    def resized(self, capacity):
+        """New buffer of a different capacity holding the most recent items."""
+        other = RingBuffer(capacity, self.shape, self._data.dtype)
+        for value in self.values()[-capacity:]:
+            other.append(value)
+        return other
+
+    def get_state(self):
+        """Raw slots, head, count and running sum; `set_state` restores them exactly."""
+        return {'data': self._data.copy(), 'head': self._head, 'count': self._count,
+                'sum': np.array(self._sum, dtype=float)}
+
+    def set_state(self, state):
+        self._data = np.array(state['data'])
+        self.capacity = len(self._data)
+        self._head = int(state['head'])
+        self._count = int(state['count'])
+        total = np.array(state['sum'], dtype=float)
+        self._sum = total if self.shape else float(total)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return iter(self.values())
+
+    def __repr__(self):
+        return f"{type(self).__name__}(capacity={self.capacity}, len={self._count})"
+
+
+class RollingMemoryBuffer(RingBuffer):
+    """Scalar smoothing window: `update(x)` records x and returns the windowed mean."""
+
+    def __init__(self, size=5):
+        super().__init__(size)
+
+    def update(self, value):
+        self.append(value)
+        return self.mean()
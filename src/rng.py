@@ -0,0 +1,78 @@
+"""
+Module: rng.py
+Purpose: Per-instance random streams for RCD models.
+
+A model owns independent `np.random.Generator` streams spawned from one
+`SeedSequence`, one per purpose, so no draw ever touches NumPy's or Python's global
+state. Because each purpose has its own stream, the values a run consumes do not
+depend on how other draws are interleaved, which lets noise be pre-drawn in bulk
+and lets a batched ensemble consume exactly the draws a single run would.
+"""
+
+import numpy as np
+
+# init:   initial H/M draws
+# noise:  per-step H/M noise, pre-drawn in blocks
+# events: stochastic reactivation, three uniforms per step
+# user:   draws made on the model's behalf (injections, novelty triggers)
+STREAM_NAMES = ('init', 'noise', 'events', 'user')
+
+
+def as_seed_sequence(seed):
+    """Accept an int, None or an existing SeedSequence (e.g. from `.spawn()`)."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def generator_from_state(state):
+    """A new Generator whose bit generator resumes from `bit_generator.state`."""
+    bit_generator = getattr(np.random, state['bit_generator'])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+def spawn_streams(seed):
+    """Independent generators for every name in `STREAM_NAMES`."""
+    children = as_seed_sequence(seed).spawn(len(STREAM_NAMES))
+    return {name: np.random.default_rng(child) for name, child in zip(STREAM_NAMES, children)}
+
+
+class DrawBlock:
+    """
+    Pre-drawn block of standard normals or uniforms consumed sequentially.
+
+    `take(n)` returns the next n values of the underlying stream; the generator is
+    called once per `block_size` values instead of once per step. The sequence is
+    identical to drawing the values one call at a time.
+    """
+
+    def __init__(self, rng, kind='normal', block_size=4096):
+        if kind not in ('normal', 'uniform'):
+            raise ValueError(f"Unknown draw kind '{kind}'")
+        self.rng = rng
+        self.kind = kind
+        self.block_size = block_size
+        self._buf = np.empty(0)
+        self._pos = 0
+
+    def _draw(self, n):
+        return self.rng.standard_normal(n) if self.kind == 'normal' else self.rng.random(n)
+
+    def take(self, n):
+        if self._pos + n > len(self._buf):
+            rest = self._buf[self._pos:]
+            self._buf = np.concatenate((rest, self._draw(max(self.block_size, n - len(rest)))))
+            self._pos = 0
+        out = self._buf[self._pos:self._pos + n]
+        self._pos += n
+        return out
+
+    def pending(self):
+        """Values drawn from the generator but not yet handed out by `take`."""
+        return self._buf[self._pos:].copy()
+
+    def restore(self, pending):
+        """Resume with `pending` (from `pending()`) as the next values to hand out."""
+        self._buf = np.array(pending, dtype=float)
+        self._pos = 0
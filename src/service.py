@@ -0,0 +1,339 @@
+"""
+Module: service.py
+Purpose: Headless HTTP simulation service that coalesces concurrent jobs into ensemble runs.
+
+A job is a JSON object describing one run of `RCDModel(seed=seed)` configured with
+`set_parameters(alpha, beta, delta, n_dimensions=dim, noise_level)`, as the apps and
+sweep.py run it (see `JOB_DEFAULTS`). Jobs from concurrent requests are queued; a batcher thread
+collects whatever arrives within `max_wait` seconds, groups jobs that share `dim`
+and `n_timesteps`, and runs each group as a single `RCDEnsemble`, so N users cost one
+vectorized run instead of N Python loops. A lone job runs on the compiled engine
+instead, which is faster for one long run. Batches execute on a process pool that
+stays warm between requests.
+
+Endpoints:
+    POST /simulate   JSON job -> .npz body (application/x-npz), one array per result
+                     key plus 't' (the step of each row) and the job's parameters
+    GET  /health     JSON counters: jobs, batches, largest batch, queue length
+
+Runs advance in chunks of about `CHUNK_CELLS` state values per batch, and with
+`max_points` each chunk is decimated on the server as it is produced (see
+downsample.py), so a million-step run returns a few thousand rows and never holds
+its full trajectory. A job's response (its returned rows times the recorded
+values per row) is limited to `MAX_RESULT_CELLS`, and batches are split so their
+combined responses stay within `MAX_BATCH_CELLS`.
+
+CLI:
+    python -m src.service --port 8765 --workers 2
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import json
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .rcd_model import RCDModel
+from .ensemble import RCDEnsemble
+from .downsample import StreamDecimator
+
+CONTENT_TYPE = 'application/x-npz'
+MAX_TIMESTEPS = 1_000_000
+MAX_DIM = 1_000
+MAX_RESULT_CELLS = 25_000_000   # values in one job's response, see _output_cells
+MAX_BATCH_CELLS = 50_000_000    # values in the responses of one batch
+CHUNK_CELLS = 2_000_000         # members · steps · dim advanced per chunk
+JOB_DEFAULTS = {
+    'seed': 42,
+    'dim': 10,
+    'n_timesteps': 100,
+    'alpha': 0.5,
+    'beta': 0.1,
+    'delta': 0.05,
+    'noise_level': 0.01,
+    'max_points': None,    # decimate the returned series to at most this many rows
+}
+SERIES_KEYS = ('H_states', 'M_states', 'phase_sync', 'semantic_corr', 'procrustes_dist', 'reflection')
+PARAM_KEYS = ('alpha', 'beta', 'delta', 'noise_level')
+
+
+def normalize_job(job):
+    """`job` merged over `JOB_DEFAULTS` and type-checked; raises ValueError if invalid."""
+    unknown = set(job) - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown job fields: {sorted(unknown)}")
+    job = {**JOB_DEFAULTS, **job}
+    try:
+        for key in ('seed', 'dim', 'n_timesteps'):
+            job[key] = int(job[key])
+        for key in PARAM_KEYS:
+            job[key] = float(job[key])
+        if job['max_points'] is not None:
+            job['max_points'] = int(job['max_points'])
+    except (TypeError, ValueError):
+        raise ValueError("Job fields must be numbers") from None
+    if not 1 <= job['dim'] <= MAX_DIM or not 1 <= job['n_timesteps'] <= MAX_TIMESTEPS:
+        raise ValueError(f"dim must be in [1, {MAX_DIM}] and n_timesteps in [1, {MAX_TIMESTEPS}]")
+    if job['max_points'] is not None and job['max_points'] < 2:
+        raise ValueError("max_points must be at least 2")
+    if _output_cells(job) > MAX_RESULT_CELLS:
+        raise ValueError(f"The response would hold {_output_cells(job):,} values (limit {MAX_RESULT_CELLS:,}); "
+                         f"lower n_timesteps, dim or max_points")
+    return job
+
+
+def _output_cells(job):
+    """Values in a job's response: returned rows times (H and M states, metrics, 't')."""
+    rows = job['n_timesteps'] if job['max_points'] is None else min(job['n_timesteps'], job['max_points'])
+    return rows * (2 * job['dim'] + len(SERIES_KEYS) - 1)
+
+
+class _JobOutput:
+    """Collects one job's chunks: decimated as they arrive with max_points, else kept whole."""
+
+    def __init__(self, job):
+        self.job = job
+        self.decimator = StreamDecimator(job['max_points']) if job['max_points'] is not None else None
+        self.chunks = []
+
+    def extend(self, start, series):
+        if self.decimator is not None:
+            self.decimator.extend(start, series)
+        else:
+            self.chunks.append(series)
+
+    def result(self):
+        """Series with step indices 't' and the job's parameters attached."""
+        if self.decimator is not None:
+            t, series = self.decimator.series()
+        else:
+            series = {key: np.concatenate([chunk[key] for chunk in self.chunks]) for key in SERIES_KEYS}
+            t = np.arange(len(series['reflection']))
+        out = dict(series, t=t)
+        out.update((key, np.array(self.job[key])) for key in ('seed',) + PARAM_KEYS)
+        return out
+
+
+def _model(job):
+    model = RCDModel(seed=job['seed'])
+    model.set_parameters(alpha=job['alpha'], beta=job['beta'], delta=job['delta'],
+                         n_dimensions=job['dim'], noise_level=job['noise_level'])
+    return model
+
+
+def run_batch(jobs):
+    """
+    Results of `jobs`, which must share `dim` and `n_timesteps`, as one dict of
+    arrays per job. Runs in the worker processes.
+    """
+    dim, n = jobs[0]['dim'], jobs[0]['n_timesteps']
+    outputs = [_JobOutput(job) for job in jobs]
+    chunk = max(1, CHUNK_CELLS // (len(jobs) * dim))
+    if len(jobs) == 1:
+        for start, results in _model(jobs[0]).simulate_iter(n, chunk_size=chunk, engine='compiled'):
+            outputs[0].extend(start, {key: results[key] for key in SERIES_KEYS})
+        return [outputs[0].result()]
+    ensemble = RCDEnsemble([job['seed'] for job in jobs], dim=dim, set_parameters=True,
+                           **{key: [job[key] for job in jobs] for key in PARAM_KEYS})
+    for start in range(0, n, chunk):
+        results = ensemble.simulate(min(chunk, n - start), resume=start > 0)
+        for i, output in enumerate(outputs):
+            output.extend(start, {key: results[key][i] for key in SERIES_KEYS})
+    return [output.result() for output in outputs]
+
+
+def encode_result(result):
+    """Dict of arrays -> uncompressed .npz bytes (columnar, one array per key)."""
+    buffer = io.BytesIO()
+    np.savez(buffer, **result)
+    return buffer.getvalue()
+
+
+def decode_result(data):
+    """Inverse of `encode_result`."""
+    with np.load(io.BytesIO(data)) as arrays:
+        return {name: arrays[name] for name in arrays.files}
+
+
+class BatchingWorker:
+    def __init__(self, max_batch=64, max_wait=0.005, workers=None):
+        """
+        Args:
+            max_batch (int): Most jobs run together in one ensemble.
+            max_wait (float): Seconds the batcher waits after the first queued job
+                for others to join its batch.
+            workers (int): Worker processes; 0 runs batches on the batcher thread.
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._pool = ProcessPoolExecutor(max_workers=workers) if workers != 0 else None
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._loop, name='rcd-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        """Queue a job; returns a Future for its dict of result arrays."""
+        future = Future()
+        self._queue.put((normalize_job(job), future))
+        return future
+
+    async def simulate(self, job):
+        """Awaitable form of `submit`, for asyncio callers."""
+        return await asyncio.wrap_future(self.submit(job))
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            pending = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(pending) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)   # finish this batch, then stop
+                    break
+                pending.append(item)
+
+            groups = {}
+            for job, future in pending:
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault((job['dim'], job['n_timesteps']), []).append((job, future))
+            for group in groups.values():
+                batch, cells = [], 0
+                for job, future in group:
+                    if batch and (len(batch) == self.max_batch or cells + _output_cells(job) > MAX_BATCH_CELLS):
+                        self._dispatch(batch)
+                        batch, cells = [], 0
+                    batch.append((job, future))
+                    cells += _output_cells(job)
+                self._dispatch(batch)
+
+    def _dispatch(self, items):
+        with self._lock:
+            self.jobs += len(items)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(items))
+        jobs = [job for job, _ in items]
+        if self._pool is None:
+            try:
+                self._resolve(items, run_batch(jobs))
+            except Exception as error:
+                self._resolve(items, error=error)
+            return
+        batch = self._pool.submit(run_batch, jobs)
+        batch.add_done_callback(lambda done: self._resolve(items, error=done.exception())
+                                if done.exception() else self._resolve(items, done.result()))
+
+    @staticmethod
+    def _resolve(items, results=None, error=None):
+        for i, (_, future) in enumerate(items):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def stats(self):
+        with self._lock:
+            return {'jobs': self.jobs, 'batches': self.batches, 'largest_batch': self.largest_batch,
+                    'queued': self._queue.qsize()}
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+# --- HTTP front-end ---
+
+class _Handler(BaseHTTPRequestHandler):
+    def _send(self, status, body, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode('utf-8'))
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._error(404, f"No such endpoint: {self.path}")
+        self._send(200, json.dumps(self.server.worker.stats()).encode('utf-8'))
+
+    def do_POST(self):
+        if self.path != '/simulate':
+            return self._error(404, f"No such endpoint: {self.path}")
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not isinstance(job, dict):
+                raise ValueError("The job must be a JSON object")
+            future = self.server.worker.submit(job)
+        except ValueError as error:   # includes malformed JSON
+            return self._error(400, str(error))
+        try:
+            result = future.result()
+        except Exception as error:
+            return self._error(500, f"{type(error).__name__}: {error}")
+        self._send(200, encode_result(result), CONTENT_TYPE)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class SimulationService(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 8765), worker=None, verbose=False):
+        """
+        Args:
+            address (tuple): (host, port) to listen on; port 0 picks a free one.
+            worker (BatchingWorker): Shared job batcher; one is created if omitted.
+            verbose (bool): Log every request to stderr.
+        """
+        self.worker = worker if worker is not None else BatchingWorker()
+        self.verbose = verbose
+        super().__init__(address, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        self.worker.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless RCD simulation service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (0: in the batcher thread)")
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait', type=float, default=0.005, help="seconds to wait for jobs to batch")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    worker = BatchingWorker(max_batch=args.max_batch, max_wait=args.max_wait, workers=args.workers)
+    with SimulationService((args.host, args.port), worker, verbose=args.verbose) as server:
+        print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
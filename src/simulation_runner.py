@@ -1,10 +1,21 @@
 # simulation_runner.py
+#
+# CLI:
+#     python -m src.simulation_runner --timesteps 1000 --seed 0 --inject 10:R=0.5 --profile
+#     python -m src.simulation_runner --timesteps 100000 --progress 1 --out run.npz
+#     python -m src.simulation_runner --timesteps 1000000 --window 1000 --out summary.npz
 
+import argparse
+from collections.abc import MutableMapping
 import numpy as np
-from src.rcd_model import RCDModel
-from src.reactivation_trigger import should_reactivate
-from app.memory_buffer import RollingMemoryBuffer
-from src.attractor_injection import inject_attractors
+from .aggregation import AggregatedResults
+from .rcd_model import RCDModel
+from .results import SimulationResults, ObservedResults, STATE_KEYS, METRIC_KEYS
+from .stopping import as_monitor, DistanceTolerance
+from .reactivation_trigger import should_reactivate
+from .ring_buffer import RollingMemoryBuffer
+from .attractor_injection import InjectionSchedule
+from .instrumentation import NULL_PROFILER, RunProfiler
 
 class SimulationRunner:
     """
@@ -14,65 +25,166 @@ class SimulationRunner:
     - attractor injection (symbolic modulation of H, M, R)
     """
 
-    def __init__(self, timesteps=100, buffer_size=5, inject_schedule=None, reactivation_rate=0.1):
+    def __init__(self, timesteps=100, buffer_size=5, inject_schedule=None, reactivation_rate=0.1, sink=None, observers=(), stop=None, profiler=None,
+                 dim=10, seed=42, aggregate=None):
         self.timesteps = timesteps
         self.buffer_size = buffer_size
-        self.inject_schedule = inject_schedule or {}  # e.g. {10: {"R": 0.5}, 50: {"H": [0.2]*10}}
+        # An InjectionSchedule, or the dict shorthand {10: {"R": 0.5}, 50: {"H": [0.2]*10}}
+        if not isinstance(inject_schedule, InjectionSchedule):
+            inject_schedule = InjectionSchedule.from_dict(inject_schedule or {})
+        self.inject_schedule = inject_schedule
         self.reactivation_rate = reactivation_rate
 
-        self.model = RCDModel()
+        # Reactivation draws come from the model's 'user' stream, so a seed fixes the whole run.
+        self.model = RCDModel(dim=dim, seed=seed)
         self.model.initialize_manifolds()
 
         self.gamma_buffer = RollingMemoryBuffer(buffer_size)
         self.rho_buffer = RollingMemoryBuffer(buffer_size)
 
-        self.results = {
-            'H_states': [],
-            'M_states': [],
-            'phase_sync': [],
-            'semantic_corr': [],
-            'procrustes_dist': [],
-            'reflection': []
-        }
+        # A sink (e.g. a TrajectoryStore) streams steps to disk instead of memory;
+        # aggregate (True or AggregatedResults options) keeps only per-window summaries
+        # and downsampled series, so memory does not grow with timesteps.
+        if aggregate:
+            if sink is not None:
+                raise ValueError("pass either sink or aggregate, not both")
+            sink = AggregatedResults(timesteps, self.model.dim, **(aggregate if isinstance(aggregate, dict) else {}))
+        self.results = sink if sink is not None else SimulationResults(timesteps, self.model.dim)
+        # Observers (e.g. a LakeStateTracker) see each step as it is recorded.
+        # Stop conditions (see stopping.py) end the run early once one fires.
+        self.stop_monitor = as_monitor(stop) if stop is not None else None
+        observers = list(observers) + ([self.stop_monitor] if self.stop_monitor else [])
+        self._recorder = ObservedResults(self.results, observers) if observers else self.results
+        # A RunProfiler (see instrumentation.py) times each phase of the loop, counts
+        # reactivations and injections, and reports progress at a limited rate.
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self._ran = False
 
     def run(self):
+        if self._ran:
+            raise RuntimeError("SimulationRunner.run() has already filled its results; create a new runner")
+        self._ran = True
+        if self.stop_monitor is not None:
+            self.stop_monitor.reset()   # time limits count from here, not from construction
+        profiler = self.profiler
+        profiler.start(self.timesteps)
         for t in range(self.timesteps):
-            # Store states
-            self.results['H_states'].append(self.model.H.copy())
-            self.results['M_states'].append(self.model.M.copy())
-
             # Core metrics
-            gamma = self.model.compute_phase_synchronization(self.model.H, self.model.M)
-            rho = self.model.compute_semantic_correlation(self.model.H, self.model.M)
-            d = self.model.compute_procrustes_distance(self.model.H, self.model.M)
+            gamma, rho, d = self.model.compute_metrics(self.model.H, self.model.M)
+            profiler.lap("metrics")
 
             # Smooth with rolling memory
             gamma_smoothed = self.gamma_buffer.update(gamma)
             rho_smoothed = self.rho_buffer.update(rho)
+            profiler.lap("smoothing")
 
             # Potentially reactivate
-            if should_reactivate(t, self.reactivation_rate):
-                gamma_smoothed += np.random.uniform(0.3, 0.7)
-                rho_smoothed += np.random.uniform(0.3, 0.7)
+            if should_reactivate(t, self.reactivation_rate, rng=self.model.rng):
+                gamma_smoothed += self.model.rng.uniform(0.3, 0.7)
+                rho_smoothed += self.model.rng.uniform(0.3, 0.7)
                 gamma_smoothed = min(gamma_smoothed, 1.0)
                 rho_smoothed = min(rho_smoothed, 1.0)
+                profiler.count("reactivations")
+            profiler.lap("reactivation")
 
-            # Log metrics
-            self.results['phase_sync'].append(gamma_smoothed)
-            self.results['semantic_corr'].append(rho_smoothed)
-            self.results['procrustes_dist'].append(d)
-            self.results['reflection'].append(self.model.R)
+            # Store states and metrics
+            self._recorder.record(self.model.H, self.model.M, gamma_smoothed, rho_smoothed, d, self.model.R)
+            profiler.lap("record")
 
             # Attractor injection (controlled symbolic modulation)
-            if t in self.inject_schedule:
-                inject_attractors(self.model, self.inject_schedule[t])
+            injected = self.inject_schedule.apply(self.model, t)
+            if injected:
+                profiler.count("injections", injected)
+            profiler.lap("injection")
 
             # Update state
             self.model.H = self.model.update_manifold_H(self.model.H, self.model.M, self.model.R)
             self.model.M = self.model.update_manifold_M(self.model.M, self.model.H, self.model.R)
             self.model.R = self.model.update_reflection(self.model.R, gamma_smoothed, rho_smoothed)
+            profiler.lap("state_update")
+
+            profiler.step(t, gamma=gamma_smoothed, rho=rho_smoothed, R=self.model.R, Lambda=1 - d)
 
-            # Optional: print status
-            print(f"t={t:03} | γ(t): {gamma_smoothed:.3f} | ρ(t): {rho_smoothed:.3f} | R(t): {self.model.R:.3f} | Λ(t): {1-d:.3f}")
+            if self.stop_monitor is not None and self.stop_monitor.stopped:
+                profiler.count("early_stop")
+                break
 
+        profiler.finish()
+        if self.stop_monitor is not None and isinstance(self.results, MutableMapping):
+            self.results.update(self.stop_monitor.summary())
         return self.results
+
+
+def _parse_injection(text, dim):
+    """'T:TARGET=VALUE' (e.g. '10:R=0.5', '50:H=0.2') -> (t, target, amount); H/M values fill every dimension."""
+    try:
+        t, rest = text.split(":", 1)
+        target, value = rest.split("=", 1)
+        t, value = int(t), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected T:TARGET=VALUE, got '{text}'") from None
+    if target not in ("H", "M", "R"):
+        raise argparse.ArgumentTypeError(f"unknown injection target '{target}'")
+    return t, target, value if target == "R" else [value] * dim
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a full-cycle RCD simulation with SimulationRunner.")
+    parser.add_argument("--timesteps", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--buffer-size", type=int, default=5)
+    parser.add_argument("--reactivation-rate", type=float, default=0.1)
+    parser.add_argument("--inject", action="append", default=[], metavar="T:TARGET=VALUE",
+                        help="attractor injection, e.g. 10:R=0.5 or 50:H=0.2 (repeatable)")
+    parser.add_argument("--stop-distance", type=float, help="stop once ‖H - M‖ falls below this")
+    parser.add_argument("--window", type=int, help="keep per-window summaries of this many steps instead of every step")
+    parser.add_argument("--lttb-points", type=int, default=2000, help="points per downsampled series with --window")
+    parser.add_argument("--out", help="write the trajectory columns (or summaries, with --window) to this .npz file")
+    parser.add_argument("--profile", action="store_true", help="time each phase and print a summary")
+    parser.add_argument("--profile-out", help="write the profile summary to this JSON file")
+    parser.add_argument("--progress", type=float, metavar="SECONDS", help="progress line interval")
+    args = parser.parse_args(argv)
+
+    schedule = InjectionSchedule()
+    for text in args.inject:
+        try:
+            t, target, amount = _parse_injection(text, args.dim)
+        except argparse.ArgumentTypeError as error:
+            parser.error(str(error))
+        schedule.add(t, target, **({"value": amount} if target == "R" else {"vector": amount}))
+    profiler = None
+    if args.profile or args.profile_out or args.progress is not None:
+        profiler = RunProfiler(timers=bool(args.profile or args.profile_out), progress_interval=args.progress)
+    stop = DistanceTolerance(args.stop_distance) if args.stop_distance is not None else None
+
+    runner = SimulationRunner(timesteps=args.timesteps, buffer_size=args.buffer_size, inject_schedule=schedule,
+                              reactivation_rate=args.reactivation_rate, stop=stop, profiler=profiler,
+                              dim=args.dim, seed=args.seed,
+                              aggregate={"window": args.window, "lttb_points": args.lttb_points} if args.window else None)
+    results = runner.run()
+
+    if args.window:
+        weights = results["window_steps"]
+        mean_gamma = np.average(results["phase_sync_mean"], weights=weights)
+        mean_rho = np.average(results["semantic_corr_mean"], weights=weights)
+        final_d = results["procrustes_dist_last"][-1]
+    else:
+        mean_gamma, mean_rho = np.mean(results["phase_sync"]), np.mean(results["semantic_corr"])
+        final_d = results["procrustes_dist"][-1]
+    print(f"{results.n_steps} steps | final R: {runner.model.R:.4f} | mean γ: {mean_gamma:.4f} | "
+          f"mean ρ: {mean_rho:.4f} | final d: {final_d:.4f}")
+    if stop is not None:
+        print(f"stop_reason: {results['stop_reason']} | stopped_at: {results['stopped_at']}")
+    if args.profile:
+        print(profiler.report())
+    if args.profile_out:
+        profiler.save(args.profile_out)
+    if args.out:
+        columns = results.to_dict() if args.window else {key: results[key] for key in STATE_KEYS + METRIC_KEYS}
+        np.savez(args.out, **{key: value for key, value in columns.items() if value is not None})
+        print(f"Trajectory written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
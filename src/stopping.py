@@ -0,0 +1,190 @@
+"""
+Module: stopping.py
+Purpose: Pluggable early-termination criteria for RCD simulations.
+
+A stop condition consumes the recorded γ/ρ/d/R stream in blocks along axis 0
+((n,) for one run, (n, N) for an ensemble) and marks the steps at which the run may
+stop. `StopMonitor` combines several conditions, remembers which fired first and
+when, and has the `record()`/`extend()` observer interface, so it can watch
+`RCDModel.simulate`, `SimulationRunner` or `RCDEnsemble.simulate`:
+
+    model.simulate(10000, stop=[DistanceTolerance(1e-3), WallClock(30)])
+    results['stop_reason'], results['stopped_at']
+
+Conditions:
+    DistanceTolerance      ‖H − M‖ (compute_procrustes_distance) at or below `tol`
+    ReflectionPlateau      R varies by at most `tol` over the last `window` steps
+    LakeStatePersistence   Lake State held for `k` consecutive steps (LakeStateTracker)
+    WallClock              `seconds` of wall-clock time elapsed
+"""
+
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .lake_state import LakeStateTracker
+
+
+class StopCondition(ABC):
+    """Base class: `check()` returns a bool array shaped like the block it was given."""
+
+    name = 'stop'
+
+    def reset(self, n_members=None):
+        self.n_members = n_members
+
+    @abstractmethod
+    def check(self, gamma, rho, d, R):
+        """Block of γ, ρ, d and R values -> bool array, True where the run may stop."""
+
+
+class DistanceTolerance(StopCondition):
+    name = 'distance'
+
+    def __init__(self, tol=1e-3):
+        self.tol = tol
+
+    def check(self, gamma, rho, d, R):
+        return np.asarray(d) <= self.tol
+
+
+class ReflectionPlateau(StopCondition):
+    name = 'reflection_plateau'
+
+    def __init__(self, tol=1e-4, window=20):
+        self.tol = tol
+        self.window = window
+
+    def reset(self, n_members=None):
+        super().reset(n_members)
+        self._tail = None   # last `window` R values of earlier blocks
+
+    def check(self, gamma, rho, d, R):
+        R = np.asarray(R, dtype=float)
+        seq = R if self._tail is None else np.concatenate((self._tail, R))
+        self._tail = seq[-self.window:]
+        fire = np.zeros(R.shape, dtype=bool)
+        if len(seq) <= self.window:
+            return fire
+        # One row per step that has a full window behind it; the last row is the newest step.
+        flat = np.ptp(sliding_window_view(seq, self.window + 1, axis=0), axis=-1) <= self.tol
+        m = min(len(fire), len(flat))
+        fire[len(fire) - m:] = flat[len(flat) - m:]
+        return fire
+
+
+class LakeStatePersistence(StopCondition):
+    name = 'lake_state'
+
+    def __init__(self, k=50, **params):
+        """
+        Args:
+            k (int): Consecutive steps in the Lake State required to stop.
+            params: Passed to `LakeStateTracker` (thresholds, weights, ...).
+        """
+        self.k = k
+        self.params = params
+
+    def reset(self, n_members=None):
+        super().reset(n_members)
+        self.tracker = LakeStateTracker(n_members=n_members, **self.params)
+        self._run = np.zeros(() if n_members is None else (n_members,), dtype=int)
+
+    def check(self, gamma, rho, d, R):
+        _, in_lake = self.tracker.update_many(gamma, rho, R)
+        n = len(in_lake)
+        pos = np.arange(1, n + 1).reshape((-1,) + (1,) * (in_lake.ndim - 1))
+        last_out = np.where(in_lake, 0, pos)
+        np.maximum.accumulate(last_out, axis=0, out=last_out)
+        run = pos - last_out + np.where(last_out == 0, self._run, 0)
+        self._run = run[-1]
+        return run >= self.k
+
+
+class WallClock(StopCondition):
+    name = 'wall_clock'
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def reset(self, n_members=None):
+        super().reset(n_members)
+        self._start = time.perf_counter()
+
+    def check(self, gamma, rho, d, R):
+        fire = np.zeros(np.shape(gamma), dtype=bool)
+        if len(fire) and time.perf_counter() - self._start >= self.seconds:
+            fire[-1] = True
+        return fire
+
+
+class StopMonitor:
+    def __init__(self, conditions, n_members=None, check_every=100):
+        """
+        Args:
+            conditions (sequence): `StopCondition` instances; on a tie the earlier wins.
+            n_members (int): Ensemble size, or None for a single run.
+            check_every (int): Steps per block between checks for the block engines
+                ('closed_form', 'compiled'); the reference loop checks every step.
+        """
+        self.conditions = list(conditions)
+        self.n_members = n_members
+        self.check_every = check_every
+        self.reset()
+
+    def reset(self):
+        shape = () if self.n_members is None else (self.n_members,)
+        self.t = 0
+        self.stopped_mask = np.zeros(shape, dtype=bool)
+        self.stopped_at = np.full(shape, -1)          # -1: ran to the end
+        self.stop_reason = None if self.n_members is None else [None] * self.n_members
+        for condition in self.conditions:
+            condition.reset(self.n_members)
+
+    @property
+    def stopped(self):
+        """True once every run (every member, for an ensemble) has stopped."""
+        return bool(np.all(self.stopped_mask))
+
+    def record(self, H, M, gamma, rho, d, R):
+        self.extend(None, None, *(np.asarray(x, dtype=float)[None] for x in (gamma, rho, d, R)))
+
+    def extend(self, H, M, gamma, rho, d, R):
+        n = len(gamma)
+        shape = self.stopped_mask.shape
+        first = np.full(shape, n)
+        which = np.full(shape, -1)
+        for i, condition in enumerate(self.conditions):
+            fire = np.asarray(condition.check(gamma, rho, d, R), dtype=bool)
+            at = np.where(fire.any(axis=0), fire.argmax(axis=0), n)
+            earlier = at < first
+            first = np.where(earlier, at, first)
+            which = np.where(earlier, i, which)
+
+        new = ~self.stopped_mask & (first < n)
+        self.stopped_at = np.where(new, self.t + first, self.stopped_at)
+        self.stopped_mask = self.stopped_mask | new
+        if self.n_members is None:
+            if new:
+                self.stop_reason = self.conditions[int(which)].name
+        else:
+            for member in np.flatnonzero(new):
+                self.stop_reason[member] = self.conditions[which[member]].name
+        self.t += n
+
+    def summary(self):
+        """`stopped_at` (-1 if the run went to the end) and `stop_reason` (None likewise)."""
+        stopped_at = int(self.stopped_at) if self.n_members is None else self.stopped_at.copy()
+        reason = self.stop_reason if self.n_members is None else list(self.stop_reason)
+        return {'stopped_at': stopped_at, 'stop_reason': reason}
+
+
+def as_monitor(stop, n_members=None):
+    """Accept a `StopMonitor`, one condition or a sequence of conditions."""
+    if isinstance(stop, StopMonitor):
+        stop.reset()
+        return stop
+    if isinstance(stop, StopCondition):
+        stop = [stop]
+    return StopMonitor(stop, n_members=n_members)
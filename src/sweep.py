@@ -0,0 +1,202 @@
+"""
+Module: sweep.py
+Purpose: Process-pool parameter sweeps over (alpha, beta, delta, noise_level, dim).
+
+Each task configures one `RCDModel` the way the Streamlit sidebar does, runs
+`simulate()` and reduces the trajectory to a one-row summary (final R, mean γ/ρ,
+Lake-State entry time). Rows are appended to a CSV table as tasks finish, so an
+interrupted sweep can be resumed without redoing completed cells. Every row records
+the run settings (n_timesteps, lake_threshold); resuming a table with different
+settings raises instead of mixing incomparable rows.
+
+Seeds are derived from the base seed and the task's parameters, not from its
+position or worker, so a task gets the same seed in every sweep that contains it.
+
+CLI:
+    python -m src.sweep --alpha 0.1 0.5 0.9 --dim 3 10 --timesteps 500 --out sweep.csv
+    python -m src.sweep --sample 200 --alpha 0 1 --noise 0 0.5 --out sample.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .rcd_model import RCDModel
+from .lake_state import compute_lake_state
+
+PARAM_NAMES = ('alpha', 'beta', 'delta', 'noise_level', 'dim')
+DEFAULTS = {'alpha': 0.7, 'beta': 0.2, 'delta': 0.1, 'noise_level': 0.1, 'dim': 3}
+SUMMARY_FIELDS = ('task_id', 'seed', 'repeat') + PARAM_NAMES + (
+    'n_timesteps', 'lake_threshold', 'final_R', 'mean_gamma', 'mean_rho', 'final_d', 'lake_entry_t')
+
+
+def parameter_grid(**axes):
+    """Cartesian product of the given axes; missing parameters take sidebar defaults."""
+    values = {name: np.atleast_1d(axes.get(name, DEFAULTS[name])).tolist() for name in PARAM_NAMES}
+    return [dict(zip(PARAM_NAMES, combo)) for combo in itertools.product(*values.values())]
+
+
+def random_sample(n, seed=0, **ranges):
+    """
+    Draw `n` random cells. Each range is a (low, high) pair; `dim` is drawn as an
+    integer in [low, high]. Missing parameters take sidebar defaults.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name in PARAM_NAMES:
+        if name not in ranges:
+            columns[name] = [DEFAULTS[name]] * n
+        elif name == 'dim':
+            low, high = ranges[name]
+            columns[name] = rng.integers(int(low), int(high) + 1, size=n).tolist()
+        else:
+            low, high = ranges[name]
+            columns[name] = rng.uniform(low, high, size=n).tolist()
+    return [dict(zip(PARAM_NAMES, row)) for row in zip(*columns.values())]
+
+
+def _cell_key(params):
+    canonical = {name: (int(params[name]) if name == 'dim' else float(params[name])) for name in PARAM_NAMES}
+    return hashlib.sha1(json.dumps(canonical, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def make_tasks(cells, repeats=1, base_seed=0):
+    """Expand cells into tasks, each with a stable id and its own deterministic seed."""
+    tasks = []
+    for params in cells:
+        key = _cell_key(params)
+        for rep in range(repeats):
+            seq = np.random.SeedSequence([base_seed, int(key, 16), rep])
+            tasks.append({
+                'task_id': f"{key}-{rep}",
+                'seed': int(seq.generate_state(1)[0]),
+                'repeat': rep,
+                **{name: params[name] for name in PARAM_NAMES},
+            })
+    return tasks
+
+
+def run_task(task, n_timesteps=100, lake_threshold=0.6):
+    """Run one configured model and summarize its trajectory."""
+    dim = int(task['dim'])
+    model = RCDModel(dim=dim, seed=task['seed'])
+    model.set_parameters(alpha=task['alpha'], beta=task['beta'], delta=task['delta'],
+                         n_dimensions=dim, noise_level=task['noise_level'])
+    results = model.simulate(n_timesteps=n_timesteps)
+
+    gamma, rho, R = results['phase_sync'], results['semantic_corr'], results['reflection']
+    entered = np.flatnonzero(compute_lake_state(gamma, rho, R) >= lake_threshold)
+    return {
+        **task,
+        'n_timesteps': n_timesteps,
+        'lake_threshold': lake_threshold,
+        'final_R': float(model.R),
+        'mean_gamma': float(np.mean(gamma)),
+        'mean_rho': float(np.mean(rho)),
+        'final_d': float(results['procrustes_dist'][-1]),
+        'lake_entry_t': int(entered[0]) if len(entered) else -1,
+    }
+
+
+def load_completed(out_path):
+    """Rows already written to `out_path`, keyed by task_id."""
+    if not os.path.exists(out_path):
+        return {}
+    with open(out_path, newline='') as f:
+        return {row['task_id']: row for row in csv.DictReader(f)}
+
+
+def _check_settings(done, out_path, n_timesteps, lake_threshold):
+    """Raise ValueError unless every completed row was run with these settings."""
+    for row in done.values():
+        try:
+            same = int(row['n_timesteps']) == n_timesteps and float(row['lake_threshold']) == lake_threshold
+        except (KeyError, TypeError, ValueError):
+            same = False
+        if not same:
+            raise ValueError(f"{out_path} holds rows run with n_timesteps={row.get('n_timesteps')}, "
+                             f"lake_threshold={row.get('lake_threshold')}; resume it with those settings, "
+                             f"or write to another file or pass resume=False (--no-resume)")
+
+
+def iter_sweep(tasks, n_timesteps=100, workers=None, lake_threshold=0.6):
+    """Yield summary rows in completion order as the process pool finishes tasks."""
+    if workers == 1:
+        for task in tasks:
+            yield run_task(task, n_timesteps, lake_threshold)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_task, task, n_timesteps, lake_threshold) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_sweep(tasks, out_path, n_timesteps=100, workers=None, lake_threshold=0.6, resume=True):
+    """
+    Run every task not already present in `out_path`, appending each summary row
+    as soon as it completes. Raises ValueError when resuming a table whose rows
+    were run with another `n_timesteps` or `lake_threshold`.
+
+    Returns:
+        list of dict: All rows of the table, including those from earlier runs.
+    """
+    done = load_completed(out_path) if resume else {}
+    _check_settings(done, out_path, n_timesteps, lake_threshold)
+    pending = [task for task in tasks if task['task_id'] not in done]
+    rows = list(done.values())
+
+    mode = 'a' if resume and done else 'w'
+    with open(out_path, mode, newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        if mode == 'w':
+            writer.writeheader()
+        for row in iter_sweep(pending, n_timesteps, workers, lake_threshold):
+            writer.writerow(row)
+            f.flush()
+            rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parameter sweep over RCDModel runs.")
+    for name, flag in [('alpha', '--alpha'), ('beta', '--beta'), ('delta', '--delta'),
+                       ('noise_level', '--noise'), ('dim', '--dim')]:
+        kind = int if name == 'dim' else float
+        parser.add_argument(flag, dest=name, type=kind, nargs='+',
+                            help="grid values, or a low/high range with --sample")
+    parser.add_argument('--sample', type=int, help="draw N random cells instead of a grid")
+    parser.add_argument('--timesteps', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0, help="base seed for task seeding")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--lake-threshold', type=float, default=0.6)
+    parser.add_argument('--out', default='sweep.csv')
+    parser.add_argument('--no-resume', action='store_true', help="overwrite instead of resuming")
+    args = parser.parse_args(argv)
+
+    axes = {name: getattr(args, name) for name in PARAM_NAMES if getattr(args, name) is not None}
+    if args.sample:
+        for name, values in axes.items():
+            if len(values) != 2:
+                parser.error(f"--sample needs a low/high pair for {name}")
+        cells = random_sample(args.sample, seed=args.seed, **axes)
+    else:
+        cells = parameter_grid(**axes)
+
+    tasks = make_tasks(cells, repeats=args.repeats, base_seed=args.seed)
+    try:
+        rows = run_sweep(tasks, args.out, n_timesteps=args.timesteps, workers=args.workers,
+                         lake_threshold=args.lake_threshold, resume=not args.no_resume)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{len(rows)} rows in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Module: tiled_grid.py
+Purpose: Sparse, tiled 2-D float grid with lazy multi-resolution views.
+
+The grid is split into square tiles of `tile` cells (edge tiles are cropped to the
+grid). Only tiles that have been written hold an array; every other cell reads as
+the constant `fill`, so a 100k × 100k manifold with localized updates costs memory
+in proportion to the area touched. Reads are region queries: a region inside one
+tile is a read-only view of it, larger regions are assembled from the touched tiles.
+
+`level(k)` is the mean-pooled map at 1/2^k resolution for whole-map views. Levels
+are built on demand, cached, and refreshed only for tiles written since the last
+request; levels coarser than one cell per tile are pooled from the per-tile means.
+"""
+
+import numpy as np
+
+
+def _pool(values, weights, factor):
+    """Weighted mean of `values` over factor × factor blocks (partial blocks at the edges)."""
+    rows = np.arange(0, values.shape[0], factor)
+    cols = np.arange(0, values.shape[1], factor)
+    total = np.add.reduceat(np.add.reduceat(values * weights, rows, axis=0), cols, axis=1)
+    count = np.add.reduceat(np.add.reduceat(weights, rows, axis=0), cols, axis=1)
+    return total / count
+
+
+class TiledGrid:
+    def __init__(self, shape, tile=256, fill=0.0, dtype=np.float64):
+        """
+        Args:
+            shape (tuple): Grid shape (rows, cols).
+            tile (int): Tile edge length in cells; a power of two.
+            fill (float): Value of every cell that has not been written.
+            dtype: Storage dtype of materialized tiles.
+        """
+        if tile < 1 or tile & (tile - 1):
+            raise ValueError("tile must be a power of two")
+        self.shape = tuple(int(n) for n in shape)
+        self.tile = int(tile)
+        self.fill = fill
+        self.dtype = np.dtype(dtype)
+        self.n_tiles = tuple(-(-n // self.tile) for n in self.shape)
+        self._tiles = {}     # (i, j) -> array of the tile's cells
+        self._levels = {}    # k -> [coarse map, set of tiles written since it was built]
+
+    # --- Geometry ---
+
+    def tile_bounds(self, i, j):
+        """(x_lo, x_hi, y_lo, y_hi) of tile (i, j) in grid cells."""
+        t = self.tile
+        return i * t, min((i + 1) * t, self.shape[0]), j * t, min((j + 1) * t, self.shape[1])
+
+    def _clip(self, x_lo, x_hi, y_lo, y_hi):
+        return (max(int(x_lo), 0), min(int(x_hi), self.shape[0]),
+                max(int(y_lo), 0), min(int(y_hi), self.shape[1]))
+
+    def _tiles_in(self, x_lo, x_hi, y_lo, y_hi):
+        t = self.tile
+        for i in range(x_lo // t, -(-x_hi // t)):
+            for j in range(y_lo // t, -(-y_hi // t)):
+                yield i, j
+
+    @property
+    def touched(self):
+        """Number of materialized tiles."""
+        return len(self._tiles)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self._tiles.values())
+
+    # --- Writes ---
+
+    def tiles(self):
+        """(i, j), array pairs of the materialized tiles."""
+        return self._tiles.items()
+
+    def set_tile(self, i, j, block):
+        """Replace tile (i, j) with `block`, which must have the tile's shape."""
+        x_lo, x_hi, y_lo, y_hi = self.tile_bounds(i, j)
+        block = np.array(block, dtype=self.dtype)
+        if block.shape != (x_hi - x_lo, y_hi - y_lo):
+            raise ValueError(f"Tile ({i}, {j}) has shape {(x_hi - x_lo, y_hi - y_lo)}, got {block.shape}")
+        self.writable_tile(i, j)
+        self._tiles[i, j] = block
+
+    def writable_tile(self, i, j):
+        """Tile (i, j) for in-place updates, allocated at `fill` if untouched."""
+        block = self._tiles.get((i, j))
+        if block is None:
+            x_lo, x_hi, y_lo, y_hi = self.tile_bounds(i, j)
+            block = self._tiles[i, j] = np.full((x_hi - x_lo, y_hi - y_lo), self.fill, dtype=self.dtype)
+        for _, dirty in self._levels.values():
+            dirty.add((i, j))
+        return block
+
+    def add_block(self, x_lo, y_lo, values):
+        """Add a dense block whose [0, 0] cell sits at (x_lo, y_lo); cells off the grid are dropped."""
+        values = np.asarray(values, dtype=self.dtype)
+        x_lo, y_lo = int(x_lo), int(y_lo)
+        bx_lo, bx_hi, by_lo, by_hi = self._clip(x_lo, x_lo + values.shape[0], y_lo, y_lo + values.shape[1])
+        for i, j in self._tiles_in(bx_lo, bx_hi, by_lo, by_hi):
+            tx_lo, tx_hi, ty_lo, ty_hi = self.tile_bounds(i, j)
+            ox_lo, ox_hi = max(bx_lo, tx_lo), min(bx_hi, tx_hi)
+            oy_lo, oy_hi = max(by_lo, ty_lo), min(by_hi, ty_hi)
+            self.writable_tile(i, j)[ox_lo - tx_lo:ox_hi - tx_lo, oy_lo - ty_lo:oy_hi - ty_lo] += \
+                values[ox_lo - x_lo:ox_hi - x_lo, oy_lo - y_lo:oy_hi - y_lo]
+
+    def add_at(self, xs, ys, values):
+        """Unbuffered scatter-add (like `np.add.at`) of values at in-grid cells (xs, ys)."""
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        values = np.broadcast_to(np.asarray(values, dtype=self.dtype), xs.shape)
+        if xs.size == 0:
+            return
+        key = (xs // self.tile) * self.n_tiles[1] + ys // self.tile
+        order = np.argsort(key, kind='stable')
+        key, xs, ys, values = key[order], xs[order], ys[order], values[order]
+        bounds = np.flatnonzero(np.diff(key)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(key)]):
+            i, j = divmod(int(key[lo]), self.n_tiles[1])
+            np.add.at(self.writable_tile(i, j), (xs[lo:hi] - i * self.tile, ys[lo:hi] - j * self.tile), values[lo:hi])
+
+    def clear(self):
+        """Drop every tile, returning all cells to `fill`."""
+        self._tiles.clear()
+        self._levels.clear()
+
+    # --- Reads ---
+
+    def region(self, x_lo, x_hi, y_lo, y_hi):
+        """
+        Cells [x_lo, x_hi) × [y_lo, y_hi), clipped to the grid. A region inside one
+        materialized tile is returned as a read-only view; otherwise a new array.
+        """
+        x_lo, x_hi, y_lo, y_hi = self._clip(x_lo, x_hi, y_lo, y_hi)
+        if x_lo >= x_hi or y_lo >= y_hi:
+            return np.empty((max(x_hi - x_lo, 0), max(y_hi - y_lo, 0)), dtype=self.dtype)
+        tiles = list(self._tiles_in(x_lo, x_hi, y_lo, y_hi))
+        if len(tiles) == 1 and tiles[0] in self._tiles:
+            i, j = tiles[0]
+            tx_lo, _, ty_lo, _ = self.tile_bounds(i, j)
+            view = self._tiles[i, j][x_lo - tx_lo:x_hi - tx_lo, y_lo - ty_lo:y_hi - ty_lo]
+            view.flags.writeable = False
+            return view
+
+        out = np.full((x_hi - x_lo, y_hi - y_lo), self.fill, dtype=self.dtype)
+        for i, j in tiles:
+            block = self._tiles.get((i, j))
+            if block is None:
+                continue
+            tx_lo, tx_hi, ty_lo, ty_hi = self.tile_bounds(i, j)
+            ox_lo, ox_hi = max(x_lo, tx_lo), min(x_hi, tx_hi)
+            oy_lo, oy_hi = max(y_lo, ty_lo), min(y_hi, ty_hi)
+            out[ox_lo - x_lo:ox_hi - x_lo, oy_lo - y_lo:oy_hi - y_lo] = \
+                block[ox_lo - tx_lo:ox_hi - tx_lo, oy_lo - ty_lo:oy_hi - ty_lo]
+        return out
+
+    def __getitem__(self, index):
+        """grid[x_lo:x_hi, y_lo:y_hi] or grid[x, y]; slice steps are applied after the query."""
+        rows, cols = index
+        if isinstance(rows, slice) and isinstance(cols, slice):
+            x_lo, x_hi, x_step = rows.indices(self.shape[0])
+            y_lo, y_hi, y_step = cols.indices(self.shape[1])
+            if x_step < 1 or y_step < 1:
+                raise IndexError("TiledGrid slices must have a positive step")
+            return self.region(x_lo, x_hi, y_lo, y_hi)[::x_step, ::y_step]
+        x, y = int(rows), int(cols)
+        if not (0 <= x < self.shape[0] and 0 <= y < self.shape[1]):
+            raise IndexError(f"({x}, {y}) is outside the grid {self.shape}")
+        block = self._tiles.get((x // self.tile, y // self.tile))
+        return self.fill if block is None else block[x % self.tile, y % self.tile]
+
+    def to_array(self):
+        """The full grid as a dense array (a read-only view when the grid is one tile)."""
+        return self.region(0, self.shape[0], 0, self.shape[1])
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.to_array()
+        return out if dtype is None else out.astype(dtype)
+
+    # --- Pyramid ---
+
+    def level(self, k):
+        """
+        Mean-pooled grid at 1/2^k resolution, shape ceil(shape / 2^k); level 0 is the
+        full grid. The returned array is a read-only view of the cache.
+        """
+        if k == 0:
+            return self.to_array()
+        factor = 1 << k
+        if factor > self.tile:
+            tile_level = self.tile.bit_length() - 1
+            means = self.level(tile_level)
+            rows, cols = (np.diff(np.r_[0:n:self.tile, n]) for n in self.shape)
+            sizes = np.outer(rows, cols).astype(float)
+            out = _pool(means, sizes, factor // self.tile)
+            out.flags.writeable = False
+            return out
+
+        cached = self._levels.get(k)
+        if cached is None:
+            coarse = np.full(tuple(-(-n // factor) for n in self.shape), self.fill, dtype=self.dtype)
+            cached = self._levels[k] = [coarse, set(self._tiles)]
+        coarse, dirty = cached
+        coarse.flags.writeable = True
+        step = self.tile // factor
+        for i, j in dirty:
+            block = self._tiles[i, j]
+            pooled = _pool(block, np.ones_like(block), factor)
+            coarse[i * step:i * step + pooled.shape[0], j * step:j * step + pooled.shape[1]] = pooled
+        dirty.clear()
+        coarse.flags.writeable = False
+        return coarse
+
+    def __repr__(self):
+        return (f"TiledGrid(shape={self.shape}, tile={self.tile}, "
+                f"touched={self.touched}/{self.n_tiles[0] * self.n_tiles[1]})")
@@ -0,0 +1,168 @@
+"""
+Module: trajectory_store.py
+Purpose: Memory-mapped on-disk trajectory format for very long simulations.
+
+File layout (little-endian):
+    [fixed header]  magic b"RCDTRAJ1", uint32 version, uint32 meta length,
+                    uint64 steps written, uint64 data offset
+    [meta]          UTF-8 JSON: dim, n_timesteps, dtype, seed, parameters
+    [data]          columnar blocks, 64-byte aligned, in this order:
+                    H_states (T, dim), M_states (T, dim),
+                    phase_sync (T,), semantic_corr (T,), procrustes_dist (T,), reflection (T,)
+
+`TrajectoryStore` has the same `record()` interface as `SimulationResults`, so it can
+be passed as the `sink` of `RCDModel.simulate` or `SimulationRunner`. Reading returns
+zero-copy `np.memmap` views trimmed to the steps actually written.
+"""
+
+from collections.abc import Mapping
+import json
+import numpy as np
+
+from .results import STATE_KEYS, METRIC_KEYS
+
+MAGIC = b"RCDTRAJ1"
+VERSION = 1
+_FIXED = np.dtype([('magic', 'S8'), ('version', '<u4'), ('meta_len', '<u4'),
+                   ('n_steps', '<u8'), ('data_offset', '<u8')])
+_ALIGN = 64
+
+
+def _align(n):
+    return -(-n // _ALIGN) * _ALIGN
+
+
+class TrajectoryStore(Mapping):
+    def __init__(self, path, mode='r'):
+        """Open an existing trajectory file; use `create_trajectory` to make a new one."""
+        self.path = path
+        self.mode = mode
+        self._fixed = np.memmap(path, dtype=_FIXED, mode=mode, shape=(1,))
+        if self._fixed['magic'][0] != MAGIC:
+            raise ValueError(f"{path} is not an RCD trajectory file")
+        if self._fixed['version'][0] != VERSION:
+            raise ValueError(f"Unsupported trajectory version {self._fixed['version'][0]}")
+        with open(path, 'rb') as f:
+            f.seek(_FIXED.itemsize)
+            self.header = json.loads(f.read(int(self._fixed['meta_len'][0])).decode('utf-8'))
+
+        self.dim = self.header['dim']
+        self.capacity = self.header['n_timesteps']
+        dtype = np.dtype(self.header['dtype'])
+        offset = int(self._fixed['data_offset'][0])
+        self._columns = {}
+        for key in STATE_KEYS + METRIC_KEYS:
+            shape = (self.capacity, self.dim) if key in STATE_KEYS else (self.capacity,)
+            self._columns[key] = np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=shape)
+            offset += _align(int(np.prod(shape)) * dtype.itemsize)
+
+    @property
+    def n_steps(self):
+        return int(self._fixed['n_steps'][0])
+
+    def record(self, H, M, gamma, rho, d, R):
+        """Write one step and advance the step counter in the file header."""
+        t = self.n_steps
+        if t >= self.capacity:
+            raise IndexError(f"Trajectory file is full ({self.capacity} steps)")
+        cols = self._columns
+        cols['H_states'][t] = H
+        cols['M_states'][t] = M
+        cols['phase_sync'][t] = gamma
+        cols['semantic_corr'][t] = rho
+        cols['procrustes_dist'][t] = d
+        cols['reflection'][t] = R
+        self._fixed['n_steps'] = t + 1
+
+    def extend(self, H, M, gamma, rho, d, R):
+        """Write a block of steps: H, M of shape (n, dim) and (n,) metric arrays."""
+        t, n = self.n_steps, len(H)
+        if t + n > self.capacity:
+            raise IndexError(f"Trajectory file is full ({self.capacity} steps)")
+        cols = self._columns
+        cols['H_states'][t:t + n] = H
+        cols['M_states'][t:t + n] = M
+        cols['phase_sync'][t:t + n] = gamma
+        cols['semantic_corr'][t:t + n] = rho
+        cols['procrustes_dist'][t:t + n] = d
+        cols['reflection'][t:t + n] = R
+        self._fixed['n_steps'] = t + n
+
+    def steps(self, start=0, stop=None):
+        """Views of every column restricted to steps [start, stop)."""
+        stop = self.n_steps if stop is None else min(stop, self.n_steps)
+        return {key: col[start:stop] for key, col in self._columns.items()}
+
+    def flush(self):
+        self._fixed.flush()
+        for col in self._columns.values():
+            col.flush()
+
+    def close(self):
+        if self.mode != 'r':
+            self.flush()
+        self._columns = {}
+        self._fixed = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Mapping interface, mirroring SimulationResults ---
+
+    def __getitem__(self, key):
+        return self._columns[key][:self.n_steps]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __repr__(self):
+        return f"TrajectoryStore({self.path!r}, n_steps={self.n_steps}, dim={self.dim})"
+
+
+def create_trajectory(path, n_timesteps, dim, seed=None, parameters=None, dtype=np.float64):
+    """
+    Create a trajectory file sized for `n_timesteps` steps and open it for writing.
+
+    Args:
+        path (str): Destination file; overwritten if it exists.
+        n_timesteps (int): Capacity in steps.
+        dim (int): Dimension of H and M.
+        seed (int): Seed of the run, stored in the header.
+        parameters (dict): Model parameters, stored in the header (JSON-serializable).
+        dtype: Storage dtype for states and metrics.
+
+    Returns:
+        TrajectoryStore: Open in 'r+' mode, ready to be used as a simulation sink.
+    """
+    dtype = np.dtype(dtype)
+    meta = json.dumps({
+        'dim': int(dim),
+        'n_timesteps': int(n_timesteps),
+        'dtype': dtype.str,
+        'seed': seed,
+        'parameters': parameters or {},
+    }).encode('utf-8')
+    data_offset = _align(_FIXED.itemsize + len(meta))
+    data_size = 2 * _align(n_timesteps * dim * dtype.itemsize) + 4 * _align(n_timesteps * dtype.itemsize)
+
+    fixed = np.zeros(1, dtype=_FIXED)
+    fixed['magic'] = MAGIC
+    fixed['version'] = VERSION
+    fixed['meta_len'] = len(meta)
+    fixed['data_offset'] = data_offset
+    with open(path, 'wb') as f:
+        f.write(fixed.tobytes())
+        f.write(meta)
+        f.truncate(data_offset + data_size)
+    return TrajectoryStore(path, mode='r+')
+
+
+def open_trajectory(path, mode='r'):
+    """Open a trajectory file for zero-copy reading (or 'r+' to keep appending)."""
+    return TrajectoryStore(path, mode=mode)
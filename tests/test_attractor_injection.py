@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.attractor_injection import InjectionSchedule
+
+
+class _State:
+    def __init__(self, dim=3):
+        self.H, self.M, self.R = np.zeros(dim), np.zeros(dim), 0.0
+
+
+def test_missing_payload_is_rejected():
+    schedule = InjectionSchedule()
+    with pytest.raises(ValueError):
+        schedule.add(3, "H")
+    with pytest.raises(ValueError):
+        schedule.add_recurring("M", every=2)
+    with pytest.raises(ValueError):
+        schedule.add(3, "R")
+    with pytest.raises(ValueError):
+        schedule.add(3, "X", value=1.0)
+    assert len(schedule) == 0
+
+
+def test_one_shot_and_recurring_apply():
+    schedule = InjectionSchedule()
+    schedule.add(4, "H", vector=[1.0, 2.0, 3.0])
+    schedule.add_recurring("R", start=2, every=3, stop=11, value=0.5)
+    state = _State()
+    fired = sum(schedule.apply(state, t) for t in range(20))
+    assert fired == 4   # H at 4, R at 2, 5 and 8
+    np.testing.assert_array_equal(state.H, [1.0, 2.0, 3.0])
+    assert state.R == pytest.approx(1.5)
+
+
+def test_times_between_matches_at():
+    schedule = InjectionSchedule()
+    schedule.add(7, "R", value=0.1)
+    schedule.add(30, "R", value=0.1)
+    schedule.add_recurring("H", start=3, every=5, stop=24, vector=[0.1])
+    schedule.add_recurring("M", start=10, every=7, vector=[0.1])
+    for start, stop in [(0, 40), (4, 13), (8, 9), (25, 60)]:
+        expected = [t for t in range(start, stop) if schedule.at(t)]
+        assert schedule.times_between(start, stop) == expected
+
+
+def test_save_load_round_trip(tmp_path):
+    schedule = InjectionSchedule()
+    schedule.add(5, "H", vector=[0.2, 0.3], member=1)
+    schedule.add(5, "R", value=0.4)
+    schedule.add_recurring("M", start=1, every=4, stop=20, vector=[-0.1, 0.1])
+    schedule.add_recurring("R", every=10, value=0.05, member=0)
+    path = tmp_path / "schedule.npz"
+    schedule.save(path)
+    loaded = InjectionSchedule.load(path)
+    assert len(loaded) == len(schedule)
+    for t in range(40):
+        expected, actual = schedule.at(t), loaded.at(t)
+        assert [(target, member) for target, _, member in actual] == [(target, member) for target, _, member in expected]
+        for (_, a, _), (_, b, _) in zip(actual, expected):
+            np.testing.assert_allclose(a, b)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.basins import BasinIndex
+from src.rcd_memory_topology import SymbolicManifold
+
+
+def _events(n=40, size=64, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.c_[rng.integers(0, size, (n, 2)), rng.uniform(0.2, 1.0, n), rng.uniform(2.0, 6.0, n)]
+
+
+def _assert_same(attached, fresh):
+    assert len(attached) == len(fresh)
+    np.testing.assert_array_equal(attached.labels, fresh.labels)
+    np.testing.assert_allclose(attached.values, fresh.values)
+
+
+def test_attached_index_follows_events():
+    manifold = SymbolicManifold((64, 64), tile_size=32)
+    index = BasinIndex(manifold)
+    for x, y, strength, radius in _events():
+        manifold.apply_memory_reconciliation((x, y), strength, radius)
+    _assert_same(index, BasinIndex(manifold, attach=False))
+
+
+def test_attached_index_matches_fresh_after_reset():
+    manifold = SymbolicManifold((64, 64), tile_size=32)
+    index = BasinIndex(manifold)
+    manifold.apply_many(_events())
+    assert len(index) > 0
+    manifold.reset()
+    _assert_same(index, BasinIndex(manifold, attach=False))
+    assert len(index) == 0
+
+
+def test_attached_index_matches_fresh_after_rebuild_and_restore(tmp_path):
+    log, snapshot = str(tmp_path / "events.log"), str(tmp_path / "snapshot.npz")
+    manifold = SymbolicManifold((64, 64), tile_size=32, log_path=log)
+    manifold.apply_many(_events(seed=1))
+    manifold.compact(snapshot)
+    manifold.apply_many(_events(seed=2))
+    manifold.curvature.clear()   # index a blank map, then let rebuild replace it
+    index = BasinIndex(manifold)
+    assert len(index) == 0
+    manifold.rebuild(snapshot)
+    assert len(index) > 0
+    _assert_same(index, BasinIndex(manifold, attach=False))
+    manifold.close()
+
+    restored = SymbolicManifold.restore(log, snapshot)
+    restored_index = BasinIndex(restored)
+    restored.apply_many(_events(n=5, seed=3))
+    _assert_same(restored_index, BasinIndex(restored, attach=False))
+    restored.close()
@@ -0,0 +1,21 @@
+import pytest
+
+from src.engines import compare_engines
+
+TOLERANCE = 1e-9
+
+
+@pytest.mark.parametrize("dim", [3, 10])
+def test_compiled_engine_matches_reference_loop(dim):
+    deviations = compare_engines('compiled', n_timesteps=2000, dim=dim, seed=1)
+    assert max(deviations.values()) < TOLERANCE, deviations
+
+
+def test_noise_free_closed_form_matches_reference_loop():
+    deviations = compare_engines('closed_form', n_timesteps=2000, seed=2, noise_scale=0.0)
+    assert max(deviations.values()) < TOLERANCE, deviations
+
+
+def test_closed_form_falls_back_to_compiled_loop_with_noise():
+    deviations = compare_engines('closed_form', n_timesteps=500, seed=3)
+    assert max(deviations.values()) < TOLERANCE, deviations
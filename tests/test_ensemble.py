@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from src.attractor_injection import InjectionSchedule
+from src.ensemble import RCDEnsemble
+from src.rcd_model import RCDModel
+from src.stopping import StopCondition
+
+SEEDS = [0, 7, 123]
+DIM = 4
+KEYS = ('H_states', 'M_states', 'phase_sync', 'semantic_corr', 'procrustes_dist', 'reflection')
+
+
+class AtStep(StopCondition):
+    """Fires for every member at step `step`, so the whole ensemble stops together."""
+
+    name = 'at_step'
+
+    def __init__(self, step):
+        self.step = step
+
+    def reset(self, n_members=None):
+        super().reset(n_members)
+        self.seen = 0
+
+    def check(self, gamma, rho, d, R):
+        steps = self.seen + np.arange(len(gamma))
+        self.seen += len(gamma)
+        return np.broadcast_to((steps >= self.step)[:, None], np.shape(gamma))
+
+
+def assert_member_matches(ensemble_results, member, model_results):
+    for key in KEYS:
+        np.testing.assert_allclose(ensemble_results[key][member], np.asarray(model_results[key]),
+                                   rtol=0, atol=1e-10, err_msg=key)
+
+
+@pytest.mark.parametrize("block_size", [256, 7])
+def test_members_match_single_runs(block_size):
+    results = RCDEnsemble(SEEDS, dim=DIM, block_size=block_size).simulate(300)
+    for i, seed in enumerate(SEEDS):
+        assert_member_matches(results, i, RCDModel(dim=DIM, seed=seed).simulate(300))
+
+
+def test_set_parameters_members_match_configured_runs():
+    results = RCDEnsemble(SEEDS, dim=DIM, alpha=0.3, noise_level=0.2, set_parameters=True).simulate(200)
+    for i, seed in enumerate(SEEDS):
+        model = RCDModel(seed=seed)
+        model.set_parameters(alpha=0.3, noise_level=0.2, n_dimensions=DIM)
+        assert_member_matches(results, i, model.simulate(200))
+
+
+def test_injection_schedule_matches_model_injections():
+    vector = np.linspace(-1, 1, DIM)
+    schedule = InjectionSchedule()
+    schedule.add(20, 'H', vector=vector)
+    schedule.add(50, 'R', value=0.9, member=1)
+    schedule.add_recurring('M', start=30, every=40, vector=-vector)
+    results = RCDEnsemble(SEEDS, dim=DIM, injections=schedule).simulate(150)
+
+    for i, seed in enumerate(SEEDS):
+        model = RCDModel(dim=DIM, seed=seed)
+        model.add_attractor_injection(20, 'H', vector=vector)
+        if i == 1:
+            model.add_attractor_injection(50, 'R', value=0.9)
+        for t in range(30, 150, 40):
+            model.add_attractor_injection(t, 'M', vector=-vector)
+        assert_member_matches(results, i, model.simulate(150))
+
+
+def test_per_member_injection_lists():
+    injections = [[{'t': 10, 'target': 'R', 'value': 0.5 + 0.1 * i}] for i in range(len(SEEDS))]
+    results = RCDEnsemble(SEEDS, dim=DIM, injections=injections).simulate(60)
+    for i, seed in enumerate(SEEDS):
+        model = RCDModel(dim=DIM, seed=seed)
+        model.add_attractor_injection(10, 'R', value=0.5 + 0.1 * i)
+        assert_member_matches(results, i, model.simulate(60))
+
+
+def test_chunked_resume_matches_one_call():
+    whole = RCDEnsemble(SEEDS, dim=DIM, block_size=32).simulate(200)
+    ensemble = RCDEnsemble(SEEDS, dim=DIM, block_size=32)
+    chunks = [ensemble.simulate(n, resume=bool(i)) for i, n in enumerate([50, 100, 50])]
+    for key in KEYS:
+        np.testing.assert_array_equal(np.concatenate([c[key] for c in chunks], axis=1), whole[key])
+
+
+def test_resume_after_mid_block_stop_matches_uninterrupted_run():
+    whole = RCDEnsemble(SEEDS, dim=DIM, block_size=64).simulate(300)
+    ensemble = RCDEnsemble(SEEDS, dim=DIM, block_size=64)
+    first = ensemble.simulate(300, stop=AtStep(100))
+    assert list(first['stopped_at']) == [100] * len(SEEDS)
+    assert ensemble.t == 101
+    rest = ensemble.simulate(300 - ensemble.t, resume=True)
+    for key in KEYS:
+        np.testing.assert_array_equal(np.concatenate([first[key], rest[key]], axis=1), whole[key])
+
+
+def test_stopped_members_are_blanked():
+    class MemberAt(AtStep):
+        def check(self, gamma, rho, d, R):
+            fire = np.array(super().check(gamma, rho, d, R))
+            fire[:, 1:] = False
+            return fire
+
+    results = RCDEnsemble(SEEDS, dim=DIM).simulate(50, stop=MemberAt(10))
+    assert list(results['stopped_at']) == [10, -1, -1]
+    assert results['stop_reason'] == ['at_step', None, None]
+    assert np.isnan(results['phase_sync'][0, 11:]).all()
+    assert not np.isnan(results['phase_sync'][1:]).any()
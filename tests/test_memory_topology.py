@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.rcd_memory_topology import SymbolicManifold
+
+SHAPE = (40, 33)
+# Interior, corners, edges, off-grid and partly outside the grid.
+LOCATIONS = [(20, 16), (0, 0), (39, 32), (0, 17), (25, 32), (3.5, 30.25), (-2, 10), (41.5, -1.5)]
+RADII = [0.5, 1.0, 2.5, 5.0, 8.0]
+
+
+def reference_curvature(events, shape=SHAPE, bias=0.0):
+    """The original per-cell loop of apply_memory_reconciliation."""
+    curvature = np.zeros(shape) + bias
+    for (x0, y0), strength, radius in events:
+        for x in range(shape[0]):
+            for y in range(shape[1]):
+                dist = np.sqrt((x - x0) ** 2 + (y - y0) ** 2)
+                if dist < radius:
+                    curvature[x, y] += strength * np.exp(-dist ** 2 / (2 * radius))
+    return curvature
+
+
+@pytest.mark.parametrize("radius", RADII)
+def test_single_events_match_reference_loop(radius):
+    events = [(location, 0.5 + i, radius) for i, location in enumerate(LOCATIONS)]
+    manifold = SymbolicManifold(SHAPE, curvature_bias=0.25, tile_size=16)
+    for location, strength, r in events:
+        manifold.apply_memory_reconciliation(location, strength, r)
+    np.testing.assert_allclose(manifold.get_phase_basin_map(), reference_curvature(events, bias=0.25),
+                               rtol=0, atol=1e-12)
+
+
+def test_apply_many_matches_reference_loop():
+    events = [(location, 1.0 - 0.1 * i, radius)
+              for i, location in enumerate(LOCATIONS) for radius in RADII]
+    table = np.array([[x, y, strength, radius] for (x, y), strength, radius in events])
+    expected = reference_curvature(events)
+
+    manifold = SymbolicManifold(SHAPE, tile_size=16)
+    manifold.apply_many(table)
+    np.testing.assert_allclose(manifold.get_phase_basin_map(), expected, rtol=0, atol=1e-12)
+
+    as_dicts = SymbolicManifold(SHAPE, tile_size=16)
+    as_dicts.apply_many({"location": location, "strength": strength, "radius": radius}
+                        for location, strength, radius in events)
+    np.testing.assert_allclose(as_dicts.get_phase_basin_map(), expected, rtol=0, atol=1e-12)
+
+
+def test_recon_events_keep_the_dict_format():
+    manifold = SymbolicManifold(SHAPE)
+    manifold.apply_memory_reconciliation((3, 4), strength=2.0, radius=1.5)
+    manifold.apply_many(np.array([[5.5, 6.0, 1.0, 2.0]]))
+
+    expected = [{"type": "M_recon", "location": (3.0, 4.0), "strength": 2.0, "radius": 1.5},
+                {"type": "M_recon", "location": (5.5, 6.0), "strength": 1.0, "radius": 2.0}]
+    assert manifold.recon_events.to_dicts() == expected
+    assert list(manifold.recon_events) == expected
+    assert manifold.recon_events[-1] == expected[-1]
+    assert manifold.recon_events[:1] == expected[:1]
+    assert manifold.recon_events.records['x'].tolist() == [3.0, 5.5]
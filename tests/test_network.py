@@ -0,0 +1,130 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.network import RCDNetwork
+from src.rcd_model import RCDModel
+from src.rng import spawn_streams
+
+DIM = 4
+STEPS = 60
+
+
+def three_agents(directed=False):
+    """H1 – H0 – M0: one H–H edge and one H–M edge of different weights."""
+    graph = nx.DiGraph() if directed else nx.Graph()
+    graph.add_node('h0', kind='H')
+    graph.add_node('h1', kind='H')
+    graph.add_node('m0', kind='M')
+    graph.add_edge('h0', 'm0', weight=0.8)
+    graph.add_edge('h0', 'h1', weight=0.3)
+    if directed:
+        graph.add_edge('m0', 'h0', weight=1.0)
+    return graph
+
+
+def reference_run(graph, seed, n_timesteps, window=5):
+    """Per-agent, per-edge loops over the same random draws as RCDNetwork."""
+    nodes = list(graph.nodes)
+    n = len(nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    kinds = [graph.nodes[node]['kind'] for node in nodes]
+    arcs = [(index[u], index[v], w) for u, v, w in graph.edges(data='weight')]
+    if not graph.is_directed():
+        arcs = [(min(u, v), max(u, v), w) for u, v, w in arcs]
+    arcs.sort()
+    pulls = [[(v, w) for u, v, w in arcs if u == i] for i in range(n)]
+    if not graph.is_directed():
+        pulls = [pulls[i] + [(u, w) for u, v, w in arcs if v == i] for i in range(n)]
+
+    streams = spawn_streams(seed)
+    X = streams['init'].standard_normal((n, DIM))
+    R = np.full(n, 0.1)
+    noise = streams['noise'].standard_normal((n_timesteps, n, DIM))
+    events = streams['events'].random((n_timesteps, len(arcs), 3))
+    model = RCDModel(dim=DIM)
+    gammas, rhos = [], []
+    out = {key: [] for key in ('phase_sync', 'reflection', 'cross_phase_sync', 'cross_semantic_corr')}
+
+    for t in range(n_timesteps):
+        raw_gamma, raw_rho = [], []
+        for e, (u, v, _) in enumerate(arcs):
+            g = model.compute_phase_synchronization(X[u], X[v])
+            r = model.compute_semantic_correlation(X[u], X[v])
+            trigger, spike, boost = events[t, e]
+            if trigger < RCDModel.reactivation_prob:
+                if spike < 0.5:
+                    g += 0.5 + 0.5 * boost
+                else:
+                    r += 0.5 + 0.5 * boost
+            raw_gamma.append(g)
+            raw_rho.append(r)
+        gammas.append(raw_gamma)
+        rhos.append(raw_rho)
+        gamma = np.mean(gammas[-window:], axis=0)
+        rho = np.mean(rhos[-window:], axis=0)
+
+        cross = [e for e, (u, v, _) in enumerate(arcs) if kinds[u] != kinds[v]]
+        out['phase_sync'].append(gamma.mean())
+        out['reflection'].append(R.mean())
+        out['cross_phase_sync'].append(gamma[cross].mean())
+        out['cross_semantic_corr'].append(rho[cross].mean())
+
+        new_X, new_R = X.copy(), R.copy()
+        for i in range(n):
+            pull = sum(w * X[j] for j, w in pulls[i]) / sum(w for _, w in pulls[i]) if pulls[i] else X[i]
+            new_X[i] = X[i] + RCDModel.coupling * (pull - X[i]) + R[i] * noise[t, i] * RCDModel.noise_scale
+            incident = [(e, w) for e, (u, v, w) in enumerate(arcs) if i in (u, v)]
+            if incident:
+                target = sum(w * (gamma[e] + rho[e]) for e, w in incident) / sum(w for _, w in incident)
+                new_R[i] = R[i] + RCDModel.reflection_rate * (target - R[i])
+        X, R = new_X, new_R
+    return {key: np.array(values) for key, values in out.items()}, X
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_matches_dense_reference_loop(directed):
+    graph = three_agents(directed)
+    network = RCDNetwork(graph, dim=DIM, seed=5, block_size=STEPS)
+    results = network.simulate(STEPS)
+    expected, final_X = reference_run(graph, 5, STEPS)
+    for key, values in expected.items():
+        np.testing.assert_allclose(results[key], values, rtol=0, atol=1e-10, err_msg=key)
+    np.testing.assert_allclose(network.X, final_X, rtol=0, atol=1e-10)
+
+
+def test_resume_matches_one_call():
+    whole = RCDNetwork(three_agents(), dim=DIM, seed=1, block_size=16).simulate(50)
+    network = RCDNetwork(three_agents(), dim=DIM, seed=1, block_size=16)
+    first = network.simulate(20)
+    rest = network.simulate(30, resume=True)
+    for key in whole:
+        np.testing.assert_array_equal(np.r_[first[key], rest[key]], whole[key])
+
+
+def test_isolated_agent_keeps_its_state_without_noise(monkeypatch):
+    monkeypatch.setattr(RCDModel, 'noise_scale', 0.0)
+    graph = three_agents()
+    graph.add_node('m1', kind='M')
+    network = RCDNetwork(graph, dim=DIM, seed=2)
+    i = network.agent_index('m1')
+    X0, R0 = network.X[i].copy(), network.R[i]
+    network.simulate(20, resume=True)
+    np.testing.assert_array_equal(network.X[i], X0)
+    assert network.R[i] == R0
+
+
+def test_cross_metrics_are_nan_without_h_m_edges():
+    graph = nx.Graph()
+    graph.add_edge('a', 'b')
+    nx.set_node_attributes(graph, 'H', 'kind')
+    results = RCDNetwork(graph, dim=DIM).simulate(5)
+    assert np.isnan(results['cross_phase_sync']).all()
+    assert np.isfinite(results['phase_sync']).all()
+
+
+def test_graph_without_edges_is_rejected():
+    graph = nx.Graph()
+    graph.add_nodes_from(['a', 'b'], kind='H')
+    with pytest.raises(ValueError, match="at least one edge"):
+        RCDNetwork(graph, dim=DIM)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.rcd_memory_topology import SymbolicManifold
+from src.recon_log import RECON_EVENT, ReconLog, read_log
+
+
+def test_events_reach_disk_before_close(tmp_path):
+    path = str(tmp_path / "events.log")
+    log = ReconLog(path)
+    log.append(3.0, 4.0, 1.0, 2.0)
+    _, records = read_log(path)   # read while the writer is still open
+    assert len(records) == 1
+    assert records[0]['x'] == 3.0
+    log.close()
+
+
+def test_fsync_log_round_trips(tmp_path):
+    path = str(tmp_path / "events.log")
+    with ReconLog(path, fsync=True) as log:
+        log.extend([1.0, 2.0], [1.0, 2.0], [0.5, 0.5], [3.0, 3.0])
+    base, records = read_log(path)
+    assert base == 0
+    assert records.dtype == RECON_EVENT
+    assert records['seq'].tolist() == [0, 1]
+
+
+def test_manifold_restores_from_its_log(tmp_path):
+    path = str(tmp_path / "events.log")
+    with SymbolicManifold((64, 64), tile_size=32, log_path=path) as manifold:
+        manifold.apply_many(np.array([[10, 10, 1.0, 4.0], [40.5, 20.25, 0.5, 6.0]]))
+        expected = np.array(manifold.get_phase_basin_map())
+    restored = SymbolicManifold.restore(path, shape=(64, 64), tile_size=32)
+    np.testing.assert_allclose(restored.get_phase_basin_map(), expected)
+    restored.close()
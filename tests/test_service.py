@@ -0,0 +1,98 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src import service
+from src.rcd_model import RCDModel
+
+
+def _local(job):
+    model = RCDModel(seed=job['seed'])
+    model.set_parameters(alpha=job['alpha'], beta=job['beta'], delta=job['delta'],
+                         n_dimensions=job['dim'], noise_level=job['noise_level'])
+    return model.simulate(job['n_timesteps'])
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+def test_chunked_batches_match_set_parameters_runs(monkeypatch, n_jobs):
+    monkeypatch.setattr(service, 'CHUNK_CELLS', 300)   # force many chunks
+    jobs = [service.normalize_job({'seed': s, 'dim': 4, 'n_timesteps': 500, 'alpha': 0.3}) for s in range(n_jobs)]
+    for job, result in zip(jobs, service.run_batch(jobs)):
+        expected = _local(job)
+        np.testing.assert_allclose(result['H_states'], expected['H_states'])
+        np.testing.assert_allclose(result['reflection'], expected['reflection'])
+        np.testing.assert_array_equal(result['t'], np.arange(500))
+
+
+def test_max_points_decimates_while_running(monkeypatch):
+    monkeypatch.setattr(service, 'CHUNK_CELLS', 400)
+    jobs = [service.normalize_job({'seed': s, 'dim': 3, 'n_timesteps': 5000, 'max_points': 100}) for s in range(2)]
+    for job, result in zip(jobs, service.run_batch(jobs)):
+        expected = _local(job)
+        assert len(result['t']) <= 100
+        np.testing.assert_allclose(result['phase_sync'], expected['phase_sync'][result['t']])
+
+
+@pytest.mark.parametrize("job", [{'dim': service.MAX_DIM + 1}, {'dim': 0},
+                                 {'n_timesteps': service.MAX_TIMESTEPS, 'dim': 20},
+                                 {'n_timesteps': service.MAX_TIMESTEPS, 'dim': service.MAX_DIM,
+                                  'max_points': service.MAX_TIMESTEPS}])
+def test_oversized_jobs_are_rejected(job):
+    with pytest.raises(ValueError):
+        service.normalize_job(job)
+
+
+# --- HTTP round trips ---
+
+@pytest.fixture
+def server():
+    worker = service.BatchingWorker(max_batch=16, max_wait=0.2, workers=0)
+    server = service.SimulationService(('127.0.0.1', 0), worker)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _post(url, body):
+    request = urllib.request.Request(url + "/simulate", data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        assert response.headers["Content-Type"] == service.CONTENT_TYPE
+        return service.decode_result(response.read())
+
+
+def _status(url, body):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _post(url, body)
+    assert "error" in json.loads(error.value.read())
+    return error.value.code
+
+
+def test_concurrent_requests_are_batched(server):
+    jobs = [{'seed': s, 'dim': 3, 'n_timesteps': 200} for s in range(6)]
+    with ThreadPoolExecutor(len(jobs)) as pool:
+        results = list(pool.map(lambda job: _post(server, json.dumps(job).encode()), jobs))
+    for job, result in zip(jobs, results):
+        expected = _local(service.normalize_job(job))
+        np.testing.assert_allclose(result['H_states'], expected['H_states'])
+        assert int(result['seed']) == job['seed']
+    with urllib.request.urlopen(server + "/health", timeout=30) as response:
+        stats = json.loads(response.read())
+    assert stats['jobs'] == len(jobs)
+    assert stats['batches'] < len(jobs)
+
+
+@pytest.mark.parametrize("body", [b'{"dim": "three"}', b'{"colour": 1}', b'not json', b'[1, 2]'])
+def test_invalid_jobs_get_400(server, body):
+    assert _status(server, body) == 400
+
+
+def test_oversized_job_gets_400(server):
+    job = {'n_timesteps': service.MAX_TIMESTEPS, 'dim': service.MAX_DIM, 'max_points': service.MAX_TIMESTEPS}
+    assert _status(server, json.dumps(job).encode()) == 400
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.simulation_runner import SimulationRunner, main
+from src.results import METRIC_KEYS, STATE_KEYS
+
+
+def test_importable_from_package():
+    import src
+    assert src.SimulationRunner is SimulationRunner
+
+
+def test_same_seed_same_results():
+    first = SimulationRunner(timesteps=300, dim=5, seed=7).run()
+    second = SimulationRunner(timesteps=300, dim=5, seed=7).run()
+    other = SimulationRunner(timesteps=300, dim=5, seed=8).run()
+    for key in STATE_KEYS + METRIC_KEYS:
+        np.testing.assert_array_equal(first[key], second[key])
+    assert not np.array_equal(first['reflection'], other['reflection'])
+
+
+def test_cli_injection_and_output(tmp_path, capsys):
+    out = tmp_path / "run.npz"
+    main(["--timesteps", "50", "--dim", "4", "--seed", "1", "--inject", "10:R=0.5", "--out", str(out)])
+    assert "50 steps" in capsys.readouterr().out
+    with np.load(out) as saved:
+        assert saved['H_states'].shape == (50, 4)
+        R = saved['reflection']
+    baseline = SimulationRunner(timesteps=50, dim=4, seed=1).run()['reflection']
+    np.testing.assert_array_equal(R[:11], baseline[:11])
+    assert R[11] != baseline[11]   # the step after the injection sees the boosted R
+
+
+def test_cli_rejects_bad_injection():
+    with pytest.raises(SystemExit):
+        main(["--inject", "10:Q=0.5"])
+
+
+def test_cli_stop_distance(capsys):
+    main(["--timesteps", "5000", "--dim", "4", "--seed", "1", "--stop-distance", "0.5"])
+    out = capsys.readouterr().out
+    assert "stop_reason: distance" in out
+    assert int(out.split()[0]) < 5000
+
+
+def test_cli_window_writes_summaries(tmp_path, capsys):
+    out = tmp_path / "summary.npz"
+    main(["--timesteps", "2000", "--seed", "3", "--window", "100", "--lttb-points", "50", "--out", str(out)])
+    assert "2000 steps" in capsys.readouterr().out
+    full = SimulationRunner(timesteps=2000, seed=3).run()
+    with np.load(out) as saved:
+        assert 'H_states' not in saved
+        np.testing.assert_allclose(saved['phase_sync_mean'], full['phase_sync'].reshape(20, 100).mean(axis=1))
+        assert len(saved['reflection_lttb']) == 50
+
+
+def test_cli_profile_report(tmp_path, capsys):
+    profile = tmp_path / "profile.json"
+    main(["--timesteps", "200", "--inject", "5:R=0.1", "--profile", "--profile-out", str(profile)])
+    out = capsys.readouterr().out
+    assert "steps/s" in out
+    assert "state_update" in out
+    summary = json.loads(profile.read_text())
+    assert summary['steps'] == 200
+    assert summary['counters']['injections'] == 1
@@ -0,0 +1,162 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.lake_state import LakeStateTracker, _persist, lake_state_series
+from src.rcd_model import RCDModel
+from src.simulation_runner import SimulationRunner
+from src.stopping import (DistanceTolerance, LakeStatePersistence, ReflectionPlateau, StopMonitor,
+                          WallClock, as_monitor)
+
+
+def persist_loop(steps, Lambda0):
+    out = np.empty_like(steps)
+    Lambda = Lambda0
+    for k in range(len(steps)):
+        Lambda = np.clip(Lambda + steps[k], 0.0, 1.0)
+        out[k] = Lambda
+    return out
+
+
+def check_blocks(condition, series, sizes, n_members=None):
+    """Feed `series` (gamma, rho, d, R) to `condition` in blocks of the given sizes."""
+    condition.reset(n_members)
+    fired, start = [], 0
+    for size in sizes:
+        fired.append(condition.check(*(x[start:start + size] for x in series)))
+        start += size
+    return np.concatenate(fired)
+
+
+# --- Lake-State persistence ---
+
+@pytest.mark.parametrize("shape", [(1,), (5,), (300,), (1000,), (300, 3), (70, 40)])
+def test_persist_matches_step_loop_exactly(shape):
+    rng = np.random.default_rng(sum(shape))
+    steps = np.where(rng.random(shape) < 0.6, 0.05, -0.01)
+    steps[::7] = rng.normal(0, 0.5, steps[::7].shape)   # jumps that clip at both bounds
+    Lambda0 = rng.random(shape[1:])
+    np.testing.assert_array_equal(_persist(steps, Lambda0), persist_loop(steps, Lambda0))
+
+
+def test_tracker_blocks_match_single_steps():
+    rng = np.random.default_rng(3)
+    gamma, rho, R = (0.5 + 0.5 * rng.random((400, 4)) for _ in range(3))
+    whole = LakeStateTracker(n_members=4)
+    Lambda, in_lake = whole.update_many(gamma, rho, R)
+
+    stepped = LakeStateTracker(n_members=4)
+    for t in range(len(gamma)):
+        L, inside = stepped.update(gamma[t], rho[t], R[t])
+        np.testing.assert_array_equal(L, Lambda[t])
+        np.testing.assert_array_equal(inside, in_lake[t])
+    assert stepped.events == whole.events
+    np.testing.assert_array_equal(stepped.entry_time, whole.entry_time)
+
+
+def test_lake_state_series_enters_and_exits():
+    high, low = np.full(40, 0.9), np.full(100, 0.0)
+    gamma = rho = R = np.r_[high, low]
+    series = lake_state_series(gamma, rho, R, reinforcement=0.05, decay_rate=0.01)
+    assert series['entry_time'] == 10    # ten steps of 0.05 sum to just under 0.5
+    assert [event['type'] for event in series['events']] == ['enter', 'exit']
+    assert series['in_lake'][10] and not series['in_lake'][9] and not series['in_lake'][-1]
+
+
+# --- Conditions ---
+
+def test_distance_tolerance_fires_at_first_close_step():
+    d = np.array([1.0, 0.5, 0.01, 0.2, 0.001])
+    fired = check_blocks(DistanceTolerance(0.05), (d, d, d, d), [2, 3])
+    assert fired.tolist() == [False, False, True, False, True]
+
+
+def test_reflection_plateau_across_blocks():
+    R = np.r_[np.linspace(0, 1, 10), np.full(10, 1.0)]
+    series = (R, R, R, R)
+    expected = check_blocks(ReflectionPlateau(window=4, tol=1e-9), series, [len(R)])
+    assert np.flatnonzero(expected)[0] == 13
+    for sizes in ([1] * len(R), [3, 5, 12], [9, 11]):
+        np.testing.assert_array_equal(check_blocks(ReflectionPlateau(window=4, tol=1e-9), series, sizes), expected)
+
+
+def test_lake_state_persistence_counts_consecutive_steps_across_blocks():
+    rng = np.random.default_rng(0)
+    gamma = np.r_[np.full(30, 0.9), rng.random(20) * 0.2, np.full(60, 0.9)]
+    series = (gamma, gamma, gamma, gamma)
+    in_lake = lake_state_series(gamma, gamma, gamma)['in_lake']
+    run = np.zeros(len(gamma), dtype=int)
+    for t in range(len(gamma)):
+        run[t] = (run[t - 1] + 1 if t else 1) if in_lake[t] else 0
+    expected = run >= 15
+    assert expected.any()
+    for sizes in ([len(gamma)], [1] * len(gamma), [7, 50, 53]):
+        np.testing.assert_array_equal(check_blocks(LakeStatePersistence(k=15), series, sizes), expected)
+
+
+def test_wall_clock_counts_from_reset():
+    clock = WallClock(0.05)
+    clock.reset()
+    zeros = np.zeros(3)
+    assert not clock.check(zeros, zeros, zeros, zeros).any()
+    time.sleep(0.06)
+    assert clock.check(zeros, zeros, zeros, zeros).tolist() == [False, False, True]
+
+
+# --- StopMonitor ---
+
+def test_monitor_reports_earliest_condition_and_ties_to_the_first():
+    monitor = StopMonitor([DistanceTolerance(0.1), ReflectionPlateau(window=2, tol=0.0)])
+    d = np.array([1.0, 1.0, 1.0, 0.05, 0.05])
+    R = np.array([0.1, 0.2, 0.2, 0.2, 0.2])
+    monitor.extend(None, None, d, d, d, R)
+    assert monitor.summary() == {'stopped_at': 3, 'stop_reason': 'distance'}
+
+    tie = StopMonitor([ReflectionPlateau(window=2, tol=0.0), DistanceTolerance(0.1)])
+    tie.extend(None, None, d, d, d, R)
+    assert tie.summary() == {'stopped_at': 3, 'stop_reason': 'reflection_plateau'}
+
+
+def test_monitor_tracks_members_separately():
+    monitor = StopMonitor([DistanceTolerance(0.1)], n_members=3)
+    d = np.array([[1.0, 0.05, 1.0], [0.05, 0.01, 1.0]])
+    monitor.extend(None, None, d, d, d, d)
+    assert not monitor.stopped
+    assert monitor.summary()['stopped_at'].tolist() == [1, 0, -1]
+    assert monitor.summary()['stop_reason'] == ['distance', 'distance', None]
+    monitor.record(None, None, *(np.array([1.0, 1.0, 0.0]),) * 4)
+    assert monitor.stopped and monitor.stopped_at.tolist() == [1, 0, 2]
+
+
+def test_as_monitor_accepts_one_condition_a_list_or_a_monitor():
+    assert isinstance(as_monitor(WallClock(1)), StopMonitor)
+    assert len(as_monitor([WallClock(1), DistanceTolerance()]).conditions) == 2
+    monitor = StopMonitor([DistanceTolerance()])
+    monitor.record(None, None, 0.0, 0.0, 0.0, 0.0)
+    assert as_monitor(monitor) is monitor and not monitor.stopped   # reset for the new run
+
+
+def test_simulate_stops_right_after_the_firing_step():
+    results = RCDModel(dim=4, seed=1).simulate(5000, stop=DistanceTolerance(0.5))
+    stopped_at = results['stopped_at']
+    assert results['stop_reason'] == 'distance'
+    assert results['procrustes_dist'][stopped_at] <= 0.5 < results['procrustes_dist'][:stopped_at].min()
+    assert len(results['reflection']) == stopped_at + 1
+
+
+# --- SimulationRunner ---
+
+def test_runner_wall_clock_starts_with_run():
+    runner = SimulationRunner(timesteps=200, dim=4, seed=0, stop=WallClock(0.5))
+    time.sleep(0.6)   # time spent before run() does not count
+    results = runner.run()
+    assert results['stop_reason'] is None
+    assert results.n_steps == 200
+
+
+def test_runner_refuses_a_second_run():
+    runner = SimulationRunner(timesteps=20, dim=4, seed=0)
+    runner.run()
+    with pytest.raises(RuntimeError, match="new runner"):
+        runner.run()
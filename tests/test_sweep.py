@@ -0,0 +1,66 @@
+import csv
+
+import pytest
+
+from src import sweep
+
+
+def _tasks(**axes):
+    return sweep.make_tasks(sweep.parameter_grid(**axes), repeats=2, base_seed=3)
+
+
+def test_task_ids_and_seeds_do_not_depend_on_position():
+    small = _tasks(alpha=[0.5])
+    large = _tasks(alpha=[0.1, 0.5, 0.9], dim=[3])
+    by_id = {task['task_id']: task for task in large}
+    assert len(small) == 2 and len(large) == 6
+    for task in small:
+        assert by_id[task['task_id']]['seed'] == task['seed']
+    assert len({task['seed'] for task in large}) == len(large)
+    assert {task['repeat'] for task in large} == {0, 1}
+
+
+def test_resume_skips_completed_rows(tmp_path, monkeypatch):
+    out = str(tmp_path / "sweep.csv")
+    tasks = _tasks(alpha=[0.1, 0.9])
+    first = sweep.run_sweep(tasks[:2], out, n_timesteps=30, workers=1)
+    assert len(first) == 2
+
+    ran = []
+    original = sweep.run_task
+    monkeypatch.setattr(sweep, 'run_task', lambda task, *args: ran.append(task['task_id']) or original(task, *args))
+    rows = sweep.run_sweep(tasks, out, n_timesteps=30, workers=1)
+    assert sorted(ran) == sorted(task['task_id'] for task in tasks[2:])
+    assert len(rows) == len(tasks)
+    with open(out, newline='') as f:
+        saved = list(csv.DictReader(f))
+    assert sorted(row['task_id'] for row in saved) == sorted(task['task_id'] for task in tasks)
+    assert {row['n_timesteps'] for row in saved} == {'30'}
+
+
+@pytest.mark.parametrize("changed", [{'n_timesteps': 31}, {'lake_threshold': 0.5}])
+def test_resume_with_changed_settings_raises(tmp_path, changed):
+    out = str(tmp_path / "sweep.csv")
+    tasks = _tasks(alpha=[0.5])
+    sweep.run_sweep(tasks, out, n_timesteps=30, workers=1)
+    settings = {'n_timesteps': 30, 'lake_threshold': 0.6, **changed}
+    with pytest.raises(ValueError, match="n_timesteps=30"):
+        sweep.run_sweep(tasks, out, workers=1, **settings)
+    rows = sweep.run_sweep(tasks, out, workers=1, resume=False, **settings)
+    assert {row['n_timesteps'] for row in rows} == {settings['n_timesteps']}
+
+
+def test_cli_refuses_mismatched_resume(tmp_path, capsys):
+    out = str(tmp_path / "sweep.csv")
+    sweep.main(['--alpha', '0.5', '--timesteps', '20', '--workers', '1', '--out', out])
+    with pytest.raises(SystemExit):
+        sweep.main(['--alpha', '0.5', '--timesteps', '999', '--workers', '1', '--out', out])
+    assert "n_timesteps=20" in capsys.readouterr().err
+
+
+def test_process_pool_matches_serial(tmp_path):
+    tasks = _tasks(alpha=[0.2, 0.8])
+    serial = sweep.run_sweep(tasks, str(tmp_path / "serial.csv"), n_timesteps=25, workers=1)
+    pooled = sweep.run_sweep(tasks, str(tmp_path / "pool.csv"), n_timesteps=25, workers=2)
+    key = lambda row: row['task_id']
+    assert sorted(serial, key=key) == sorted(pooled, key=key)